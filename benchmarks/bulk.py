@@ -0,0 +1,99 @@
+"""Benchmark the memory and throughput of bulk marshaling.
+
+Rows are decoded one at a time from JSON lines, as a streaming import would,
+so every string value is a separate object and each row may be freed once it
+is marshaled.  The rows are marshaled with ``MapperIterator.marshal`` with and
+without ``bulk``.  Each mode runs in its own process so the peak memory of one
+run doesn't hide the other.
+
+Usage::
+
+    $ python benchmarks/bulk.py
+    $ python benchmarks/bulk.py --rows 100000
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import time
+
+from tabulate import tabulate
+
+from kim import Mapper, field
+
+
+class RowMapper(Mapper):
+
+    __type__ = dict
+
+    id = field.Integer()
+    sku = field.String()
+    quantity = field.Integer()
+    status = field.String(choices=['new', 'shipped', 'cancelled'])
+    country = field.String(intern=True)
+    warehouse = field.String(intern=True)
+
+
+def make_rows(count):
+
+    statuses = ['new', 'shipped', 'cancelled']
+    countries = ['GB', 'FR', 'DE', 'US', 'JP']
+    return '\n'.join(json.dumps({
+        'id': i,
+        'sku': 'SKU-%06d' % i,
+        'quantity': i % 100,
+        'status': statuses[i % 3],
+        'country': countries[i % 5],
+        'warehouse': 'warehouse-%s' % (i % 20),
+    }) for i in range(count))
+
+
+def peak_rss():
+    """Return the peak resident set size of this process in MiB."""
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes.
+    if sys.platform == 'darwin':
+        return peak / 1024.0 / 1024.0
+    return peak / 1024.0
+
+
+def measure(lines, bulk, results):
+
+    before = peak_rss()
+
+    start = time.time()
+    rows = (json.loads(line) for line in lines)
+    output = RowMapper.many().marshal(rows, bulk=bulk)
+    elapsed = time.time() - start
+
+    assert len(output) == len(lines)
+    results.put((before, peak_rss(), elapsed))
+
+
+def report(count):
+
+    lines = make_rows(count).splitlines()
+
+    table = []
+    for name, bulk in [('default', False), ('bulk', True)]:
+        results = multiprocessing.Queue()
+        process = multiprocessing.Process(target=measure,
+                                          args=(lines, bulk, results))
+        process.start()
+        before, after, elapsed = results.get()
+        process.join()
+        table.append([name, after, after - before, count / elapsed])
+
+    print(tabulate(table, headers=['Mode', 'Peak RSS (MiB)',
+                                   'Marshaling (MiB)', 'Rows/sec']))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    report(args.rows)
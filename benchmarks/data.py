@@ -51,12 +51,41 @@ class ComplexMapper(Mapper):
         subs = field.Collection(field.Nested(SubMapper))
 
 
-def serialize(data, many=False):
+class SubMarshalMapper(Mapper):
+        __type__ = dict
+        w = field.Integer()
+        x = field.Integer()
+        y = field.String()
+        z = field.Integer()
+
+
+class ComplexMarshalMapper(Mapper):
+        __type__ = dict
+        foo = field.String()
+        sub = field.Nested(SubMarshalMapper, allow_create=True)
+        subs = field.Collection(field.Nested(SubMarshalMapper, allow_create=True))
+
+
+def serialize(data, many=False, memo=None):
 
     if many:
-        return ComplexMapper.many().serialize(data)
+        return ComplexMapper.many().serialize(data, memo=memo)
     else:
-        ComplexMapper(obj=data).serialize()
+        return ComplexMapper(obj=data).serialize(memo=memo)
+
+
+def marshal(data, many=False):
+
+    if many:
+        return ComplexMarshalMapper.many().marshal(data)
+    else:
+        return ComplexMarshalMapper(data=data).marshal()
 
 
 test_object = ParentTestObject()
+
+test_data = {
+    'foo': 'bar',
+    'sub': vars(ChildTestObject()),
+    'subs': [vars(ChildTestObject(i)) for i in range(10)],
+}
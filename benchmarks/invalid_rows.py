@@ -0,0 +1,103 @@
+"""Benchmark marshaling rows when some of them are invalid.
+
+Each row is marshaled with ComplexMarshalMapper and MappingInvalid is caught
+for the invalid ones, as a bulk import would.  Invalid rows contain an
+invalid field in the nested mapper and in one item of the nested collection.
+
+Builtin pipes report invalid data by returning a sentinel, so an invalid row
+raises a single MappingInvalid from the top level mapper.  The run is repeated
+with every pipe raising FieldInvalid, as they did before, for comparison.
+
+Usage::
+
+    $ python benchmarks/invalid_rows.py
+    $ python benchmarks/invalid_rows.py --rows 5000
+"""
+import argparse
+import copy
+import time
+
+from tabulate import tabulate
+
+from kim import Mapper
+from kim.exception import MappingInvalid
+
+from data import ComplexMarshalMapper, test_data
+
+
+def make_rows(count, invalid_percent):
+
+    rows = []
+    for i in range(count):
+        row = copy.deepcopy(test_data)
+        if i * invalid_percent % 100 + invalid_percent >= 100:
+            row['sub']['w'] = 'not a number'
+            row['subs'][5]['x'] = 'not a number'
+        rows.append(row)
+    return rows
+
+
+def marshal_rows(rows):
+
+    invalid = 0
+    for row in rows:
+        try:
+            ComplexMarshalMapper(data=row).marshal()
+        except MappingInvalid:
+            invalid += 1
+    return invalid
+
+
+def raising(get_mapper_session):
+    """Wrap ``Mapper.get_mapper_session`` so pipes raise for invalid data."""
+
+    def wrapper(self, data, output, **kwargs):
+        kwargs['raise_invalid'] = True
+        return get_mapper_session(self, data, output, **kwargs)
+    return wrapper
+
+
+def run(rows, repeat):
+
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        invalid = marshal_rows(rows)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return invalid, best
+
+
+def report(count, repeat):
+
+    get_mapper_session = Mapper.get_mapper_session
+
+    table = []
+    for invalid_percent in (0, 10, 50):
+        rows = make_rows(count, invalid_percent)
+
+        invalid, sentinel = run(rows, repeat)
+
+        Mapper.get_mapper_session = raising(get_mapper_session)
+        try:
+            _, exceptions = run(rows, repeat)
+        finally:
+            Mapper.get_mapper_session = get_mapper_session
+
+        table.append([invalid_percent, invalid, count / exceptions,
+                      count / sentinel, exceptions / sentinel])
+
+    print(tabulate(table, headers=['Invalid %', 'Invalid rows',
+                                   'Exceptions (rows/sec)',
+                                   'Sentinel (rows/sec)', 'Speedup']))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    report(args.rows, args.repeat)
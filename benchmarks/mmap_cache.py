@@ -0,0 +1,123 @@
+"""Benchmark a serialization cache shared between processes.
+
+A number of worker processes, standing in for the workers of a pre-forked web
+server, each serialize objects picked at random from the same set using
+``serialize_json``.  The run is repeated without a cache, with a
+SerializationCache in every process and with a single MMapCache shared by
+all of them.  Hit rates are combined across workers and latency is measured
+per call.
+
+Usage::
+
+    $ python benchmarks/mmap_cache.py
+    $ python benchmarks/mmap_cache.py --processes 8 --objects 2000
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from tabulate import tabulate
+
+from kim.cache import SerializationCache, MMapCache
+
+from data import ComplexMapper, ParentTestObject
+
+
+class CachedComplexMapper(ComplexMapper):
+
+    __cache_version__ = ('foo', )
+
+
+def make_objects(count):
+
+    objects = []
+    for i in range(count):
+        obj = ParentTestObject()
+        obj.foo = 'object %s' % i
+        objects.append(obj)
+    return objects
+
+
+def worker(index, make_cache, objects, requests, results):
+
+    cache = make_cache()
+    rand = random.Random(index)
+    latencies = []
+
+    for i in range(requests):
+        obj = objects[rand.randrange(len(objects))]
+        start = time.time()
+        CachedComplexMapper(obj=obj).serialize_json(cache=cache)
+        latencies.append(time.time() - start)
+
+    stats = cache.stats() if cache is not None else {'hits': 0, 'misses': 0}
+    results.put((stats['hits'], stats['misses'], latencies))
+
+
+def run(make_cache, processes, objects, requests):
+
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    pool = [
+        context.Process(target=worker,
+                        args=(i, make_cache, objects, requests, results))
+        for i in range(processes)
+    ]
+
+    start = time.time()
+    for process in pool:
+        process.start()
+    collected = [results.get() for _ in pool]
+    for process in pool:
+        process.join()
+    elapsed = time.time() - start
+
+    hits = sum(r[0] for r in collected)
+    misses = sum(r[1] for r in collected)
+    latencies = sorted(l for r in collected for l in r[2])
+
+    return {
+        'hit rate': float(hits) / (hits + misses) if hits + misses else 0,
+        'mean': sum(latencies) / len(latencies) * 1e6,
+        'p99': latencies[int(len(latencies) * 0.99)] * 1e6,
+        'throughput': len(latencies) / elapsed,
+    }
+
+
+def report(processes, count, requests, maxsize):
+
+    objects = make_objects(count)
+    path = os.path.join(tempfile.mkdtemp(), 'kim.cache')
+
+    caches = [
+        ('No cache', lambda: None),
+        ('SerializationCache per process',
+         lambda: SerializationCache(maxsize=maxsize)),
+        ('Shared MMapCache',
+         lambda: MMapCache(path, slots=maxsize, slot_size=2048)),
+    ]
+
+    table = []
+    for name, make_cache in caches:
+        result = run(make_cache, processes, objects, requests)
+        table.append([name, result['hit rate'] * 100, result['mean'],
+                      result['p99'], result['throughput']])
+
+    os.unlink(path)
+    print(tabulate(table, headers=['Cache', 'Hit rate %', 'Mean (us)',
+                                   'p99 (us)', 'Requests/sec']))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--objects', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--maxsize', type=int, default=4096)
+    args = parser.parse_args()
+
+    report(args.processes, args.objects, args.requests, args.maxsize)
@@ -21,6 +21,11 @@ def test_many(limit=1000):
         serialize([test_object, test_object], many=True)
 
 
+def test_many_memo(limit=1000):
+    for i in range(0, limit):
+        serialize([test_object, test_object], many=True, memo=True)
+
+
 def test_one(limit=1000):
     for i in range(0, limit):
         serialize(test_object)
@@ -37,13 +42,18 @@ def run():
         test_one()
         results.append(result)
 
+    with timer('many memo') as result:
+        test_many_memo()
+        results.append(result)
+
     return results
 
 
 def report():
     """This function will run our performance benchmarking suite.  The Test will serialize
     1000 objects once using the many() API and also 1000 objects one at a time using
-    serialize().
+    serialize().  The many() test is repeated with ``memo=True`` as the same object is
+    serialized twice in each batch.
 
     We run the test three times to produce the avg, min and max of each test.  The
     data and mapper for the test can be found in benchmarks/data.py and represent a
@@ -70,9 +80,11 @@ def report():
 
     many_results = [results1[0].elapsed, results2[0].elapsed, results3[0].elapsed]
     one_results = [results1[1].elapsed, results2[1].elapsed, results3[1].elapsed]
+    memo_results = [results1[2].elapsed, results2[2].elapsed, results3[2].elapsed]
 
     many_avg = (many_results[0] + many_results[1] + many_results[2]) / 3
     one_avg = (one_results[0] + one_results[1] + one_results[2]) / 3
+    memo_avg = (memo_results[0] + memo_results[1] + memo_results[2]) / 3
 
     def find_min(results):
 
@@ -100,10 +112,13 @@ def report():
     one_min = find_min(one_results)
     many_max = find_max(many_results)
     one_max = find_max(one_results)
+    memo_min = find_min(memo_results)
+    memo_max = find_max(memo_results)
 
     table = []
     table.append(['Serialize Many', many_avg, many_min, many_max])
     table.append(['Serialize One', one_avg, one_min, one_max])
+    table.append(['Serialize Many (memo)', memo_avg, memo_min, memo_max])
 
     print(tabulate(table, headers=['Test', 'Avg', 'Min', 'Max']))
 
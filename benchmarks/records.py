@@ -0,0 +1,87 @@
+"""Benchmark the memory used by marshaled rows.
+
+Rows are marshaled with ``MapperIterator.marshal`` into dicts, into
+``__slots__`` records and into namedtuple records.  tracemalloc measures the
+memory still held by the marshaled output once the call returns.
+
+Usage::
+
+    $ python benchmarks/records.py
+    $ python benchmarks/records.py --rows 200000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from tabulate import tabulate
+
+from kim import Mapper, field
+
+
+class RowMapper(Mapper):
+
+    __type__ = dict
+
+    id = field.Integer()
+    sku = field.String()
+    name = field.String()
+    quantity = field.Integer()
+    price = field.Decimal()
+    status = field.String(choices=['new', 'shipped', 'cancelled'])
+
+
+def make_rows(count):
+
+    statuses = ['new', 'shipped', 'cancelled']
+    return [{
+        'id': i,
+        'sku': 'SKU-%06d' % i,
+        'name': 'Product %s' % i,
+        'quantity': i % 100,
+        'price': '%s.99' % (i % 1000),
+        'status': statuses[i % 3],
+    } for i in range(count)]
+
+
+def measure(rows, record):
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.time()
+    output = RowMapper.many().marshal(rows, record=record)
+    elapsed = time.time() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(output) == len(rows)
+    del output
+    return current, peak, elapsed
+
+
+def report(count):
+
+    rows = make_rows(count)
+
+    # Create the record types before measuring.
+    RowMapper.record_type(kind='slots')
+    RowMapper.record_type(kind='tuple')
+
+    table = []
+    for name, record in [('dict', None), ('slots', 'slots'),
+                         ('tuple', 'tuple')]:
+        current, peak, elapsed = measure(rows, record)
+        table.append([name, float(current) / count, peak / 1024.0 / 1024.0,
+                      count / elapsed])
+
+    print(tabulate(table, headers=['Output', 'Bytes per row', 'Peak (MiB)',
+                                   'Rows/sec']))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    report(args.rows)
@@ -0,0 +1,121 @@
+"""Stress test and benchmark for sharing mappers between threads.
+
+Every thread serializes and marshals the benchmark data using the same mapper
+classes and the same MapperIterator instances.  Each result is compared
+against one produced by a single thread before the run so any state leaking
+between threads is reported as a failure.
+
+Usage::
+
+    $ python benchmarks/threads.py
+    $ python benchmarks/threads.py --threads 16 --iterations 500
+"""
+import argparse
+import sys
+import threading
+import time
+
+from tabulate import tabulate
+
+from data import (
+    ComplexMapper, ComplexMarshalMapper, ParentTestObject, serialize, marshal,
+    test_object, test_data)
+
+
+def make_inputs(index):
+    """Return an object and some data unique to the thread at ``index`` so
+    results leaking between threads can be detected.
+    """
+
+    obj = ParentTestObject()
+    obj.foo = 'thread %s' % index
+
+    data = dict(test_data, foo='thread %s' % index)
+
+    return obj, data
+
+
+def worker(barrier, iterations, serialize_many, marshal_many, inputs, expected,
+           failures):
+
+    obj, data = inputs
+    barrier.wait()
+    for i in range(iterations):
+        results = [
+            ('serialize', serialize(obj)),
+            ('marshal', marshal(data)),
+            ('serialize many', serialize_many.serialize([obj, test_object])),
+            ('marshal many', marshal_many.marshal([data, test_data])),
+        ]
+        for name, result in results:
+            if result != expected[name]:
+                failures.append((threading.current_thread().name, name, i))
+
+
+def run(threads, iterations):
+
+    # Both iterators are shared by every thread.
+    serialize_many = ComplexMapper.many()
+    marshal_many = ComplexMarshalMapper.many()
+
+    jobs = []
+    for index in range(threads):
+        obj, data = make_inputs(index)
+        expected = {
+            'serialize': serialize(obj),
+            'marshal': marshal(data),
+            'serialize many': serialize_many.serialize([obj, test_object]),
+            'marshal many': marshal_many.marshal([data, test_data]),
+        }
+        jobs.append(((obj, data), expected))
+
+    failures = []
+    barrier = threading.Barrier(threads)
+    pool = [
+        threading.Thread(
+            target=worker,
+            args=(barrier, iterations, serialize_many, marshal_many, inputs,
+                  expected, failures))
+        for inputs, expected in jobs
+    ]
+
+    start = time.time()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.time() - start
+
+    return elapsed, failures
+
+
+def report(max_threads, iterations):
+    """Run the stress test with 1, 2, 4... up to ``max_threads`` threads.
+    Every thread runs ``iterations`` rounds of serialize, marshal,
+    serialize many and marshal many.
+    """
+
+    table = []
+    failed = False
+    threads = 1
+    while threads <= max_threads:
+        elapsed, failures = run(threads, iterations)
+        operations = threads * iterations * 4
+        table.append([threads, operations, elapsed, operations / elapsed,
+                      len(failures)])
+        failed = failed or bool(failures)
+        threads *= 2
+
+    print(tabulate(table, headers=['Threads', 'Operations', 'Elapsed',
+                                   'Ops/sec', 'Failures']))
+    return failed
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    sys.exit(1 if report(args.threads, args.iterations) else 0)
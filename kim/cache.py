@@ -0,0 +1,648 @@
+# kim/cache.py
+# Copyright (C) 2014-2016 the Kim authors and contributors
+# <see AUTHORS file>
+#
+# This module is part of Kim and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+from collections import OrderedDict
+
+import six
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from .encoding import dumps
+
+_monotonic = getattr(time, 'monotonic', time.time)
+
+
+class SerializationMemo(object):
+    """Remembers the output of every object serialized during a single call
+    to :meth:`kim.mapper.Mapper.serialize` or
+    :meth:`kim.mapper.MapperIterator.serialize`.
+
+    It's common for the same object to appear many times in one response, for
+    example the same author of every post in a list.  When a memo is used each
+    object is only serialized once per mapper and role, every other
+    appearance reuses the output.
+
+    Entries are keyed by the ``id()`` of the object.  The memo keeps a
+    reference to every object it stores so an id can not be reused by a
+    different object while the memo is alive.  A memo should therefore only
+    live for a single call.
+
+    Usage::
+
+        >>> memo = SerializationMemo()
+        >>> PostMapper.many().serialize(posts, memo=memo)
+
+    :param copy: When True a shallow copy of the memoized output is returned
+        for every repeated object when it is a dict.  By default the same dict
+        is shared by every appearance of an object and must not be modified.
+    """
+
+    __slots__ = ('copy', '_entries')
+
+    def __init__(self, copy=False):
+
+        self.copy = copy
+        self._entries = {}
+
+    def get(self, obj, key, tags=None):
+        """Return the output memoized for ``obj`` under ``key`` or None.
+
+        :param obj: the object being serialized
+        :param key: a hashable key identifying the mapper and role
+        :param tags: optional set the cache tags of the output are added to
+        """
+
+        entry = self._entries.get((id(obj), key))
+        if entry is None:
+            return None
+
+        output = entry[1]
+        if tags is not None and entry[2]:
+            tags.update(entry[2])
+        # Encoded JSON fragments are immutable and never copied.
+        if self.copy and isinstance(output, dict):
+            return dict(output)
+        return output
+
+    def set(self, obj, key, output, tags=None):
+        """Store ``output`` for ``obj`` under ``key``
+
+        :param obj: the object that was serialized
+        :param key: a hashable key identifying the mapper and role
+        :param output: the serialized output of ``obj``
+        :param tags: optional cache tags of the objects ``output`` contains
+        """
+
+        # obj is stored alongside the output to keep it alive, guaranteeing
+        # its id is not reused for the lifetime of the memo.
+        self._entries[(id(obj), key)] = (obj, output, tags)
+
+    def __len__(self):
+
+        return len(self._entries)
+
+
+class SerializationCache(object):
+    """A bounded, thread safe cache for the output of
+    :meth:`kim.mapper.Mapper.serialize` that lives across calls.
+
+    Output is only cached for mappers that can describe the version of the
+    object they are serializing, see :meth:`kim.mapper.Mapper.get_cache_version`.
+    Entries are keyed by the mapper, the role and that version, so an object is
+    served from the cache until its version changes.  Nested mappers use the
+    cache independently, an unchanged nested object is reused even when its
+    parent has changed.
+
+    When the cache holds ``maxsize`` entries the least recently used entry is
+    evicted.  If ``ttl`` is set entries expire ``ttl`` seconds after they were
+    stored.
+
+    When a ``tag`` function is given every entry records the tags of the
+    objects its output contains, including the objects of nested mappers.
+    :meth:`invalidate` removes every entry containing a changed object.
+    Objects with a tag are cached even if their mapper doesn't define a
+    version, they are served from the cache until they are invalidated.
+    See :class:`kim.sqa.CacheInvalidator`.
+
+    Objects can change before the cache is told about it, for example a
+    SQLAlchemy instance modified in memory but not yet flushed.  When a
+    ``changed`` function is given it returns the tags of those objects.
+    Entries containing any of them are not served, and output containing any
+    of them is not stored.
+
+    Usage::
+
+        >>> cache = SerializationCache(maxsize=10000, ttl=300)
+        >>> UserMapper(obj=user).serialize(cache=cache)
+        >>> cache.stats()
+        {'hits': 0, 'misses': 1, 'evictions': 0, 'expirations': 0, 'size': 1}
+
+    .. note::
+
+        Cached output is shared by every caller and must not be modified.
+
+    :param maxsize: the maximum number of entries to store
+    :param ttl: optional number of seconds an entry may be served for
+    :param timer: callable returning the current time in seconds, used for ttl
+    :param tag: optional callable returning a hashable tag identifying an
+        object, or None if changes to the object aren't tracked
+    :param changed: optional callable given the object being serialized,
+        returning the tags of objects that have changed but have not been
+        invalidated yet
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, timer=_monotonic, tag=None,
+                 changed=None):
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.tag = tag
+        self.changed = changed
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._entries = OrderedDict()
+        self._tagged = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, tags=None, stale=None):
+        """Return the value stored for ``key`` or None if the key is missing,
+        has expired or contains a stale tag.
+
+        :param key: hashable cache key
+        :param tags: optional set the tags of the entry are added to
+        :param stale: optional collection of tags, an entry stored with any of
+            them is treated as missing
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires, entry_tags = entry
+            if expires is not None and expires <= self.timer():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            # The entry is left in place, the tags are only stale for the
+            # caller, e.g. a session with changes that haven't been flushed.
+            if stale and entry_tags and not entry_tags.isdisjoint(stale):
+                self.misses += 1
+                return None
+
+            # Mark the entry as the most recently used.
+            del self._entries[key]
+            self._entries[key] = entry
+            self.hits += 1
+            if tags is not None and entry_tags:
+                tags.update(entry_tags)
+            return value
+
+    def set(self, key, value, tags=None):
+        """Store ``value`` for ``key``, evicting the least recently used
+        entries if the cache is full.
+
+        :param key: hashable cache key
+        :param value: the value to store
+        :param tags: optional iterable of tags, the entry is removed when any
+            of them is passed to :meth:`invalidate`
+        """
+
+        expires = None
+        if self.ttl is not None:
+            expires = self.timer() + self.ttl
+
+        tags = frozenset(tags) if tags else None
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, expires, tags)
+            for tag in tags or ():
+                self._tagged.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        """Remove ``key`` and its tags.  The lock must be held.
+        """
+
+        entry = self._entries.pop(key, None)
+        if entry is None or not entry[2]:
+            return
+
+        for tag in entry[2]:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    def delete(self, key):
+        """Remove ``key`` from the cache if it's present.
+
+        :param key: hashable cache key
+        """
+
+        with self._lock:
+            self._remove(key)
+
+    def invalidate(self, tags):
+        """Remove every entry stored with any of ``tags``.
+
+        :param tags: iterable of tags
+        :returns: the number of entries removed
+        :rtype: int
+        """
+
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tagged.get(tag, ())):
+                    self._remove(key)
+                    removed += 1
+        return removed
+
+    def clear(self):
+        """Remove every entry from the cache.  Counters are left untouched.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self._tagged.clear()
+
+    def stats(self):
+        """Return a dict containing the hit, miss, eviction and expiration
+        counters and the current number of entries.
+
+        :rtype: dict
+        """
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self._entries),
+            }
+
+    def __len__(self):
+
+        return len(self._entries)
+
+
+class MMapCache(object):
+    """A cache stored in a memory mapped file that is shared by every process
+    that opens the same ``path``.
+
+    Pre-forked web servers typically run many workers on each host.  An in
+    process :class:`SerializationCache` stores a separate copy of the same
+    output in every worker, an MMapCache stores it once for all of them
+    without needing an external service.  It can be used anywhere a
+    :class:`SerializationCache` is accepted and is best suited to
+    :meth:`kim.mapper.Mapper.serialize_json`, which stores pre-encoded
+    strings.  Other values are stored as JSON.
+
+    The file is split into ``slots`` fixed size slots of ``slot_size`` bytes,
+    grouped into buckets of ``ways`` slots.  A key may only be stored in the
+    bucket its hash points to and when a bucket is full an entry is evicted
+    using the clock algorithm.  Values that do not fit in a slot are not
+    stored.
+
+    Reads take no locks.  Every slot carries a sequence number that writers
+    make odd while they update the slot, readers discard anything read while
+    the sequence number was odd or changed.  Writers lock only the bucket
+    they write to, using a byte range lock on the file.
+
+    Usage::
+
+        >>> cache = MMapCache('/dev/shm/kim.cache', slots=65536)
+        >>> UserMapper(obj=user).serialize_json(cache=cache)
+
+    .. note::
+
+        MMapCache requires ``fcntl`` and is not available on Windows.  Hit,
+        miss and eviction counters are kept per process.
+
+    :param path: path of the file backing the cache.  It's created if it
+        doesn't exist.
+    :param slots: the number of slots in the cache
+    :param slot_size: the size in bytes of each slot, including a small header
+    :param ways: the number of slots in each bucket
+    :param ttl: optional number of seconds an entry may be served for
+    """
+
+    MAGIC = b'KIMCACHE'
+    FILE_HEADER = struct.Struct('<8sIIII')
+    FILE_HEADER_SIZE = 64
+
+    # sequence, reference bit, value type, key digest, value length, expiry
+    SLOT_HEADER = struct.Struct('<IBB2x16sI4xd')
+    SEQUENCE = struct.Struct('<I')
+
+    TYPE_BYTES = 1
+    TYPE_TEXT = 2
+    TYPE_JSON = 3
+
+    def __init__(self, path, slots=8192, slot_size=4096, ways=8, ttl=None):
+
+        if fcntl is None:  # pragma: no cover
+            raise RuntimeError('MMapCache requires fcntl')
+
+        if slots % ways:
+            raise ValueError('slots must be a multiple of ways')
+        if slot_size <= self.SLOT_HEADER.size:
+            raise ValueError('slot_size must be larger than %s bytes'
+                             % self.SLOT_HEADER.size)
+
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.ways = ways
+        self.ttl = ttl
+        self.buckets = slots // ways
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        # fcntl locks are held by the process, this lock stops threads of the
+        # same process writing to the file at the same time.
+        self._lock = threading.Lock()
+
+        self._hands_offset = self.FILE_HEADER_SIZE
+        self._slots_offset = self._hands_offset + self._round(self.buckets)
+        size = self._slots_offset + slots * slot_size
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._initialise(size)
+        self._mmap = mmap.mmap(self._fd, size)
+
+    @staticmethod
+    def _round(size, to=64):
+
+        return (size + to - 1) // to * to
+
+    def _initialise(self, size):
+        """Write the header of a new cache file, or check the header of an
+        existing file matches the options of this cache.
+        """
+
+        header = self.FILE_HEADER.pack(
+            self.MAGIC, 1, self.slots, self.slot_size, self.ways)
+
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, self.FILE_HEADER_SIZE, 0)
+        try:
+            existing = os.read(self._fd, self.FILE_HEADER.size)
+            if existing == header:
+                return
+            elif existing[:len(self.MAGIC)] == self.MAGIC:
+                raise ValueError('%s was created with different options'
+                                 % self.path)
+
+            os.ftruncate(self._fd, 0)
+            os.ftruncate(self._fd, size)
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            os.write(self._fd, header)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, self.FILE_HEADER_SIZE, 0)
+
+    def close(self):
+        """Unmap the cache file.  The file itself is left in place.
+        """
+
+        self._mmap.close()
+        os.close(self._fd)
+
+    def _digest(self, key):
+
+        return hashlib.sha1(repr(key).encode('utf-8')).digest()[:16]
+
+    def _bucket(self, digest):
+
+        return struct.unpack_from('<Q', digest)[0] % self.buckets
+
+    def _slot_offset(self, bucket, way):
+
+        return self._slots_offset + (bucket * self.ways + way) * self.slot_size
+
+    def _read(self, offset, digest):
+        """Read the slot at ``offset`` without locking, returning a tuple of
+        (value type, value, expiry) or None if the slot does not contain
+        ``digest`` or is being written.
+        """
+
+        mm = self._mmap
+        sequence, _, value_type, slot_digest, length, expires = \
+            self.SLOT_HEADER.unpack_from(mm, offset)
+        if sequence & 1 or slot_digest != digest or not length:
+            return None
+
+        start = offset + self.SLOT_HEADER.size
+        value = mm[start:start + length]
+
+        if self.SEQUENCE.unpack_from(mm, offset)[0] != sequence:
+            return None
+
+        return value_type, value, expires
+
+    def get(self, key):
+        """Return the value stored for ``key`` or None.
+
+        :param key: hashable cache key
+        """
+
+        digest = self._digest(key)
+        bucket = self._bucket(digest)
+
+        for way in range(self.ways):
+            offset = self._slot_offset(bucket, way)
+            entry = self._read(offset, digest)
+            if entry is None:
+                continue
+
+            value_type, value, expires = entry
+            if expires and expires <= time.time():
+                self.expirations += 1
+                break
+
+            # Mark the slot as recently used for the clock algorithm.
+            self._mmap[offset + 4:offset + 5] = b'\x01'
+            self.hits += 1
+
+            if value_type == self.TYPE_TEXT:
+                return value.decode('utf-8')
+            elif value_type == self.TYPE_JSON:
+                return json.loads(value.decode('utf-8'))
+            return value
+
+        self.misses += 1
+        return None
+
+    def _encode(self, value):
+
+        if isinstance(value, six.binary_type):
+            return self.TYPE_BYTES, value
+        elif isinstance(value, six.text_type):
+            return self.TYPE_TEXT, value.encode('utf-8')
+        else:
+            return self.TYPE_JSON, dumps(value).encode('utf-8')
+
+    def _lock_bucket(self, bucket):
+
+        start = self._slot_offset(bucket, 0)
+        length = self.ways * self.slot_size
+        self._lock.acquire()
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, length, start)
+
+    def _unlock_bucket(self, bucket):
+
+        start = self._slot_offset(bucket, 0)
+        length = self.ways * self.slot_size
+        fcntl.lockf(self._fd, fcntl.LOCK_UN, length, start)
+        self._lock.release()
+
+    def _write(self, offset, value_type, digest, value, expires):
+        """Write a slot.  The bucket containing the slot must be locked.
+        """
+
+        mm = self._mmap
+        sequence = self.SEQUENCE.unpack_from(mm, offset)[0]
+
+        # An odd sequence tells readers the slot is being written.
+        self.SEQUENCE.pack_into(mm, offset, (sequence + 1) & 0xffffffff)
+        start = offset + self.SLOT_HEADER.size
+        mm[start:start + len(value)] = value
+        # New entries start without their reference bit set so entries that
+        # are never read are the first to be evicted.
+        self.SLOT_HEADER.pack_into(
+            mm, offset, (sequence + 1) & 0xffffffff, 0, value_type, digest,
+            len(value), expires)
+        self.SEQUENCE.pack_into(mm, offset, (sequence + 2) & 0xffffffff)
+
+    def set(self, key, value):
+        """Store ``value`` for ``key``.  If the bucket for ``key`` is full an
+        entry is evicted.  Values too large for a slot are not stored.
+
+        :param key: hashable cache key
+        :param value: bytes, text or a JSON serializable value
+        """
+
+        value_type, value = self._encode(value)
+        if len(value) > self.slot_size - self.SLOT_HEADER.size:
+            return
+
+        expires = 0.0
+        if self.ttl is not None:
+            expires = time.time() + self.ttl
+
+        digest = self._digest(key)
+        bucket = self._bucket(digest)
+        mm = self._mmap
+
+        self._lock_bucket(bucket)
+        try:
+            # Replace the slot already holding key, which may come after an
+            # empty slot, otherwise use the first empty slot.
+            target = empty = None
+            for way in range(self.ways):
+                offset = self._slot_offset(bucket, way)
+                _, _, _, slot_digest, length, _ = \
+                    self.SLOT_HEADER.unpack_from(mm, offset)
+                if slot_digest == digest:
+                    target = offset
+                    break
+                if not length and empty is None:
+                    empty = offset
+
+            if target is None:
+                target = empty
+
+            if target is None:
+                target = self._evict(bucket)
+                self.evictions += 1
+
+            self._write(target, value_type, digest, value, expires)
+        finally:
+            self._unlock_bucket(bucket)
+
+    def _evict(self, bucket):
+        """Choose a slot to evict from ``bucket`` using the clock algorithm.
+        Slots that were read since the hand last passed them are given a
+        second chance.
+        """
+
+        mm = self._mmap
+        hand_offset = self._hands_offset + bucket
+        hand = six.indexbytes(mm, hand_offset) % self.ways
+
+        while True:
+            offset = self._slot_offset(bucket, hand)
+            hand = (hand + 1) % self.ways
+            if six.indexbytes(mm, offset + 4):
+                mm[offset + 4:offset + 5] = b'\x00'
+            else:
+                mm[hand_offset:hand_offset + 1] = six.int2byte(hand)
+                return offset
+
+    def delete(self, key):
+        """Remove ``key`` from the cache if it's present.
+
+        :param key: hashable cache key
+        """
+
+        digest = self._digest(key)
+        bucket = self._bucket(digest)
+
+        self._lock_bucket(bucket)
+        try:
+            for way in range(self.ways):
+                offset = self._slot_offset(bucket, way)
+                if self.SLOT_HEADER.unpack_from(self._mmap, offset)[3] == digest:
+                    self._write(offset, 0, b'\x00' * 16, b'', 0.0)
+        finally:
+            self._unlock_bucket(bucket)
+
+    def clear(self):
+        """Remove every entry from the cache.
+        """
+
+        for bucket in range(self.buckets):
+            self._lock_bucket(bucket)
+            try:
+                for way in range(self.ways):
+                    offset = self._slot_offset(bucket, way)
+                    if self.SLOT_HEADER.unpack_from(self._mmap, offset)[4]:
+                        self._write(offset, 0, b'\x00' * 16, b'', 0.0)
+            finally:
+                self._unlock_bucket(bucket)
+
+    def __len__(self):
+
+        size = 0
+        for slot in range(self.slots):
+            offset = self._slots_offset + slot * self.slot_size
+            if self.SLOT_HEADER.unpack_from(self._mmap, offset)[4]:
+                size += 1
+        return size
+
+    def stats(self):
+        """Return a dict containing the hit, miss, eviction and expiration
+        counters of this process and the number of entries in the cache.
+
+        :rtype: dict
+        """
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'size': len(self),
+        }
@@ -0,0 +1,84 @@
+# kim/encoding.py
+# Copyright (C) 2014-2016 the Kim authors and contributors
+# <see AUTHORS file>
+#
+# This module is part of Kim and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+import json
+
+import six
+
+
+class JSONFragment(six.text_type):
+    """A string containing JSON that has already been encoded.
+
+    :func:`iterencode` and :func:`dumps` write fragments into their output
+    as they are, without encoding them again.  Fragments are produced by
+    :meth:`kim.mapper.Mapper.serialize_json` for nested objects whose encoded
+    output was found in, or stored into, a cache.
+    """
+
+    __slots__ = ()
+
+
+def _encode_key(key):
+
+    if not isinstance(key, six.string_types):
+        # Mirror the json module, which converts keys such as ints and
+        # booleans to their JSON representation.
+        key = json.dumps(key)
+    return json.dumps(key)
+
+
+def iterencode(obj, default=None):
+    """Encode ``obj`` as JSON, yielding the output in chunks.
+
+    ``obj`` may contain dicts, lists, tuples, any value supported by
+    :func:`json.dumps` and :class:`JSONFragment` instances, which are written
+    straight into the output.  The output is compact, no whitespace is placed
+    between items.
+
+    :param obj: the object to encode
+    :param default: passed to :func:`json.dumps` when encoding values that
+        are not containers or fragments.
+    """
+
+    if isinstance(obj, JSONFragment):
+        yield obj
+    elif isinstance(obj, dict):
+        yield '{'
+        first = True
+        for key, value in six.iteritems(obj):
+            if first:
+                first = False
+            else:
+                yield ','
+            yield _encode_key(key)
+            yield ':'
+            for chunk in iterencode(value, default=default):
+                yield chunk
+        yield '}'
+    elif isinstance(obj, (list, tuple)):
+        yield '['
+        first = True
+        for value in obj:
+            if first:
+                first = False
+            else:
+                yield ','
+            for chunk in iterencode(value, default=default):
+                yield chunk
+        yield ']'
+    else:
+        yield json.dumps(obj, default=default)
+
+
+def dumps(obj, default=None):
+    """Encode ``obj`` as a JSON string.
+
+    .. seealso::
+        :func:`iterencode`
+    """
+
+    return JSONFragment(''.join(iterencode(obj, default=default)))
@@ -7,6 +7,8 @@
 
 from collections import defaultdict
 
+import six
+
 from .exception import FieldError, FieldInvalid, FieldOptsError
 from .utils import set_creation_order
 from .pipelines import (
@@ -32,6 +34,11 @@ DEFAULT_ERROR_MSGS = {
     'invalid_choice': 'invalid choice',
     'duplicates': 'duplicates found',
     'out_of_bounds': 'value out of allowed range',
+    'invalid_path': 'Invalid path',
+    'invalid_op': 'Unsupported patch operation',
+    'unknown_field': 'Unknown field',
+    'too_long': 'value is too long',
+    'too_deep': 'maximum nesting depth exceeded',
 }
 
 
@@ -81,6 +88,9 @@ class FieldOpts(object):
         :param null_default: Specify the default type to return when a field is
             null IE None or {} or ''
         :param choices: Specify a list of valid values
+        :param cache: Read ``source`` only once for each object during a
+            serialize call.  Every field, and every nested mapper, reading
+            the same source of the same object reuses the value.
         :param extra_serialize_pipes: dict of lists containing extra Pipe functions
             to be run at the end of each stage when serializing.
             eg ``{'output': [my_pipe, my_other_pipe]}```
@@ -116,6 +126,7 @@ class FieldOpts(object):
         self.allow_none = opts.pop('allow_none', True)
         self.read_only = opts.pop('read_only', False)
         self.choices = opts.pop('choices', None)
+        self.cache = opts.pop('cache', False)
 
         self.extra_marshal_pipes = \
             opts.pop('extra_marshal_pipes', defaultdict(list))
@@ -206,6 +217,10 @@ class Field(object):
     #: The Fields serialization pipeline
     serialize_pipeline = SerializePipeline
 
+    #: Types of values the marshal pipeline of this Field returns unchanged.
+    #: See :meth:`get_passthrough_types`.
+    passthrough_types = ()
+
     def __init__(self, *args, **field_opts):
         """Constructs a new instance of Field.  Each Field accepts a set of
         kwargs that will be passed directly to the fields
@@ -272,6 +287,27 @@ class Field(object):
 
         raise FieldInvalid(self.get_error(error_type), field=self)
 
+    def get_passthrough_types(self):
+        """Return the types of values this field marshals without changing
+        them, or an empty tuple.
+
+        Values whose type is exactly one of these types are valid and may be
+        copied from the input to the output of a mapper without running the
+        marshal pipeline.  Fields are only passed through when their pipeline
+        and options are unchanged from those the field class defines
+        ``passthrough_types`` for.
+
+        :rtype: tuple
+        """
+
+        opts = self.opts
+        if (not self.passthrough_types or opts.extra_marshal_pipes or
+                opts.read_only or opts.choices is not None or
+                opts.source != opts.name):
+            return ()
+
+        return self.passthrough_types
+
     @property
     def name(self):
         """Proxy access to the :class:`FieldOpts` defined for this field.
@@ -312,7 +348,11 @@ class Field(object):
         :param mapper_session: The Mappers marshaling session this field is being
             run inside of.
         :opts: kwargs passed to the marshal pipelines run method.
-        :returns: None
+        :raises: :class:`kim.exception.FieldInvalid` or
+            :class:`kim.exception.MappingInvalid` unless the mapper_session was
+            created with ``raise_invalid=False``
+        :returns: the error of this field when it is invalid and
+            ``raise_invalid`` is False, otherwise None
 
         .. seealso::
             :meth:`kim.mapper.Mapper.marshal`
@@ -324,6 +364,7 @@ class Field(object):
             mapper_session=mapper_session,
             parent=parent)
         run_pipeline(self.marshal_pipes, session, self, **opts)
+        return session.error
 
     def serialize(self, mapper_session, **opts):
         """Run the serialize :class:`Pipeline` for this field for the given `data` and
@@ -359,6 +400,9 @@ class StringFieldOpts(FieldOpts):
         :param max: Specify the maximum permitted length
         :param min: Specify the minimum permitted length
         :param blank: If False, raise error if empty string passed. Default True
+        :param intern: If True, share a single copy of each distinct value when
+            marshaling many objects with ``bulk=True``.  Defaults to True when
+            ``choices`` are set.
 
         :raises: :class:`FieldOptsError`
         :returns: None
@@ -366,7 +410,10 @@ class StringFieldOpts(FieldOpts):
         self.max = kwargs.pop('max', None)
         self.min = kwargs.pop('min', None)
         self.blank = kwargs.pop('blank', True)
+        self.intern = kwargs.pop('intern', None)
         super(StringFieldOpts, self).__init__(**kwargs)
+        if self.intern is None:
+            self.intern = self.choices is not None
 
 
 class String(Field):
@@ -387,6 +434,17 @@ class String(Field):
     opts_class = StringFieldOpts
     marshal_pipeline = StringMarshalPipeline
     serialize_pipeline = StringSerializePipeline
+    passthrough_types = (six.text_type, )
+
+    def get_passthrough_types(self):
+
+        opts = self.opts
+        if (self.marshal_pipeline is not StringMarshalPipeline or
+                opts.max is not None or opts.min is not None or
+                opts.blank is False or opts.intern):
+            return ()
+
+        return super(String, self).get_passthrough_types()
 
 
 class IntegerFieldOpts(FieldOpts):
@@ -429,6 +487,16 @@ class Integer(Field):
     opts_class = IntegerFieldOpts
     marshal_pipeline = IntegerMarshalPipeline
     serialize_pipeline = IntegerSerializePipeline
+    passthrough_types = six.integer_types
+
+    def get_passthrough_types(self):
+
+        opts = self.opts
+        if (self.marshal_pipeline is not IntegerMarshalPipeline or
+                opts.max is not None or opts.min is not None):
+            return ()
+
+        return super(Integer, self).get_passthrough_types()
 
 
 class FloatFieldOpts(FieldOpts):
@@ -646,14 +714,19 @@ class Nested(Field):
 
         from .mapper import get_mapper_from_registry
 
-        if self._mapper_class is None:
-            mapper = get_mapper_from_registry(self.opts.mapper)
-            self._mapper_class = mapper
+        # The mapper class is resolved lazily as it may not be defined yet
+        # when the field is created.  Resolving it is idempotent so threads
+        # racing here all publish the same class with a single assignment and
+        # only ever use the local reference.
+        mapper_class = self._mapper_class
+        if mapper_class is None:
+            mapper_class = get_mapper_from_registry(self.opts.mapper)
+            self._mapper_class = mapper_class
 
         if as_class:
-            return self._mapper_class
+            return mapper_class
         else:
-            return self._mapper_class(**mapper_params)
+            return mapper_class(**mapper_params)
 
 
 class CollectionFieldOpts(FieldOpts):
@@ -669,6 +742,9 @@ class CollectionFieldOpts(FieldOpts):
             may be any :class:`Field` type.
         :param unique_on: Specify a key that is used to check the collection
             for duplicates.
+        :param max_length: Specify the maximum number of items permitted,
+            checked before any item is marshaled.  Defaults to the
+            ``max_collection_length`` limit of the mapper.
 
         """
         self.field = field
@@ -682,6 +758,7 @@ class CollectionFieldOpts(FieldOpts):
 
         self.field.opts._is_wrapped = True
         self.unique_on = kwargs.pop('unique_on', None)
+        self.max_length = kwargs.pop('max_length', None)
         super(CollectionFieldOpts, self).__init__(**kwargs)
 
     def set_name(self, *args, **kwargs):
@@ -5,18 +5,27 @@
 # This module is part of Kim and is released under
 # the MIT License: http://www.opensource.org/licenses/mit-license.php
 
+import hashlib
 import warnings
 import weakref
 import six
+import types
 import inspect
 
 from collections import OrderedDict, defaultdict
 
 from .exception import MapperError, MappingInvalid
-from .field import Field, FieldError, FieldInvalid
+from .field import (
+    Field, FieldError, FieldInvalid, Nested, Collection, DEFAULT_ERROR_MSGS)
 from .role import whitelist, blacklist, Role
-from .utils import recursive_defaultdict, attr_or_key
+from .utils import (
+    recursive_defaultdict, attr_or_key, set_attr_or_key, map_in_executor,
+    paused_gc)
 from .pipelines.base import pipe
+from .cache import SerializationMemo
+from .encoding import JSONFragment, dumps
+from .patch import diff, make_pointer, parse_pointer
+from .records import make_record_type, make_tuple_record_type
 
 
 def mapper_is_defined(mapper_name):
@@ -79,6 +88,173 @@ def add_class_to_registry(classname, cls):
         _MapperConfig.MAPPER_REGISTRY[classname] = cls
 
 
+_descriptor_types = weakref.WeakKeyDictionary()
+
+
+def _sets_attributes_through_descriptors(cls):
+    """Return True if setting attributes of instances of ``cls`` may run code,
+    because ``cls`` defines data descriptors such as properties or is
+    instrumented by an ORM such as SQLAlchemy.  Such instances can't be
+    updated by writing to their ``__dict__``.
+
+    :param cls: a class
+    :rtype: bool
+    """
+
+    try:
+        return _descriptor_types[cls]
+    except KeyError:
+        pass
+
+    result = getattr(cls, '_sa_class_manager', None) is not None
+    for klass in cls.__mro__:
+        if result or klass is object:
+            break
+        for name, value in six.iteritems(vars(klass)):
+            if name in ('__dict__', '__weakref__'):
+                continue
+            if hasattr(type(value), '__set__') or \
+                    hasattr(type(value), '__delete__'):
+                result = True
+                break
+
+    _descriptor_types[cls] = result
+    return result
+
+
+def _role_key(role, deferred_role=None):
+    """Return a hashable key representing ``role`` and ``deferred_role`` that
+    can be used to identify the output of a mapper for that role.
+
+    :param role: a role name or :class:`Role` instance
+    :param deferred_role: an optional :class:`Role` instance
+    :rtype: tuple
+    """
+
+    if isinstance(role, Role):
+        role = (role.whitelist, tuple(sorted(role)))
+
+    if deferred_role is not None:
+        deferred_role = (deferred_role.whitelist, tuple(sorted(deferred_role)))
+
+    return (role, deferred_role)
+
+
+def _source_changed(source, changed_sources):
+    """Return True if the value read from ``source`` may have changed when
+    ``changed_sources`` have changed.  A source is affected by changes to
+    itself, to any of its parents and to any of its children, ``__self__``
+    is affected by every change.
+
+    :param source: the source of a field
+    :param changed_sources: iterable of changed source paths
+    :rtype: bool
+    """
+
+    if source == '__self__':
+        return True
+
+    for changed in changed_sources:
+        if (changed == source or changed.startswith(source + '.') or
+                source.startswith(changed + '.')):
+            return True
+
+    return False
+
+
+def _describe(value, seen):
+    """Return a string describing ``value`` that is stable across processes.
+    Used to build the fingerprint of a mapper definition.
+
+    :param value: a field option, pipe, field or mapper
+    :param seen: names of the mappers already being described, used to stop
+        recursive mappers from being described forever.
+    :rtype: str
+    """
+
+    if isinstance(value, Field):
+        opts = dict(vars(value.opts))
+        opts.pop('_opts', None)
+        mapper = opts.pop('mapper', None)
+        described = [
+            value.__class__.__module__, value.__class__.__name__,
+            _describe(opts, seen),
+            _describe(value.marshal_pipes, seen),
+            _describe(value.serialize_pipes, seen),
+        ]
+        if mapper is not None:
+            described.append(_describe(get_mapper_from_registry(mapper), seen))
+        return '<%s>' % ' '.join(described)
+    elif inspect.isclass(value) and issubclass(value, Mapper):
+        if value.__name__ in seen:
+            return '<mapper %s>' % value.__name__
+        return '<mapper %s %s>' % (value.__name__, value.get_fingerprint(seen))
+    elif isinstance(value, Role):
+        return '<role %s %s>' % (value.whitelist, sorted(value))
+    elif isinstance(value, (list, tuple)):
+        return '[%s]' % ', '.join(_describe(v, seen) for v in value)
+    elif isinstance(value, (set, frozenset)):
+        return '{%s}' % ', '.join(sorted(_describe(v, seen) for v in value))
+    elif isinstance(value, dict):
+        return '{%s}' % ', '.join(
+            '%s: %s' % (_describe(k, seen), _describe(v, seen))
+            for k, v in sorted(value.items(), key=lambda i: repr(i[0])))
+    elif callable(value):
+        name = getattr(value, '__qualname__', getattr(value, '__name__', None))
+        digest = hashlib.sha1()
+        if _digest_function(value, digest, set()):
+            return '<%s.%s %s>' % (getattr(value, '__module__', None), name,
+                                   digest.hexdigest()[:16])
+        return '<%s.%s>' % (getattr(value, '__module__', None), name)
+    else:
+        return repr(value)
+
+
+def _digest_code(code, digest):
+    """Add the bytecode, constants and names of ``code`` to ``digest``."""
+
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode('utf-8'))
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _digest_code(const, digest)
+        elif isinstance(const, frozenset):
+            # The order of sets depends on hash randomization.
+            digest.update(repr(sorted(const, key=repr)).encode('utf-8'))
+        else:
+            digest.update(repr(const).encode('utf-8'))
+
+
+def _digest_function(func, digest, seen):
+    """Add the code of ``func``, and of the functions it closes over such as
+    the function wrapped by :func:`kim.pipelines.base.pipe`, to ``digest``
+    so changing the body of a pipe changes the fingerprint of its mapper.
+
+    :returns: False if ``func`` has no code, such as a builtin or a class
+    """
+
+    func = getattr(func, '__func__', func)
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return False
+    if id(func) in seen:
+        return True
+    seen.add(id(func))
+
+    _digest_code(code, digest)
+    for cell in getattr(func, '__closure__', None) or ():
+        try:
+            contents = cell.cell_contents
+        except ValueError:
+            # The cell is empty
+            continue
+        if not _digest_function(contents, digest, seen) and isinstance(
+                contents, six.string_types + six.integer_types +
+                (float, type(None), dict, list, tuple)):
+            digest.update(_describe(contents, set()).encode('utf-8'))
+    return True
+
+
 # TODO(mike) __docs__
 class _MapperConfig(object):
 
@@ -107,6 +283,7 @@ class _MapperConfig(object):
                 whitelist(*self.cls.fields.keys())
 
         self._remove_fields()
+        self._check_construct()
 
         for base in reversed(self.cls.__mro__):
             self._set_polymorphic_base(base)
@@ -116,6 +293,23 @@ class _MapperConfig(object):
 
         add_class_to_registry(classname, self.cls)
 
+    def _check_construct(self):
+        """Raise :class:`MapperError` if ``__construct__`` is set on a mapper
+        with fields whose values can't be collected by source before the
+        object is built.
+        """
+
+        if getattr(self.cls, '__construct__', None) is None:
+            return
+
+        for name, field in six.iteritems(self.cls.fields):
+            source = field.opts.source
+            if source == '__self__' or '.' in source:
+                raise MapperError(
+                    '%s can not use __construct__ with field %s, its source '
+                    '%s is not an attribute of __type__' % (
+                        self.cls.__name__, name, source))
+
     def _set_polymorphic_base(self, base):
 
         mapper_args = getattr(base, '__mapper_args__', {})
@@ -186,10 +380,10 @@ class _MapperConfig(object):
 
         for name, obj in vars(base).items():
 
-            types = ['validation', 'process', 'output', 'input']
+            hook_types = ['validation', 'process', 'output', 'input']
             hook_type = getattr(obj, '__mapper_field_hook', None)
 
-            if not callable(obj) or hook_type not in types:
+            if not callable(obj) or hook_type not in hook_types:
                 continue
             elif hook_type == 'validation':
                 for name in obj._field_names:
@@ -310,14 +504,52 @@ class MapperSession(object):
     marshaling and serialization :class:`Pipeline`.
     """
 
-    __slots__ = ('mapper', 'data', 'output', 'partial')
+    __slots__ = ('mapper', 'data', 'output', 'partial', 'executor', 'memo',
+                 'cache', 'fragments', 'tags', 'sources', 'changed',
+                 'validate_only', 'getters', 'fail_fast', 'raise_invalid',
+                 'strict', 'interned')
 
-    def __init__(self, mapper, data, output, partial=None):
+    def __init__(self, mapper, data, output, partial=None, executor=None,
+                 memo=None, cache=None, fragments=None, tags=None,
+                 sources=None, changed=None, validate_only=False,
+                 getters=True, fail_fast=False, raise_invalid=True,
+                 strict=False, interned=None):
         """Instantiate a new instance of :class:`MapperSession`
 
         :param mapper: :class:`Mapper <Mapper>` instance.
         :param data: The data marshaled by the :class:`Mapper`
         :param output: The object the :class:`Mapper` is outputting  to.
+        :param partial: Indicate the :class:`Mapper` is performing a partial update.
+        :param executor: An optional :class:`concurrent.futures.Executor` used to
+            run independent fields and collection items concurrently.
+        :param memo: An optional :class:`kim.cache.SerializationMemo` shared by
+            every mapper serialized during a single call.
+        :param cache: An optional :class:`kim.cache.SerializationCache` used by
+            every mapper serialized during this call.
+        :param fragments: An optional cache of encoded JSON used by every mapper
+            serialized during this call.
+        :param tags: An optional set collecting the cache tags of every object
+            included in the output of the :class:`Mapper`.
+        :param sources: An optional dict of memoized source values shared by
+            every mapper serialized during a single call.
+        :param changed: An optional set.  When given, fields are only written
+            to the output when their value has changed and the name of each
+            field written is added to the set.
+        :param validate_only: Indicate the :class:`Mapper` is only validating
+            data, nothing is written to the output.
+        :param getters: Indicate if getters should be called when only
+            validating data.
+        :param fail_fast: Indicate nested mappers should stop marshaling at
+            the first invalid field.
+        :param raise_invalid: Indicate invalid data is reported by raising
+            :class:`kim.exception.FieldInvalid`.  When False pipes record the
+            error on their session and return
+            :data:`kim.pipelines.base.INVALID` instead.
+        :param strict: Indicate nested mappers should reject keys of their
+            data that don't belong to any field.
+        :param interned: An optional dict of the string values seen so far
+            while marshaling a batch, shared by every mapper of the batch.
+            See :func:`kim.pipelines.string.intern_string`.
         :return: None
         :rtype: None
 
@@ -330,6 +562,41 @@ class MapperSession(object):
         self.data = data
         self.output = output
         self.partial = partial
+        self.executor = executor
+        self.memo = memo
+        self.cache = cache
+        self.fragments = fragments
+        self.tags = tags
+        self.sources = sources
+        self.changed = changed
+        self.validate_only = validate_only
+        self.getters = getters
+        self.fail_fast = fail_fast
+        self.raise_invalid = raise_invalid
+        self.strict = strict
+        self.interned = interned
+
+    def derive(self, data, output):
+        """Return a new :class:`MapperSession` for ``data`` and ``output`` that
+        belongs to the same mapper and shares the options of this session.
+
+        This is used by fields such as :class:`kim.field.Collection` that run a
+        wrapped field once for every item they contain.
+
+        :param data: The data for the new session
+        :param output: The output for the new session
+        :rtype: :class:`MapperSession`
+        """
+
+        return MapperSession(self.mapper, data, output, partial=self.partial,
+                             executor=self.executor, memo=self.memo,
+                             cache=self.cache, fragments=self.fragments,
+                             tags=self.tags, sources=self.sources,
+                             changed=self.changed,
+                             validate_only=self.validate_only,
+                             getters=self.getters, fail_fast=self.fail_fast,
+                             raise_invalid=self.raise_invalid,
+                             strict=self.strict, interned=self.interned)
 
 
 class Mapper(six.with_metaclass(MapperMeta, object)):
@@ -355,6 +622,12 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
             name = field.String(required=True)
             company = field.Nested('myapp.mappers.CompanyMapper')
 
+    Mapper classes, their fields and their roles are configured once when the
+    class is defined and are not changed by marshaling or serializing, which
+    means mapper classes may be shared freely between threads.  A Mapper
+    instance holds the state of a single call (its ``obj``, ``data`` and
+    ``errors``) and should not be shared.
+
     """
 
     #: The python type this Mapper will marshal to.
@@ -364,6 +637,35 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
     #: dictionary containing the role definitions for this mapper.
     __roles__ = {}
 
+    #: sources used to build the version of an object when caching output.
+    #: See :meth:`get_cache_version`.
+    __cache_version__ = None
+
+    #: sources read only once per object during a serialize call, in addition
+    #: to those of fields defined with ``cache=True``.
+    __cached_sources__ = ()
+
+    #: how marshal builds ``__type__`` from the field values.  None sets each
+    #: field on a new instance, ``'kwargs'`` calls ``__type__(**values)``,
+    #: ``'tuple'`` builds a namedtuple from positional values, ``'dict'``
+    #: updates the ``__dict__`` of a new instance once and True picks one of
+    #: these from ``__type__``, or None for types with data descriptors or
+    #: ORM instrumentation.  Fields with a dotted source or
+    #: ``source='__self__'`` can't be used.  See :meth:`construct`.
+    __construct__ = None
+
+    #: reject keys of the data being marshaled that don't belong to any field
+    #: of the role.  See :meth:`marshal`.
+    __strict__ = False
+
+    #: limits on the size of the data being marshaled.  ``max_depth`` is the
+    #: maximum number of nested mappers below this one,
+    #: ``max_collection_length`` the maximum number of items of a collection
+    #: and ``max_string_length`` the maximum length of the text or bytes
+    #: passed to a string field.  The limits of the top level mapper apply
+    #: to every nested mapper.
+    __limits__ = {}
+
     @classmethod
     def many(cls, **mapper_params):
         """Provide access to a :class:`MapperIterator` to allow multiple
@@ -393,7 +695,8 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
         :param partial: allow pipelines to pull data from an existing source
             or fall back to standard checks.
         :param parent: The parent of this Mapper.  Set internally when a Mapper
-            is being used as a nested field.
+            is being used as a nested field.  Nested mappers inherit the
+            ``limits`` of their parent.
 
         :raises: :class:`MapperError`
         :returns: None
@@ -408,10 +711,103 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
         self.obj = obj
         self.data = data
         self.errors = {}
+        self.changed_fields = None
+        self.collection_changes = {}
+        if parent is not None:
+            self.depth = parent.depth + 1
+            self.limits = parent.limits
+        else:
+            self.depth = 0
+            self.limits = self.__limits__
         self.raw = raw
         self.partial = partial
         self.parent = parent
 
+    @classmethod
+    def get_fingerprint(cls, _seen=None):
+        """Return a fingerprint of the definition of this mapper.
+
+        The fingerprint is a digest of the ``__type__``, fields, field options,
+        pipelines and roles of the mapper, including the definitions of any
+        nested mappers.  Changing any of them changes the fingerprint, which
+        is included in the cache keys used by :meth:`serialize_json` so
+        deploying a changed mapper invalidates the output cached for it.
+
+        :rtype: str
+        """
+
+        fingerprint = cls.__dict__.get('_fingerprint')
+        if fingerprint is not None:
+            return fingerprint
+
+        seen = set(_seen or ()) | set([cls.__name__])
+        described = _describe([
+            cls.__name__, getattr(cls.__type__, '__name__', cls.__type__),
+            cls.__cache_version__,
+            list(cls.fields.items()),
+            sorted(cls.roles.items()),
+        ], seen)
+        fingerprint = hashlib.sha1(described.encode('utf-8')).hexdigest()
+
+        # Mappers nested within themselves are described without their own
+        # fingerprint, only store the fingerprint once it's complete.
+        if not _seen:
+            cls._fingerprint = fingerprint
+        return fingerprint
+
+    @classmethod
+    def record_type(cls, role='__default__', kind='slots'):
+        """Return a compact type with an attribute for every field marshaled
+        by ``role``, for use as the output of :meth:`marshal` with the
+        ``record`` option.
+
+        ``'slots'`` returns a :class:`kim.records.Record` subclass using
+        ``__slots__`` and ``'tuple'`` returns a namedtuple.  Both use much less
+        memory than a dict, support attribute access and are converted to a
+        dict with ``_asdict()``.  Types are created once for each role and
+        kind.
+
+        :param role: name of the role whose fields are included
+        :param kind: ``'slots'`` or ``'tuple'``
+        :raises: :class:`MapperError`
+        :rtype: type
+        """
+
+        if kind not in ('slots', 'tuple'):
+            raise MapperError('record kind must be "slots" or "tuple"')
+
+        record_types = cls.__dict__.get('_record_types')
+        if record_types is None:
+            record_types = cls._record_types = {}
+
+        record_type = record_types.get((role, kind))
+        if record_type is not None:
+            return record_type
+
+        if role not in cls.roles:
+            raise MapperError('%s has no role %s' % (cls.__name__, role))
+        fields = [f for name, f in six.iteritems(cls.fields)
+                  if name in cls.roles[role] and not f.opts.read_only]
+
+        sources = []
+        for field in fields:
+            source = field.opts.source
+            if source == '__self__' or '.' in source:
+                raise MapperError(
+                    '%s.%s can not be stored in a record, its source is %s' %
+                    (cls.__name__, field.name, source))
+            sources.append(source)
+
+        name = '%sRecord' % cls.__name__
+        if kind == 'tuple':
+            record_type = make_tuple_record_type(name, sources)
+        else:
+            record_type = make_record_type(name, sources)
+
+        # Another thread may have created the type in the meantime, always
+        # return the same type.
+        return record_types.setdefault((role, kind), record_type)
+
     @property
     def initial_errors(self):
 
@@ -441,6 +837,116 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
         else:
             return self._get_mapper_type()()
 
+    def _get_construct(self):
+        """Return the way ``__type__`` is built by marshal, resolving
+        ``__construct__ = True`` from ``__type__``.
+
+        :raises: :class:`MapperError`
+        :returns: None, ``'kwargs'``, ``'tuple'`` or ``'dict'``
+        """
+
+        construct = self.__construct__
+        if construct is None:
+            return None
+
+        mapper_type = self._get_mapper_type()
+        if construct is True:
+            if issubclass(mapper_type, tuple) and hasattr(mapper_type, '_fields'):
+                return 'tuple'
+            if (hasattr(mapper_type, '__dataclass_fields__') or
+                    issubclass(mapper_type, dict) or
+                    '__slots__' in vars(mapper_type)):
+                return 'kwargs'
+            if _sets_attributes_through_descriptors(mapper_type):
+                # Each field is set on the object so descriptors and ORM
+                # instrumentation see every change.
+                return None
+            return 'dict'
+
+        if construct not in ('kwargs', 'tuple', 'dict'):
+            raise MapperError(
+                '%s.__construct__ must be one of True, None, "kwargs", '
+                '"tuple" or "dict"' % self.__class__.__name__)
+
+        return construct
+
+    def _get_construct_values(self, fields):
+        """Return the dict fields write their values to when the output is
+        built by :meth:`construct`.  When ``self.obj`` is set the dict holds
+        its current values, so fields such as :class:`kim.field.Nested` and
+        :class:`kim.field.Collection` can update them and unchanged values
+        can be detected.
+        """
+
+        values = {}
+        obj = self.obj
+        if obj is None:
+            return values
+
+        for field in fields:
+            source = field.opts.source
+            value = attr_or_key(obj, source)
+            if value is not None:
+                values[source] = value
+        return values
+
+    def construct(self, values, construct, mapper_type=None):
+        """Build the output of marshal from a dict of ``values`` keyed by field
+        source, in a single call.  When ``self.obj`` is set a copy of it
+        updated with ``values`` is returned for immutable types, or it is
+        updated in place using setattr when ``construct`` is ``'dict'``.
+
+        Override this method to build objects in other ways.
+
+        :param values: dict of marshaled field values
+        :param construct: ``'kwargs'``, ``'tuple'`` or ``'dict'``, see
+            ``__construct__``
+        :param mapper_type: the type to build, defaults to ``__type__``
+        :raises: :class:`MapperError` if the object can not be built from
+            ``values``
+        :returns: the marshaled object
+        """
+
+        if mapper_type is None:
+            mapper_type = self._get_mapper_type()
+        obj = self.obj
+
+        try:
+            if construct == 'dict':
+                if obj is None:
+                    obj = mapper_type()
+                    if not _sets_attributes_through_descriptors(mapper_type):
+                        obj.__dict__.update(values)
+                        return obj
+                for name, value in six.iteritems(values):
+                    # values holds the current value of every field, only
+                    # set those that were replaced.
+                    if getattr(obj, name, None) is not value:
+                        setattr(obj, name, value)
+                return obj
+
+            if obj is not None:
+                if hasattr(obj, '_replace'):
+                    return obj._replace(**values)
+                if hasattr(obj, '__dataclass_fields__'):
+                    import dataclasses
+                    return dataclasses.replace(obj, **values)
+                raise MapperError(
+                    '%s can not update an existing %s, use '
+                    '__construct__ = "dict"' % (self.__class__.__name__,
+                                                mapper_type.__name__))
+
+            if construct == 'tuple':
+                defaults = getattr(mapper_type, '_field_defaults', {})
+                return mapper_type(*[
+                    values[name] if name in values else defaults[name]
+                    for name in mapper_type._fields])
+
+            return mapper_type(**values)
+        except (TypeError, KeyError) as e:
+            raise MapperError('%s could not build %s: %s' % (
+                self.__class__.__name__, mapper_type.__name__, e))
+
     def _get_role(self, name_or_role, deferred_role=None):
         """Resolve a string to a role and check it exists, or check a
         directly passed role is a Role instance and return it.
@@ -496,18 +1002,6 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
         else:
             return role
 
-    def _field_in_data(self, field):
-        """Validate if a field.name appears in the provided data
-
-        :param field: :class:`Field` instance
-        :returns: Boolean
-        :rtype: boolean
-        """
-        for key in self.data.keys():
-            if key == field.name:
-                return True
-        return False
-
     def _get_fields(self, name_or_role, deferred_role=None, for_marshal=False):
         """Returns a list of :class:`Field` instances providing they are
         registered in the specified :class:`Role`.
@@ -523,15 +1017,30 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
         :rtype: list
         """
 
-        role = self._get_role(name_or_role, deferred_role=deferred_role)
-
-        fields = [f for name, f in six.iteritems(self.fields) if name in role]
+        if (isinstance(name_or_role, six.string_types) and
+                deferred_role is None):
+            # The fields of a role name are resolved once for each class.
+            field_plans = self.__class__.__dict__.get('_field_plans')
+            if field_plans is None:
+                field_plans = self.__class__._field_plans = {}
+
+            plan = field_plans.get(name_or_role)
+            if plan is None:
+                role = self._get_role(name_or_role)
+                plan = field_plans[name_or_role] = tuple(
+                    f for name, f in six.iteritems(self.fields) if name in role)
+            fields = list(plan)
+        else:
+            role = self._get_role(name_or_role, deferred_role=deferred_role)
+            fields = [f for name, f in six.iteritems(self.fields)
+                      if name in role]
 
         if self.partial and for_marshal:
             # If this is a partial update, rather than going through all fields
             # in the role, select those fields which are actually present in
             # the data - as long as they're also present in the role.
-            return [f for f in fields if self._field_in_data(f)]
+            keys = set(self.data.keys())
+            return [f for f in fields if f.name in keys]
         else:
             return fields
 
@@ -613,24 +1122,91 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
 
         return self._remove_none(output)
 
-    def get_mapper_session(self, data, output):
+    def get_mapper_session(self, data, output, executor=None, memo=None,
+                           cache=None, fragments=None, tags=None,
+                           sources=None, changed=None, validate_only=False,
+                           getters=True, fail_fast=False, raise_invalid=True,
+                           strict=False, interned=None):
         """Populate and return a new instance of :class:`MapperSession`
 
         :param data: data being Mapped
         :param output: obj mapper is mapping too
+        :param executor: optional executor used to run fields concurrently
+        :param memo: optional memo used to serialize repeated objects once
+        :param cache: optional cache used to reuse output across calls
+        :param fragments: optional cache used to reuse encoded JSON across calls
+        :param tags: optional set collecting the cache tags of the output
+        :param sources: optional dict of memoized source values
+        :param changed: optional set of the names of changed fields
+        :param validate_only: only validate data without writing output
+        :param getters: call getters when only validating data
+        :param fail_fast: stop marshaling nested mappers at the first error
+        :param raise_invalid: raise exceptions for invalid data instead of
+            returning errors from :meth:`kim.field.Field.marshal`
+        :param strict: reject unknown keys in the data of nested mappers
+        :param interned: optional dict used to share equal string values
         :return: :class:`MapperSession <MapperSession>` object
         :rtype: :class:`MapperSession` object
         """
 
-        return MapperSession(self, data, output, partial=self.partial)
+        return MapperSession(self, data, output, partial=self.partial,
+                             executor=executor, memo=memo, cache=cache,
+                             fragments=fragments, tags=tags,
+                             sources=sources, changed=changed,
+                             validate_only=validate_only, getters=getters,
+                             fail_fast=fail_fast, raise_invalid=raise_invalid,
+                             strict=strict, interned=interned)
+
+    def get_cache_version(self):
+        """Return a hashable value identifying the version of ``self.obj``
+        used to key its output in a :class:`kim.cache.SerializationCache`, or
+        None if the output of this mapper should not be cached.
+
+        By default the values found at each source named in
+        ``__cache_version__`` are returned.  Mappers may override this method
+        to compute a version in some other way.
+
+        Usage::
+
+            class UserMapper(Mapper):
+
+                __type__ = User
+                __cache_version__ = ('id', 'updated_at')
+
+        :rtype: tuple
+        """
+
+        sources = self.__cache_version__
+        if sources is None:
+            return None
+
+        return tuple(attr_or_key(self.obj, source) for source in sources)
 
-    def serialize(self, role='__default__', raw=False, deferred_role=None):
+    def serialize(self, role='__default__', raw=False, deferred_role=None,
+                  memo=None, cache=None, fragments=None, tags=None,
+                  sources=None):
         """Serialize ``self.obj`` into a dict according to the fields
         defined on this Mapper.
 
         :param role: specify the role to use when serializing this mapper
         :param raw: instruct the mapper to transform the data before serializing.
             This option overrides the Mapper.raw setting.
+        :param memo: pass True, or a :class:`kim.cache.SerializationMemo`, to
+            serialize each object appearing more than once in this call
+            only once per mapper and role.
+        :param cache: a :class:`kim.cache.SerializationCache` used to reuse the
+            output of this mapper, and any nested mappers, across calls.
+            See :meth:`get_cache_version`.
+        :param fragments: a cache used to store the encoded JSON output of this
+            mapper, and any nested mappers.  This is used by
+            :meth:`serialize_json`.  When passed, the output of any mapper that
+            can be cached is a :class:`kim.encoding.JSONFragment`.
+        :param tags: a set the cache tags of every object included in the
+            output are added to.  This is used by nested mappers to record
+            the objects a cached parent depends on.
+        :param sources: a dict used to memoize the values of cached sources,
+            shared by every mapper serialized during a call.  See the
+            ``cache`` field option and ``__cached_sources__``.
         :raises: :class:`FieldInvalid` :class:`MapperError`
         :returns: dict containing serialized object
         :rtype: mixed
@@ -652,40 +1228,426 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
 
         data = self.obj
         transform_data = raw or self.raw
+
+        if memo is True:
+            memo = SerializationMemo()
+
+        if memo is not None:
+            memo_key = (self.__class__, _role_key(role, deferred_role),
+                        bool(transform_data), fragments is not None)
+            memoized = memo.get(data, memo_key, tags=tags)
+            if memoized is not None:
+                return memoized
+
+        store = fragments if fragments is not None else cache
+
+        # When the cache tracks changes to objects, collect the tags of this
+        # object and every nested object so the entry can be invalidated.
+        own_tags = tag = changed = None
+        if getattr(store, 'tag', None) is not None:
+            own_tags = set()
+            tag = store.tag(self.obj)
+            if tag is not None:
+                own_tags.add(tag)
+            # Objects changed but not yet invalidated, entries containing any
+            # of them are neither served nor stored.
+            if getattr(store, 'changed', None) is not None:
+                changed = store.changed(self.obj)
+
+        cache_key = fragment_key = None
+        if store is not None:
+            version = self.get_cache_version()
+            if version is None and tag is not None:
+                version = ('tag', tag)
+
+            if version is not None:
+                role_key = _role_key(role, deferred_role)
+                if fragments is not None:
+                    fragment_key = ('json', self.__class__.__name__,
+                                    self.get_fingerprint(), role_key,
+                                    bool(transform_data), version)
+                    cached = self._cache_get(fragments, fragment_key,
+                                             own_tags, changed)
+                    if cached is not None:
+                        cached = JSONFragment(cached)
+                else:
+                    cache_key = (self.__class__.__name__, role_key,
+                                 bool(transform_data), version)
+                    cached = self._cache_get(cache, cache_key, own_tags,
+                                             changed)
+
+                if cached is not None:
+                    if memo is not None:
+                        memo.set(self.obj, memo_key, cached, tags=own_tags)
+                    if tags is not None and own_tags:
+                        tags.update(own_tags)
+                    return cached
+
         if transform_data:
             data = self.transform_data(data)
 
-        mapper_session = self.get_mapper_session(data, output)
+        if sources is None:
+            sources = {}
+
+        mapper_session = self.get_mapper_session(
+            data, output, memo=memo, cache=cache, fragments=fragments,
+            tags=own_tags, sources=sources)
         for field in self._get_fields(role, deferred_role=deferred_role):
             field.serialize(mapper_session)
 
+        # Output containing a changed object isn't stored, it would be served
+        # after the change is discarded.  The tags still reach the parent so
+        # it isn't stored either.
+        cacheable = not changed or own_tags.isdisjoint(changed)
+
+        if fragment_key is not None:
+            output = dumps(output)
+            if cacheable:
+                self._cache_set(fragments, fragment_key, output, own_tags)
+        if memo is not None:
+            memo.set(self.obj, memo_key, output, tags=own_tags)
+        if cache_key is not None and cacheable:
+            self._cache_set(cache, cache_key, output, own_tags)
+        if tags is not None and own_tags:
+            tags.update(own_tags)
+
         return output
 
-    def marshal(self, role='__default__'):
+    @staticmethod
+    def _cache_get(store, key, tags, stale=None):
+        """Get ``key`` from ``store``, adding the tags of the entry to
+        ``tags``.  Entries containing any of the ``stale`` tags are ignored.
+        Caches without tag support are called without tags.
+        """
+
+        if tags is None and not stale:
+            return store.get(key)
+        return store.get(key, tags=tags, stale=stale)
+
+    @staticmethod
+    def _cache_set(store, key, output, tags):
+
+        if tags is None:
+            store.set(key, output)
+        else:
+            store.set(key, output, tags=tags)
+
+    def serialize_json(self, role='__default__', raw=False, deferred_role=None,
+                       memo=None, cache=None):
+        """Serialize ``self.obj`` directly into a JSON string.
+
+        When a ``cache`` is given the encoded JSON of this mapper, and of every
+        nested mapper, is stored in the cache.  Cached fragments are spliced
+        straight into the output without being serialized or encoded again,
+        so the same product embedded in thousands of order lines is only
+        encoded once.
+
+        Entries are keyed by the :meth:`get_fingerprint` of the mapper, the
+        role and :meth:`get_cache_version`, so changing a mapper definition
+        automatically invalidates the fragments stored for it.
+
+        :param role: specify the role to use when serializing this mapper
+        :param raw: instruct the mapper to transform the data before serializing.
+        :param memo: pass True, or a :class:`kim.cache.SerializationMemo`, to
+            encode objects repeated within this call only once.
+        :param cache: a :class:`kim.cache.SerializationCache` used to store
+            encoded fragments across calls.
+        :returns: the encoded JSON output
+        :rtype: :class:`kim.encoding.JSONFragment`
+
+        Usage::
+
+            >>> mapper = OrderMapper(obj=order)
+            >>> mapper.serialize_json(cache=cache)
+            '{"id":1,"lines":[{"product":{"id":4,"name":"kim"},"qty":2}]}'
+
+        .. note::
+
+            Pipes that run after a nested field is serialized will receive a
+            :class:`kim.encoding.JSONFragment` rather than a dict when the
+            nested mapper can be cached.
+        """
+
+        return dumps(self.serialize(
+            role=role, raw=raw, deferred_role=deferred_role, memo=memo,
+            fragments=cache))
+
+    def serialize_roles(self, roles, raw=False, deferred_role=None, memo=None,
+                        sources=None):
+        """Serialize ``self.obj`` once for each role in ``roles``.
+
+        Every field in any of the roles is serialized only once, the output
+        for each role is then made from the fields in that role.  This is
+        much cheaper than calling :meth:`serialize` for each role when the
+        roles share most of their fields.
+
+        :param roles: list of role names or :class:`kim.role.Role` instances
+        :param raw: instruct the mapper to transform the data before serializing.
+        :param deferred_role: a role applied to every role in ``roles``
+        :param memo: pass True, or a :class:`kim.cache.SerializationMemo`, to
+            serialize objects repeated within this call only once.
+        :param sources: a dict used to memoize the values of cached sources.
+        :raises: :class:`FieldInvalid` :class:`MapperError`
+        :returns: list containing the output for each role in ``roles``
+        :rtype: list
+
+        Usage::
+
+            >>> public, owner = UserMapper(obj=user).serialize_roles(
+            ...     ['public', 'owner'])
+
+        .. note::
+
+            The output of nested mappers is shared by every role.
+        """
+
+        if self.obj is None:
+            raise MapperError(
+                'Attmpted to serialize None, have you passed a valid obj param to %s()?'
+                % self.__class__.__name__)
+
+        resolved = [self._get_role(role, deferred_role=deferred_role)
+                    for role in roles]
+        selected = [(name, field) for name, field in six.iteritems(self.fields)
+                    if any(name in role for role in resolved)]
+
+        data = self.obj
+        if raw or self.raw:
+            data = self.transform_data(data)
+
+        if memo is True:
+            memo = SerializationMemo()
+
+        if sources is None:
+            sources = {}
+
+        output = {}
+        mapper_session = self.get_mapper_session(
+            data, output, memo=memo, sources=sources)
+        for name, field in selected:
+            field.serialize(mapper_session)
+
+        results = []
+        for role in resolved:
+            results.append(dict(
+                (field.name, output[field.name]) for name, field in selected
+                if name in role and field.name in output))
+
+        return results
+
+    def reserialize(self, previous, changed_sources, role='__default__',
+                    raw=False, deferred_role=None):
+        """Update ``previous``, the output of an earlier call to
+        :meth:`serialize`, after the sources in ``changed_sources`` of
+        ``self.obj`` have changed.
+
+        Only the fields whose source is affected by the changes are
+        serialized again.  A field is affected when its source, a parent of
+        its source or a child of its source has changed, so a change to
+        ``sub.x`` reserializes a nested field with the source ``sub``.  Fields
+        using ``__self__`` are always serialized again.
+
+        :param previous: the output previously serialized for this role
+        :param changed_sources: iterable of the source paths that have changed
+        :param role: the role ``previous`` was serialized with
+        :param raw: instruct the mapper to transform the data before serializing.
+        :param deferred_role: the deferred role ``previous`` was serialized with
+        :raises: :class:`FieldInvalid` :class:`MapperError`
+        :returns: a tuple of the updated output and a list of JSON Patch
+            (RFC 6902) operations describing the difference from ``previous``
+        :rtype: tuple
+
+        Usage::
+
+            >>> output, patch = mapper.reserialize(previous, {'status'})
+            >>> patch
+            [{'op': 'replace', 'path': '/status', 'value': 'shipped'}]
+
+        .. seealso::
+            :func:`kim.sqa.changed_sources`
+        """
+
+        if self.obj is None:
+            raise MapperError(
+                'Attmpted to serialize None, have you passed a valid obj param to %s()?'
+                % self.__class__.__name__)
+
+        changed_sources = set(changed_sources)
+        affected = [
+            field for field in self._get_fields(role, deferred_role=deferred_role)
+            if _source_changed(field.opts.source, changed_sources)]
+
+        output = dict(previous)
+        if not affected:
+            return output, []
+
+        data = self.obj
+        if raw or self.raw:
+            data = self.transform_data(data)
+
+        changed = {}
+        mapper_session = self.get_mapper_session(data, changed, sources={})
+        for field in affected:
+            field.serialize(mapper_session)
+
+        patch = []
+        for field in affected:
+            name = field.name
+            if name in changed:
+                output[name] = changed[name]
+                if name in previous:
+                    patch.extend(diff(previous[name], changed[name], (name, )))
+                else:
+                    patch.append({'op': 'add', 'path': make_pointer([name]),
+                                  'value': changed[name]})
+            elif name in previous:
+                del output[name]
+                patch.append({'op': 'remove', 'path': make_pointer([name])})
+
+        return output, patch
+
+    def marshal(self, role='__default__', executor=None, only_changed=False,
+                fail_fast=False, record=None, reuse_input=False, strict=None):
         """Marshal ``self.data`` into ``self.obj`` according to the fields
         defined on this Mapper.
 
+        :param role: specify the role to use when marshaling this mapper
+        :param executor: optional :class:`concurrent.futures.Executor`.  When
+            provided the fields of this mapper, and the items of any
+            :class:`kim.field.Collection`, are marshaled concurrently using the
+            executor.  This is useful when getters or custom pipes perform
+            blocking I/O.  Errors are still collected in field order.
+        :param only_changed: only set fields on the output whose value differs
+            from the current value, leaving unchanged attributes untouched.
+            The names of the fields that were set are stored in
+            :attr:`changed_fields`.  This also applies to nested mappers.
+        :param fail_fast: stop at the first invalid field, raising
+            :class:`MappingInvalid` with only its error.  Remaining fields and
+            :meth:`validate` are not run.  This also applies to nested
+            mappers.  Fields already submitted to an ``executor`` may still
+            run.
+        :param record: ``'slots'`` or ``'tuple'`` to return an instance of
+            :meth:`record_type` for ``role`` instead of ``__type__``.  Nested
+            mappers still return their own ``__type__``.
+        :param reuse_input: allow ``self.data`` to be returned as the output,
+            updated in place, when ``__type__`` is dict and every key of
+            ``self.data`` is a field that is passed through unchanged.  The
+            input may be partially updated when it is invalid.
+        :param strict: reject keys of ``self.data`` that don't belong to any
+            field of ``role`` before any field is marshaled, reporting an
+            ``unknown_field`` error for each.  This also applies to nested
+            mappers.  Defaults to ``__strict__``.
         :returns: Object of ``__type__`` populated with data
+
+        Usage::
+
+            >>> with ThreadPoolExecutor(max_workers=8) as pool:
+            ...     mapper.marshal(executor=pool)
+
+        .. note::
+
+            When an executor is used each field is set on the output object
+            from the thread that marshaled it.
+        """
+
+        output = self._marshal(role=role, executor=executor,
+                               only_changed=only_changed, fail_fast=fail_fast,
+                               record=record, reuse_input=reuse_input,
+                               strict=strict)
+
+        if self.errors:
+            raise MappingInvalid(self.errors)
+
+        return output
+
+    def _marshal(self, role='__default__', executor=None, only_changed=False,
+                 fail_fast=False, record=None, reuse_input=False, strict=None,
+                 interned=None):
+        """Marshal ``self.data`` into ``self.obj`` without raising for invalid
+        data.  Errors are collected in ``self.errors``, which the caller must
+        check.
+
+        ``interned`` is an optional dict shared by every mapper of a bulk
+        marshal, see :meth:`MapperIterator.marshal`.
+
+        Builtin pipes report invalid data by returning
+        :data:`kim.pipelines.base.INVALID`, so no exception is raised or caught
+        for each invalid field.  Exceptions raised by custom pipes and
+        :meth:`validate` are still collected.
+
+        .. seealso::
+            :meth:`marshal`
         """
 
         # Polymorphic mappers do some validation on incoming data.
         # if we have any initial_errors present, dont' bother continuing.
         if self.initial_errors is not None:
-            raise MappingInvalid(self.initial_errors)
+            self.errors = self.initial_errors
+            return None
 
-        output = self._get_obj()
-        data = self.data
+        if strict is None:
+            strict = self.__strict__
+        if strict and self._reject_unknown_keys(role):
+            return None
 
+        # Collect the values in a dict and build the object in one call once
+        # every field is valid.
+        mapper_type = None
+        if record is not None:
+            mapper_type = self.record_type(role, record)
+            construct = 'tuple' if record == 'tuple' else 'kwargs'
+        else:
+            construct = self._get_construct()
+        data = self.data
         fields = self._get_fields(role, for_marshal=True)
 
-        for field in fields:
+        passthrough = None
+        if type(data) is dict and not only_changed:
+            passthrough = self._get_passthrough_fields(fields)
+
+        if construct is not None:
+            output = self._get_construct_values(fields)
+        elif (reuse_input and passthrough and self.obj is None and
+                self._get_mapper_type() is dict and
+                all(key in passthrough for key in data)):
+            # Every key of the input is a field that may be passed through,
+            # so the input holds nothing that shouldn't be in the output.
+            output = data
+        else:
+            output = self._get_obj()
+
+        if passthrough and type(output) is dict:
+            fields = self._copy_passthrough(fields, passthrough, data, output)
+
+        changed = None
+        if only_changed:
+            changed = self.changed_fields = set()
+
+        def marshal_field(field):
+            return field.marshal(self.get_mapper_session(
+                data, output, executor=executor, changed=changed,
+                fail_fast=fail_fast, raise_invalid=False, strict=strict,
+                interned=interned))
+
+        results = map_in_executor(executor, marshal_field, fields)
+        for field, result in zip(fields, results):
             try:
-                field.marshal(self.get_mapper_session(data, output))
+                error = result()
             except FieldInvalid as e:
-                self.errors[field.name] = e.message
+                error = e.message
             except MappingInvalid as e:
                 # handle errors from nested mappers.
-                self.errors[field.name] = e.errors
+                error = e.errors
+
+            if error is not None:
+                self.errors[field.name] = error
+                if fail_fast:
+                    return output
+
+        if construct is not None:
+            if self.errors:
+                return output
+            output = self.construct(output, construct, mapper_type=mapper_type)
 
         # Call top level mapper validator for validations involving more
         # than one field
@@ -696,11 +1658,413 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
         except MappingInvalid as e:
             self.errors = e.errors
 
+        return output
+
+    def _get_allowed_keys(self, role):
+        """Return the set of the names of the fields of ``role``.  The set is
+        built once for each role name.
+        """
+
+        if not isinstance(role, six.string_types):
+            return set(field.name for field in self._get_fields(role))
+
+        allowed_keys = self.__class__.__dict__.get('_allowed_keys')
+        if allowed_keys is None:
+            allowed_keys = self.__class__._allowed_keys = {}
+
+        allowed = allowed_keys.get(role)
+        if allowed is None:
+            allowed = allowed_keys[role] = frozenset(
+                field.name for field in self._get_fields(role))
+        return allowed
+
+    def _reject_unknown_keys(self, role):
+        """Add an ``unknown_field`` error for every key of ``self.data`` that
+        isn't the name of a field of ``role``.
+
+        :returns: True if any unknown key was found
+        """
+
+        data = self.data
+        if not self._data_supports_transform(data):
+            return False
+
+        unknown = set(data.keys()).difference(self._get_allowed_keys(role))
+        for key in unknown:
+            self.errors[key] = DEFAULT_ERROR_MSGS['unknown_field']
+        return bool(unknown)
+
+    @classmethod
+    def _get_passthrough_types(cls):
+        """Return a dict of the names of the fields of this mapper that may be
+        passed through when marshaling, and the types they pass through.
+
+        .. seealso::
+            :meth:`kim.field.Field.get_passthrough_types`
+        """
+
+        passthrough = cls.__dict__.get('_passthrough')
+        if passthrough is None:
+            passthrough = {}
+            for name, field in six.iteritems(cls.fields):
+                passthrough_types = field.get_passthrough_types()
+                if passthrough_types:
+                    passthrough[name] = passthrough_types
+            cls._passthrough = passthrough
+        return passthrough
+
+    def _get_passthrough_fields(self, fields):
+        """Return a dict of the types passed through by each of ``fields``
+        that may be passed through.
+        """
+
+        passthrough = self._get_passthrough_types()
+        if not passthrough:
+            return None
+
+        return dict((field.name, passthrough[field.name])
+                    for field in fields if field.name in passthrough)
+
+    def _copy_passthrough(self, fields, passthrough, data, output):
+        """Copy the values of ``fields`` that are valid without running their
+        marshal pipelines from ``data`` to ``output`` in one step and return
+        the fields that still need to be marshaled.
+        """
+
+        max_length = self.limits.get('max_string_length')
+
+        values = {}
+        remaining = []
+        for field in fields:
+            passthrough_types = passthrough.get(field.name)
+            if passthrough_types is not None:
+                value = data.get(field.name)
+                if type(value) in passthrough_types and (
+                        max_length is None or
+                        not isinstance(value, six.string_types) or
+                        len(value) <= max_length):
+                    values[field.name] = value
+                    continue
+            remaining.append(field)
+
+        if output is not data:
+            output.update(values)
+        return remaining
+
+    def validate_data(self, role='__default__', getters=False, strict=None):
+        """Validate ``self.data`` without marshaling it.
+
+        Every field is run through its marshal pipeline, including nested
+        mappers and collections, but ``__type__`` is never instantiated and
+        nothing is written to an output object.  This is much cheaper than
+        calling :meth:`marshal` when only the errors are needed.
+
+        Getters of nested fields are not called unless ``getters`` is True,
+        the nested data is validated by the nested mapper instead.  As the
+        data of a nested field with a getter may only identify an existing
+        object, it's accepted as is when the field can't create or update
+        objects, and only the keys supplied are validated when it can't
+        update the object found by the getter.
+        :meth:`validate` is not called as there is no output object.
+
+        :param role: specify the role to use when validating this mapper
+        :param getters: call the getters of nested fields, reporting an error
+            when no object is found and the field doesn't allow creating one
+        :param strict: report keys that don't belong to any field, see
+            :meth:`marshal`
+        :returns: dict of errors, empty when the data is valid
+        :rtype: dict
+
+        Usage::
+
+            >>> errors = UserMapper(data=request.json).validate_data()
+            >>> if errors:
+            ...     return 400, errors
+        """
+
+        if self.initial_errors is not None:
+            self.errors = self.initial_errors
+            return self.errors
+
+        if strict is None:
+            strict = self.__strict__
+        if strict and self._reject_unknown_keys(role):
+            return self.errors
+
+        mapper_session = self.get_mapper_session(
+            self.data, {}, validate_only=True, getters=getters,
+            raise_invalid=False, strict=strict)
+
+        for field in self._get_fields(role, for_marshal=True):
+            try:
+                error = field.marshal(mapper_session)
+            except FieldInvalid as e:
+                error = e.message
+            except MappingInvalid as e:
+                error = e.errors
+
+            if error is not None:
+                self.errors[field.name] = error
+
+        return self.errors
+
+    def marshal_patch(self, ops, role='__default__'):
+        """Apply a JSON Patch (RFC 6902) to ``self.obj``.
+
+        Each operation is routed to the field named by the first token of its
+        path, only the fields touched by the patch are marshaled and
+        validated.  Paths may continue into :class:`kim.field.Nested` fields
+        and into the items of a :class:`kim.field.Collection` of nested
+        fields, where the nested mapper applies the rest of the path.  Items
+        are addressed by index, or by the value of ``unique_on`` when the
+        collection defines it.  ``-`` may be used to append to a collection.
+
+        The ``add``, ``replace`` and ``remove`` operations are supported.
+        Removing a field marshals it as None.  Nested objects and collection
+        items can only be changed in place when the nested field allows
+        ``allow_updates_in_place`` or ``allow_partial_updates``.
+
+        :param ops: list of JSON Patch operations
+        :param role: specify the role to use when marshaling this mapper
+        :raises: :class:`MappingInvalid`
+        :returns: ``self.obj``
+
+        Usage::
+
+            >>> mapper = OrderMapper(obj=order)
+            >>> mapper.marshal_patch([
+            ...     {'op': 'replace', 'path': '/status', 'value': 'shipped'},
+            ...     {'op': 'replace', 'path': '/lines/2/qty', 'value': 4},
+            ...     {'op': 'add', 'path': '/lines/-', 'value': {'qty': 1}},
+            ... ])
+
+        .. note::
+
+            Operations are applied to ``self.obj`` in order, operations
+            preceding an invalid operation will already have been applied
+            when :class:`MappingInvalid` is raised.  An operation adding a
+            duplicate ``unique_on`` key to a collection is rejected before the
+            collection is changed.
+        """
+
+        if self.obj is None:
+            raise MapperError(
+                'marshal_patch requires an obj to patch, have you passed a '
+                'valid obj param to %s()?' % self.__class__.__name__)
+
+        output = self.obj
+        fields = dict((f.name, f) for f in self._get_fields(role))
+        # Maps the unique_on keys of each patched collection to the index of
+        # their item, built once and updated as operations are applied.
+        indexes = {}
+
+        for op in ops:
+            try:
+                tokens = parse_pointer(op.get('path', ''))
+            except ValueError:
+                tokens = []
+
+            field = fields.get(tokens[0]) if tokens else None
+            if field is None:
+                self.errors[op.get('path', '')] = \
+                    DEFAULT_ERROR_MSGS['invalid_path']
+                continue
+            if field.opts.read_only:
+                continue
+
+            try:
+                self._patch_field(field, output, op.get('op'), tokens[1:],
+                                  op.get('value'), indexes)
+            except FieldInvalid as e:
+                self.errors[field.name] = e.message
+            except MappingInvalid as e:
+                self.errors[field.name] = e.errors
+
+        try:
+            self.validate(output)
+        except FieldInvalid as e:
+            self.errors[e.field.name] = e.message
+        except MappingInvalid as e:
+            self.errors = e.errors
+
         if self.errors:
             raise MappingInvalid(self.errors)
 
         return output
 
+    def _patch_field(self, field, output, op, tokens, value, indexes):
+        """Apply a single patch operation to ``field``.  ``tokens`` is the
+        remainder of the path after the name of the field.  ``indexes`` holds
+        the key to index maps of the collections patched so far.
+        """
+
+        if op not in ('add', 'replace', 'remove'):
+            raise field.invalid('invalid_op')
+
+        if not tokens:
+            if op == 'remove':
+                value = None
+            field.marshal(self.get_mapper_session({field.name: value}, output))
+        elif isinstance(field, Nested):
+            existing = attr_or_key(output, field.opts.source)
+            self._patch_nested(field, existing, op, tokens, value)
+        elif (isinstance(field, Collection) and
+                isinstance(field.opts.field, Nested)):
+            self._patch_collection(field, output, op, tokens, value, indexes)
+        else:
+            raise field.invalid('invalid_path')
+
+    def _patch_nested(self, field, existing, op, tokens, value):
+        """Apply the rest of a patch to ``existing`` using the mapper of the
+        nested ``field``.
+        """
+
+        if existing is None or not (field.opts.allow_updates_in_place or
+                                    field.opts.allow_partial_updates):
+            raise field.invalid('invalid_path')
+
+        nested_mapper = field.get_mapper(as_class=True)(
+            obj=existing, parent=self)
+        nested_mapper.marshal_patch(
+            [{'op': op, 'path': make_pointer(tokens), 'value': value}],
+            role=field.opts.role)
+
+    def _patch_collection(self, field, output, op, tokens, value, indexes):
+        """Apply a patch to an item of a :class:`kim.field.Collection` of
+        nested fields.
+
+        When the collection defines ``unique_on`` the key an operation adds
+        or replaces is checked before the collection is changed, so a
+        rejected operation leaves it untouched.
+        """
+
+        wrapped_field = field.opts.field
+        items = attr_or_key(output, field.opts.source)
+        if items is None:
+            items = []
+            set_attr_or_key(output, field.opts.source, items)
+
+        unique_on = field.opts.unique_on
+        index_of = None
+        if unique_on:
+            index_of = indexes.get(field.name)
+            if index_of is None:
+                index_of = indexes[field.name] = self._patch_keys(field, items)
+
+        token = tokens[0]
+        if op == 'add' and len(tokens) == 1:
+            if token == '-':
+                index = len(items)
+            else:
+                index = self._patch_index(field, items, token, insert=True)
+            item = self._patch_item(wrapped_field, value)
+            if index_of is not None:
+                key = self._patch_key(field, item)
+                if key in index_of:
+                    raise field.invalid(error_type='duplicates')
+                if index < len(items):
+                    self._shift_patch_keys(index_of, index, 1)
+                index_of[key] = index
+            items.insert(index, item)
+            return
+
+        index = self._patch_index(field, items, token, index_of=index_of)
+        if op == 'remove' and len(tokens) == 1:
+            del items[index]
+            if index_of is not None:
+                del index_of[token]
+                self._shift_patch_keys(index_of, index, -1)
+            return
+
+        if index_of is not None:
+            # The key of the item only changes when the whole item or its
+            # unique_on value is replaced.
+            new_key = None
+            if len(tokens) == 1:
+                new_key = self._patch_key(field, value)
+            elif len(tokens) == 2 and tokens[1] == unique_on and \
+                    op != 'remove' and value is not None:
+                new_key = six.text_type(value)
+            if new_key not in (None, token) and new_key in index_of:
+                raise field.invalid(error_type='duplicates')
+
+        if len(tokens) > 1:
+            self._patch_nested(
+                wrapped_field, items[index], op, tokens[1:], value)
+        else:
+            items[index] = self._patch_item(
+                wrapped_field, value, items[index])
+
+        if index_of is not None:
+            key = self._patch_key(field, items[index])
+            if key != token:
+                if key in index_of:
+                    raise field.invalid(error_type='duplicates')
+                del index_of[token]
+                index_of[key] = index
+
+    def _patch_keys(self, field, items):
+        """Return a dict mapping the ``unique_on`` key of every item in
+        ``items`` to its index.
+        """
+
+        index_of = {}
+        for index, item in enumerate(items):
+            key = self._patch_key(field, item)
+            if key in index_of:
+                raise field.invalid(error_type='duplicates')
+            index_of[key] = index
+        return index_of
+
+    @staticmethod
+    def _patch_key(field, item):
+        """Return the ``unique_on`` key of ``item`` as text so it can be
+        compared with the tokens of a path.
+        """
+
+        if item is None:
+            return None
+        key = attr_or_key(item, field.opts.unique_on)
+        if key is None:
+            return None
+        return six.text_type(key)
+
+    @staticmethod
+    def _shift_patch_keys(index_of, start, step):
+        """Move the index of every key at or after ``start`` by ``step``.
+        """
+
+        for key, index in six.iteritems(index_of):
+            if index >= start:
+                index_of[key] = index + step
+
+    def _patch_index(self, field, items, token, insert=False, index_of=None):
+        """Return the index of the item in ``items`` addressed by ``token``.
+        """
+
+        if index_of is not None and not insert:
+            index = index_of.get(token)
+            if index is not None:
+                return index
+        elif token.isdigit():
+            index = int(token)
+            if index < len(items) or (insert and index == len(items)):
+                return index
+
+        raise field.invalid('invalid_path')
+
+    def _patch_item(self, wrapped_field, value, existing=None):
+        """Marshal ``value`` through the field wrapped by a collection,
+        updating ``existing`` if the field allows it.
+        """
+
+        item_output = {}
+        if existing is not None:
+            item_output[wrapped_field.opts.source] = existing
+
+        wrapped_field.marshal(self.get_mapper_session(value, item_output))
+        return item_output[wrapped_field.opts.source]
+
     def validate(self, output):
         """Mappers may subclass this method to perform top-level validation
         on multiple related fields, raising `FieldInvalid` or `MappingInvalid`
@@ -711,6 +2075,37 @@ class Mapper(six.with_metaclass(MapperMeta, object)):
         """
         pass
 
+    @classmethod
+    def validate_many(cls, outputs):
+        """Mappers may subclass this method to validate the objects marshaled
+        by :meth:`MapperIterator.marshal` together, for example checking a
+        field is unique across the batch and the database with a single
+        query.  It is only called with objects whose fields and
+        :meth:`validate` are valid.
+
+        Usage::
+
+            class UserMapper(Mapper):
+                __type__ = User
+
+                email = field.String()
+
+                @classmethod
+                def validate_many(cls, outputs):
+                    emails = dict((o.email, i) for i, o in outputs.items())
+                    existing = User.query.filter(
+                        User.email.in_(emails)).values(User.email)
+                    return dict((emails[email], {'email': 'already exists'})
+                                for email, in existing)
+
+        :param outputs: dict of marshaled objects by their index in the data
+            passed to :meth:`MapperIterator.marshal`
+        :returns: dict of errors for each invalid object by index, such as
+            ``{3: {'email': 'already exists'}}``
+        :rtype: dict
+        """
+        return {}
+
 
 class PolymorphicMapper(Mapper):
     """PolymorphicMappers build on the normal Mapper system to provide functionality for
@@ -779,6 +2174,33 @@ class PolymorphicMapper(Mapper):
 
         return cls._polymorphic_opts['polymorphic_on']
 
+    @classmethod
+    def many(cls, **mapper_params):
+        """Provide access to a :class:`PolymorphicMapperIterator` when called
+        on the polymorphic base mapper, or a :class:`MapperIterator` when
+        called on one of its identities.
+
+        :param mapper_params: dict of params passed to each new instance of the mapper.
+        :rtype: :class:`MapperIterator`
+        """
+
+        if cls.is_polymorphic_base():
+            return PolymorphicMapperIterator(cls, **mapper_params)
+
+        return super(PolymorphicMapper, cls).many(**mapper_params)
+
+    @classmethod
+    def _invalid_mapper(cls, error, **mapper_params):
+        """Return a new instance of this mapper that fails to marshal with
+        ``error`` as the error of the polymorphic_on field.
+        """
+
+        mapper = super(PolymorphicMapper, cls).__new__(cls)
+        setattr(mapper, '_initial_errors',
+                {cls._get_polymorphic_on().opts.source: error})
+        mapper.__init__(**mapper_params)
+        return mapper
+
     def __new__(cls, data=None, obj=None, *args, **kwargs):
         """Create an new instance of a Mapper using the polymorphic_on key defined in
         __mapper__opts__.
@@ -875,6 +2297,9 @@ class MapperIterator(object):
 
         objs = User.query.all()
         results = UserMapper.many().serialize(objs)
+
+    A MapperIterator does not change once it has been constructed, so a single
+    instance may be shared between threads.
     """
 
     def __init__(self, mapper, **mapper_params):
@@ -897,40 +2322,322 @@ class MapperIterator(object):
         :returns: a new :class:`.Mapper`
         """
 
-        self.mapper_params.update({
-            'data': data,
-            'obj': obj
-        })
-        return self.mapper(**self.mapper_params)
+        # Build a new dict of params for each mapper rather than updating
+        # self.mapper_params so iterators can be shared between threads.
+        mapper_params = dict(self.mapper_params, data=data, obj=obj)
+        return self.mapper(**mapper_params)
+
+    def _map_items(self, items, func, marshal=False):
+        """Call ``func`` with a new mapper for each item of ``items`` and
+        return an iterable of the results in the same order as ``items``.
+
+        :param items: iterable of objects to serialize or data to marshal
+        :param func: callable accepting a :class:`.Mapper`
+        :param marshal: True when ``items`` are data to marshal
+        """
+
+        for item in items:
+            if marshal:
+                mapper = self.get_mapper(data=item)
+            else:
+                mapper = self.get_mapper(obj=item)
+            yield func(mapper)
 
-    def serialize(self, objs, role='__default__', deferred_role=None):
+    def serialize(self, objs, role='__default__', deferred_role=None,
+                  memo=None, cache=None):
         """Serializes each item in ``objs`` creating a new mapper each time.
 
         :param objs: iterable of objects to serialize
         :param role: name of a role to use when serializing
+        :param memo: pass True, or a :class:`kim.cache.SerializationMemo`, to
+            serialize every object appearing more than once in ``objs``, or
+            nested inside of them, only once for the whole batch.
+        :param cache: a :class:`kim.cache.SerializationCache` used to reuse
+            output across calls.
 
         :returns: list of serialized objects
         """
 
-        output = []  # TODO should this be user defined?
-        for obj in objs:
-            output.append(self.get_mapper(obj=obj).serialize(
+        if memo is True:
+            memo = SerializationMemo()
+
+        # Source values are memoized for the whole batch.
+        sources = {}
+
+        def serialize_mapper(mapper):
+            return mapper.serialize(
                 role=role,
-                deferred_role=deferred_role))
+                deferred_role=deferred_role,
+                memo=memo,
+                cache=cache,
+                sources=sources)
+
+        # TODO should this be user defined?
+        return list(self._map_items(objs, serialize_mapper))
+
+    def serialize_json(self, objs, role='__default__', deferred_role=None,
+                       memo=None, cache=None):
+        """Serializes each item in ``objs`` into a single JSON array.
+
+        .. seealso::
+            :meth:`Mapper.serialize_json`
+
+        :returns: the encoded JSON output
+        :rtype: :class:`kim.encoding.JSONFragment`
+        """
+
+        if memo is True:
+            memo = SerializationMemo()
+
+        sources = {}
+
+        def serialize_mapper(mapper):
+            return mapper.serialize(
+                role=role,
+                deferred_role=deferred_role,
+                memo=memo,
+                fragments=cache,
+                sources=sources)
+
+        return dumps(list(self._map_items(objs, serialize_mapper)))
+
+    def serialize_roles(self, objs, roles, deferred_role=None, memo=None):
+        """Serializes each item in ``objs`` once for each role in ``roles``.
+
+        .. seealso::
+            :meth:`Mapper.serialize_roles`
+
+        :param objs: iterable of objects to serialize
+        :param roles: list of role names or :class:`kim.role.Role` instances
+        :returns: list containing a list of serialized objects for each role
+            in ``roles``
+        :rtype: list
+        """
+
+        if memo is True:
+            memo = SerializationMemo()
+
+        sources = {}
+
+        def serialize_mapper(mapper):
+            return mapper.serialize_roles(
+                roles, deferred_role=deferred_role, memo=memo, sources=sources)
+
+        output = [[] for role in roles]
+        for views in self._map_items(objs, serialize_mapper):
+            for results, view in zip(output, views):
+                results.append(view)
 
         return output
 
-    def marshal(self, data, role='__default__'):
+    def marshal(self, data, role='__default__', executor=None,
+                only_changed=False, fail_fast=False, collect_errors=False,
+                max_errors=None, record=None, reuse_input=False,
+                strict=None, bulk=False):
         """Marshals each item in ``data`` creating a new mapper each time.
 
+        By default :class:`MappingInvalid` is raised for the first invalid
+        item.  With ``collect_errors`` every item is marshaled and a tuple of
+        the valid outputs and a dict mapping the index of each invalid item to
+        its errors is returned instead.
+
         :param objs: iterable of objects to marshal
         :param role: name of a role to use when marshaling
+        :param executor: optional :class:`concurrent.futures.Executor` used to
+            marshal the items concurrently.
+        :param only_changed: only set fields whose value has changed, see
+            :meth:`Mapper.marshal`
+        :param fail_fast: stop each item at its first invalid field, see
+            :meth:`Mapper.marshal`
+        :param collect_errors: marshal every item, collecting errors rather
+            than raising for the first invalid item
+        :param max_errors: optional maximum number of invalid items to keep
+            errors for when ``collect_errors`` is set.  Later invalid items are
+            still left out of the output but their errors are discarded.
+        :param record: ``'slots'`` or ``'tuple'`` to marshal each item into
+            an instance of :meth:`Mapper.record_type`, which uses much less
+            memory than a dict when marshaling many items
+        :param reuse_input: allow each item of ``data`` to be returned as its
+            output, see :meth:`Mapper.marshal`
+        :param strict: reject unknown keys, see :meth:`Mapper.marshal`
+        :param bulk: reduce the memory used by the output when marshaling
+            many items.  Equal values of String fields with the ``intern``
+            option, which is the default for fields with ``choices``, share a
+            single copy across the batch and the cyclic garbage collector is
+            paused while the batch is marshaled.
+
+        :raises: :class:`MappingInvalid` with the errors of the first invalid
+            item, or with the errors returned by :meth:`Mapper.validate_many`
+            by index, unless ``collect_errors`` is set
+        :returns: list of marshaled objects, or a tuple of the list of valid
+            marshaled objects and a dict of errors by index when
+            ``collect_errors`` is set
+
+        Usage::
 
-        :returns: list of marshaled objects
+            >>> objs, errors = UserMapper.many().marshal(
+            ...     rows, collect_errors=True, max_errors=100)
+            >>> errors
+            {3: {'email': 'This is a required field'}}
         """
 
+        params = dict(role=role, executor=executor, only_changed=only_changed,
+                      fail_fast=fail_fast, collect_errors=collect_errors,
+                      max_errors=max_errors, record=record,
+                      reuse_input=reuse_input, strict=strict)
+        if not bulk:
+            return self._marshal_many(data, **params)
+
+        # Equal values are interned for the whole batch.
+        with paused_gc():
+            return self._marshal_many(data, interned={}, **params)
+
+    def _marshal_many(self, data, role, executor, only_changed, fail_fast,
+                      collect_errors, max_errors, record, reuse_input, strict,
+                      interned=None):
+        """Marshal each item in ``data``, see :meth:`marshal`."""
+
+        def marshal_mapper(mapper):
+            obj = mapper._marshal(role=role, executor=executor,
+                                  only_changed=only_changed,
+                                  fail_fast=fail_fast, record=record,
+                                  reuse_input=reuse_input, strict=strict,
+                                  interned=interned)
+            return obj, mapper.errors
+
+        if executor is None:
+            # Marshal one item at a time so only the output of each item is
+            # kept rather than a mapper for every item.
+            results = self._map_items(data, marshal_mapper, marshal=True)
+        else:
+            mappers = self._map_items(data, lambda mapper: mapper,
+                                      marshal=True)
+            results = (result() for result in
+                       map_in_executor(executor, marshal_mapper, mappers))
+
         output = []  # TODO should this be user defined?
-        for datum in data:
-            output.append(self.get_mapper(data=datum).marshal(role=role))
+        if not collect_errors:
+            for obj, errors in results:
+                if errors:
+                    raise MappingInvalid(errors)
+                output.append(obj)
+
+            if output:
+                errors = self.mapper.validate_many(dict(enumerate(output)))
+                if errors:
+                    raise MappingInvalid(errors)
+            return output
 
-        return output
+        errors = {}
+        valid = OrderedDict()
+        for index, (obj, item_errors) in enumerate(results):
+            if not item_errors:
+                valid[index] = obj
+            elif max_errors is None or len(errors) < max_errors:
+                errors[index] = item_errors
+
+        if valid:
+            batch_errors = self.mapper.validate_many(valid)
+            for index in sorted(batch_errors):
+                valid.pop(index, None)
+                # Keep the field errors of items that were already invalid.
+                if index not in errors and (
+                        max_errors is None or len(errors) < max_errors):
+                    errors[index] = batch_errors[index]
+
+        output.extend(valid.values())
+        return output, errors
+
+
+class PolymorphicMapperIterator(MapperIterator):
+    """A :class:`MapperIterator` for the base of a :class:`PolymorphicMapper`
+    returned by :meth:`PolymorphicMapper.many`.
+
+    Rather than resolving the polymorphic identity of each item as its mapper
+    is created, the items are grouped by identity in a single pass and each
+    group is mapped by the mapper of its identity.  Results are returned in
+    the same order as the items.
+
+    When marshaling, an item whose polymorphic key is missing or is not a
+    known identity is reported as an error of that item, see
+    :meth:`MapperIterator.marshal`.  When serializing, an item without a
+    polymorphic key is serialized by the base mapper and
+    :class:`kim.exception.MapperError` is raised before any item is
+    serialized if an item has an unknown identity.
+    """
+
+    def group(self, items, marshal=False):
+        """Group ``items`` by polymorphic identity.
+
+        :param items: list of objects to serialize or data to marshal
+        :param marshal: True when ``items`` are data to marshal
+        :raises: :class:`MapperError` when serializing an item with an
+            invalid identity
+        :returns: an OrderedDict mapping the mapper of each identity to the
+            indexes of its items and a dict mapping the index of each item
+            without a valid identity to its error
+        :rtype: tuple
+        """
+
+        base = self.mapper
+        identities = base._polymorphic_identities
+
+        groups = OrderedDict()
+        errors = {}
+        for index, item in enumerate(items):
+            try:
+                if marshal:
+                    key = base.get_polymorphic_key(data=item)
+                else:
+                    key = base.get_polymorphic_key(obj=item)
+            except FieldInvalid as e:
+                errors[index] = e.message
+                continue
+            except MappingInvalid as e:
+                # Marshaling is not allowed by the base mapper.
+                errors[index] = e.errors
+                continue
+
+            mapper = identities.get(key)
+            if mapper is None:
+                if not marshal:
+                    raise MapperError(
+                        'invalid polymorphic_identity %s is not a valid '
+                        'identity, item %s' % (key, index))
+                errors[index] = base._get_polymorphic_on().get_error(
+                    'invalid_choice')
+                continue
+
+            groups.setdefault(mapper, []).append(index)
+
+        return groups, errors
+
+    def _map_items(self, items, func, marshal=False):
+
+        items = list(items)
+        groups, errors = self.group(items, marshal=marshal)
+
+        results = [None] * len(items)
+        for mapper, indexes in six.iteritems(groups):
+            for index in indexes:
+                if marshal:
+                    mapper_params = dict(self.mapper_params,
+                                         data=items[index], obj=None)
+                else:
+                    mapper_params = dict(self.mapper_params,
+                                         data=None, obj=items[index])
+                results[index] = func(mapper(**mapper_params))
+
+        # Items without an identity are marshaled by a mapper reporting their
+        # error and serialized by the base mapper, as when created one by one.
+        for index, error in six.iteritems(errors):
+            if marshal:
+                mapper_params = dict(self.mapper_params,
+                                     data=items[index], obj=None)
+            else:
+                mapper_params = dict(self.mapper_params,
+                                     data=None, obj=items[index])
+            results[index] = func(self.mapper._invalid_mapper(
+                error, **mapper_params))
+
+        return results
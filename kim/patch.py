@@ -0,0 +1,108 @@
+# kim/patch.py
+# Copyright (C) 2014-2016 the Kim authors and contributors
+# <see AUTHORS file>
+#
+# This module is part of Kim and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+import six
+
+
+def escape_token(token):
+    """Escape ``token`` for use in a JSON pointer as described by RFC 6901.
+
+    :param token: a dict key or list index
+    :rtype: str
+    """
+
+    return six.text_type(token).replace('~', '~0').replace('/', '~1')
+
+
+def unescape_token(token):
+    """Reverse :func:`escape_token`.
+
+    :param token: an escaped JSON pointer token
+    :rtype: str
+    """
+
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def make_pointer(tokens):
+    """Build a JSON pointer from a list of dict keys and list indexes.
+
+    Usage::
+
+        >>> make_pointer(['lines', 0, 'qty'])
+        '/lines/0/qty'
+
+    :param tokens: iterable of keys and indexes
+    :rtype: str
+    """
+
+    return ''.join('/' + escape_token(token) for token in tokens)
+
+
+def parse_pointer(pointer):
+    """Split a JSON pointer into a list of unescaped tokens.
+
+    :param pointer: a JSON pointer such as ``/lines/0/qty``
+    :raises: ValueError if ``pointer`` is not a valid JSON pointer
+    :rtype: list
+    """
+
+    if not pointer:
+        return []
+    if not pointer.startswith('/'):
+        raise ValueError('Invalid JSON pointer %r' % pointer)
+
+    return [unescape_token(token) for token in pointer[1:].split('/')]
+
+
+def diff(old, new, tokens=()):
+    """Return a list of JSON Patch (RFC 6902) operations that turn ``old``
+    into ``new``.
+
+    Dicts are compared key by key and lists of the same length item by item,
+    any other difference is described with a single ``replace`` operation.
+
+    Usage::
+
+        >>> diff({'a': 1, 'b': 2}, {'a': 1, 'b': 3, 'c': 4})
+        [{'op': 'replace', 'path': '/b', 'value': 3},
+         {'op': 'add', 'path': '/c', 'value': 4}]
+
+    :param old: the previous value
+    :param new: the current value
+    :param tokens: the tokens of the path to ``old`` and ``new``
+    :rtype: list
+    """
+
+    if old is new:
+        return []
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in sorted(old, key=six.text_type):
+            if key not in new:
+                ops.append({'op': 'remove',
+                            'path': make_pointer(tokens + (key, ))})
+            else:
+                ops.extend(diff(old[key], new[key], tokens + (key, )))
+        for key in sorted(new, key=six.text_type):
+            if key not in old:
+                ops.append({'op': 'add', 'path': make_pointer(tokens + (key, )),
+                            'value': new[key]})
+        return ops
+
+    if (isinstance(old, list) and isinstance(new, list) and
+            len(old) == len(new)):
+        ops = []
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            ops.extend(diff(old_item, new_item, tokens + (index, )))
+        return ops
+
+    if type(old) is type(new) and old == new:
+        return []
+
+    return [{'op': 'replace', 'path': make_pointer(tokens), 'value': new}]
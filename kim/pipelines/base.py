@@ -8,10 +8,24 @@
 from itertools import chain
 from functools import wraps
 
-from kim.exception import StopPipelineExecution, FieldError
+from kim.exception import (
+    StopPipelineExecution, FieldError, FieldInvalid, MappingInvalid)
 from kim.utils import attr_or_key, set_attr_or_key, attr_or_key_update
 
 
+class _Invalid(object):
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'INVALID'
+
+
+#: Returned by :meth:`Session.invalid` to signal that a pipeline should stop
+#: because its data is invalid.
+INVALID = _Invalid()
+
+
 class Session(object):
     """Session objects acts as store for the state passed between
     one pipe method to another.
@@ -44,7 +58,8 @@ class Session(object):
     serialization pipeline.
     """
 
-    __slots__ = ('field', 'data', 'output', 'parent', 'mapper_session', 'nested_mapper')
+    __slots__ = ('field', 'data', 'output', 'parent', 'mapper_session', 'nested_mapper',
+                 'error', 'unique_keys')
 
     def __init__(self, field=None, data=None, output=None,
                  parent=None, mapper_session=None, nested_mapper=None):
@@ -67,6 +82,8 @@ class Session(object):
         self.parent = parent
         self.mapper_session = mapper_session
         self.nested_mapper = nested_mapper
+        self.error = None
+        self.unique_keys = None
 
     @property
     def mapper(self):
@@ -77,6 +94,54 @@ class Session(object):
         """
         return self.mapper_session.mapper
 
+    def get_limit(self, name):
+        """Return the limit called ``name`` of the mapper running this
+        session, or None when there is no mapper or the limit isn't set.
+
+        :param name: the name of a limit, see ``Mapper.__limits__``
+        :rtype: int
+        """
+
+        if self.mapper_session is None:
+            return None
+        return self.mapper.limits.get(name)
+
+    def invalid(self, error_type=None, error=None):
+        """Mark the data of this session as invalid.  Pipes should return the
+        result, which stops the pipeline.
+
+        When the mapper running this session collects errors without
+        exceptions the error is stored in ``session.error`` and
+        :data:`INVALID` is returned.  Otherwise :class:`kim.exception.FieldInvalid`
+        is raised, or :class:`kim.exception.MappingInvalid` when ``error`` is a
+        dict of errors from a nested mapper.
+
+        Usage::
+
+            @pipe()
+            def validate_name(session):
+                if session.data != 'Mike Waites':
+                    return session.invalid('not_mike')
+
+        :param error_type: the key of an error message of the field
+        :param error: an error message, or dict of errors, to use instead of
+            ``error_type``
+        :raises: :class:`kim.exception.FieldInvalid`
+        :returns: :data:`INVALID`
+        """
+
+        if error_type is not None:
+            error = self.field.get_error(error_type)
+
+        mapper_session = self.mapper_session
+        if mapper_session is None or mapper_session.raise_invalid:
+            if isinstance(error, dict):
+                raise MappingInvalid(error)
+            raise FieldInvalid(error, field=self.field)
+
+        self.error = error
+        return INVALID
+
 
 def pipe(**pipe_kwargs):
     """Pipe decorator is provided as a convenience to avoid duplicating logic like
@@ -169,11 +234,12 @@ def run_pipeline(pipeline, session, field, **opts):
     """
 
     # chain all the pipelines pipes together and process them until the all the
-    # pipe groups have been exhausted or until
+    # pipe groups have been exhausted, a pipe returns INVALID or until
     # :class:`kim.exception.StopPipelineExecution` is raised.
     try:
         for pipe_func in pipeline:
-            pipe_func(session)
+            if pipe_func(session) is INVALID:
+                return INVALID
 
         return session.output
 
@@ -202,12 +268,12 @@ def get_data_from_name(session):
 
     if value is None:
         if session.field.opts.required and session.field.opts.default is None:
-            raise session.field.invalid(error_type='required')
+            return session.invalid(error_type='required')
         elif session.field.opts.default is not None:
             session.data = session.field.opts.default
             return session.data
         elif not session.field.opts.allow_none:
-            raise session.field.invalid(error_type='none_not_allowed')
+            return session.invalid(error_type='none_not_allowed')
 
     session.data = value
     return session.data
@@ -232,6 +298,20 @@ def get_data_from_source(session):
     if session.field.opts._is_wrapped or source == '__self__':
         return session.data
 
+    mapper_session = session.mapper_session
+    if (mapper_session is not None and mapper_session.sources is not None and
+            (session.field.opts.cache or
+             source in mapper_session.mapper.__cached_sources__)):
+        # The object is stored with its value so its id can't be reused by
+        # another object during the call.
+        key = (id(session.data), source)
+        entry = mapper_session.sources.get(key)
+        if entry is None:
+            entry = (session.data, attr_or_key(session.data, source))
+            mapper_session.sources[key] = entry
+        session.data = entry[1]
+        return session.data
+
     value = attr_or_key(session.data, source)
     session.data = value
     return session.data
@@ -272,7 +352,7 @@ def is_valid_choice(session):
 
     choices = session.field.opts.choices
     if choices is not None and session.data not in choices:
-        raise session.field.invalid('invalid_choice')
+        return session.invalid('invalid_choice')
 
     return session.data
 
@@ -301,6 +381,27 @@ def update_output_to_source(session):
     """
 
     source = session.field.opts.source
+    mapper_session = session.mapper_session
+    changed = None
+    if mapper_session is not None:
+        if mapper_session.validate_only:
+            return
+        changed = mapper_session.changed
+
+    if changed is not None and source != '__self__':
+        # Leave values that haven't changed untouched so ORMs such as
+        # SQLAlchemy don't consider them modified.
+        current = attr_or_key(session.output, source)
+        unchanged = current is session.data or (
+            current is not None and type(current) is type(session.data) and
+            current == session.data)
+        if unchanged and current is None and isinstance(session.output, dict):
+            # attr_or_key returns None for a missing key too, which is set.
+            unchanged = source in session.output
+        if unchanged:
+            return
+        changed.add(session.field.name)
+
     try:
         if source == '__self__':
             attr_or_key_update(session.output, session.data)
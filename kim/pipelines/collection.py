@@ -6,7 +6,7 @@
 # the MIT License: http://www.opensource.org/licenses/mit-license.php
 
 from kim.exception import FieldInvalid
-from kim.utils import attr_or_key
+from kim.utils import attr_or_key, map_in_executor
 
 from .base import pipe
 from .marshaling import MarshalPipeline
@@ -20,32 +20,100 @@ def marshall_collection(session):
 
     :param session: Kim pipeline session instance
 
+    When the collection defines ``unique_on`` existing elements are matched
+    to the input items by their ``unique_on`` key using the keys found by
+    :func:`check_duplicates`, otherwise they are matched by position.
+    Matched elements are updated with only the values that changed and a
+    report of the elements that were created, updated, unchanged or removed
+    is stored in ``collection_changes`` on the mapper.
+
     TODO(mike) this should be called marshal_collection
     """
     wrapped_field = session.field.opts.field
     existing_value = attr_or_key(session.output, session.field.opts.source)
+    unique_on = session.field.opts.unique_on
+    keys = session.unique_keys
 
     output = []
 
+    # Index the existing elements once so each input item is matched in
+    # constant time.
+    existing_index = None
+    if keys is not None and existing_value is not None:
+        existing_index = {}
+        for existing in existing_value:
+            existing_index[attr_or_key(existing, unique_on)] = existing
+
+    # Existing elements are only updated, rather than replaced by a new
+    # object, when the wrapped field allows updating them in place.
+    opts = wrapped_field.opts
+    updates_in_place = getattr(opts, 'allow_updates_in_place', False) or \
+        getattr(opts, 'allow_partial_updates', False)
+
+    def marshal_item(item):
+        i, datum = item
+        _output = {}
+        # If the object already exists, try to match up the existing elements
+        # with those in the input json
+        existing = None
+        if existing_index is not None:
+            if keys[i] is not None:
+                existing = existing_index.get(keys[i])
+        elif existing_value is not None:
+            try:
+                existing = existing_value[i]
+            except IndexError:
+                pass
+
+        mapper_session = session.mapper_session.derive(datum, _output)
+        if existing is not None:
+            _output[wrapped_field.opts.source] = existing
+            if existing_index is not None and updates_in_place:
+                # Only write the values that changed and find out if any did.
+                mapper_session.changed = set()
+
+        error = wrapped_field.marshal(mapper_session, parent_session=session)
+
+        # Nothing is written to the output when only validating.
+        return (error, _output.get(wrapped_field.opts.source), existing,
+                mapper_session.changed)
+
     if session.data is not None:
         if not hasattr(session.data, '__iter__'):
-            raise session.field.invalid('type_error')
-
-        for i, datum in enumerate(session.data):
-            _output = {}
-            # If the object already exists, try to match up the existing elements
-            # with those in the input json
-            if existing_value is not None:
-                try:
-                    _output[wrapped_field.opts.source] = existing_value[i]
-                except IndexError:
-                    pass
-
-            mapper_session = session.mapper.get_mapper_session(datum, _output)
-            wrapped_field.marshal(mapper_session, parent_session=session)
-
-            result = _output[wrapped_field.opts.source]
-            output.append(result)
+            return session.invalid('type_error')
+
+        changes = None
+        if keys is not None and not session.mapper_session.validate_only:
+            changes = {'created': [], 'updated': [], 'unchanged': [],
+                       'removed': []}
+
+        # Items are independent of each other so they may be marshaled
+        # concurrently when the mapper was given an executor.
+        results = map_in_executor(
+            session.mapper_session.executor, marshal_item,
+            enumerate(session.data))
+        for result in results:
+            error, value, existing, changed = result()
+            if error is not None:
+                return session.invalid(error=error)
+            output.append(value)
+
+            if changes is not None:
+                if existing is None:
+                    changes['created'].append(value)
+                elif changed is None or changed:
+                    # Replaced elements are counted as updated.
+                    changes['updated'].append(value)
+                else:
+                    changes['unchanged'].append(value)
+
+        if changes is not None:
+            if existing_index:
+                matched = set(keys)
+                changes['removed'] = [
+                    existing for key, existing in existing_index.items()
+                    if key not in matched]
+            session.mapper.collection_changes[session.field.name] = changes
 
     session.data = output
     return session.data
@@ -63,10 +131,11 @@ def serialize_collection(session):
     field_name = wrapped_field.name
     output = []
 
-    mapper_session = session.mapper.get_mapper_session(None, {})
+    mapper_session = session.mapper_session.derive(None, {})
 
     # If the wrapped field uses a mapper, fetch it once to avoid looking up the mapper
-    # from the registry for each item in the collection.
+    # from the registry for each item in the collection.  The session only
+    # lives for this call so storing the mapper on it is safe between threads.
     session.nested_mapper = getattr(
         wrapped_field,
         'get_mapper',
@@ -82,20 +151,44 @@ def serialize_collection(session):
     return session.data
 
 
+@pipe()
+def check_length(session):
+    """Check the number of items in the collection doesn't exceed the
+    max_length FieldOpt, or the ``max_collection_length`` limit of the mapper,
+    before any item is processed.
+
+    :param session: Kim pipeline session instance
+    """
+
+    max_length = session.field.opts.max_length
+    if max_length is None:
+        max_length = session.get_limit('max_collection_length')
+
+    if (max_length is not None and hasattr(session.data, '__len__') and
+            len(session.data) > max_length):
+        return session.invalid(error_type='too_long')
+
+    return session.data
+
+
 @pipe()
 def check_duplicates(session):
     """iterate over collection and check for duplicates if th unique_on FieldOpt has been
     set of this Collection field
 
+    The keys of the items are stored in ``session.unique_keys`` and used by
+    :func:`marshall_collection` to match items to existing elements.
+
     TODO(mike) This should only run if the wrapped field is a nested collection
 
     """
     data = session.data
     key = session.field.opts.unique_on
-    if key:
+    if key and hasattr(data, '__iter__'):
         keys = [attr_or_key(a, key) for a in data]
         if len(keys) != len(set(keys)):
-            raise session.field.invalid(error_type='duplicates')
+            return session.invalid(error_type='duplicates')
+        session.unique_keys = keys
     return data
 
 
@@ -103,12 +196,14 @@ class CollectionMarshalPipeline(MarshalPipeline):
     """CollectionMarshalPipeline
 
     .. seealso::
+        :func:`kim.pipelines.collection.check_length`
         :func:`kim.pipelines.collection.check_duplicates`
         :func:`kim.pipelines.collection.marshal_collection`
         :class:`kim.pipelines.marshaling.MarshalPipeline`
     """
 
-    input_pipes = MarshalPipeline.input_pipes + [check_duplicates, marshall_collection]
+    input_pipes = MarshalPipeline.input_pipes + \
+        [check_length, check_duplicates, marshall_collection]
 
 
 class CollectionSerializePipeline(SerializePipeline):
@@ -7,7 +7,7 @@
 
 from kim.utils import attr_or_key
 
-from .base import pipe
+from .base import pipe, INVALID
 from .marshaling import MarshalPipeline
 from .serialization import SerializePipeline
 
@@ -18,6 +18,67 @@ def _call_getter(session):
         return result
 
 
+def _marshal_with(session, nested_mapper):
+    """Marshal ``nested_mapper`` using the role defined on the field and the
+    options of the parent mappers session.
+
+    Returns :data:`kim.pipelines.base.INVALID` when the nested data is invalid
+    and the parent mapper is not raising exceptions for invalid data.
+    """
+    mapper_session = session.mapper_session
+    output = nested_mapper._marshal(
+        role=session.field.opts.role,
+        executor=mapper_session.executor,
+        only_changed=mapper_session.changed is not None,
+        fail_fast=mapper_session.fail_fast,
+        strict=mapper_session.strict or None,
+        interned=mapper_session.interned)
+
+    if nested_mapper.errors:
+        return session.invalid(error=nested_mapper.errors)
+
+    # Objects updated in place are the same object, record the field as
+    # changed when any of their fields changed.
+    if mapper_session.changed is not None and nested_mapper.changed_fields:
+        mapper_session.changed.add(session.field.name)
+
+    return output
+
+
+def _validate_nested(session, nested_mapper_class):
+    """Validate nested data without marshaling it, used by
+    :meth:`kim.mapper.Mapper.validate_data`.
+    """
+
+    opts = session.field.opts
+    partial = session.mapper_session.partial
+    if session.mapper_session.getters:
+        resolved = _call_getter(session)
+        if resolved is not None and not opts.allow_updates:
+            return session.data
+        if resolved is None and not opts.allow_create:
+            return session.invalid(error_type='not_found')
+    elif opts.getter and not opts.allow_updates:
+        # marshal returns the object found by the getter without validating
+        # the data, which may only hold the keys the getter looks up.  When
+        # no object can be created or updated the data is only ever used by
+        # the getter, otherwise just the keys supplied are validated.
+        if not (opts.allow_create or opts.allow_updates_in_place or
+                opts.allow_partial_updates):
+            return session.data
+        partial = True
+
+    nested_mapper = nested_mapper_class(
+        data=session.data, partial=partial, parent=session.mapper)
+    errors = nested_mapper.validate_data(
+        role=opts.role, getters=session.mapper_session.getters,
+        strict=session.mapper_session.strict or None)
+    if errors:
+        return session.invalid(error=errors)
+
+    return session.data
+
+
 @pipe()
 def marshal_nested(session):
     """Marshal data using the nested mapper defined on this field.
@@ -43,24 +104,30 @@ def marshal_nested(session):
     :param session: Kim pipeline session instance
     """
 
-    resolved = _call_getter(session)
-
-    partial = session.mapper_session.partial
-    parent_mapper = session.mapper
+    max_depth = session.get_limit('max_depth')
+    if max_depth is not None and session.mapper.depth >= max_depth:
+        return session.invalid(error_type='too_deep')
 
     if session.parent and session.parent.nested_mapper:
         nested_mapper_class = session.parent.nested_mapper
     else:
         nested_mapper_class = session.field.get_mapper(as_class=True)
 
+    if session.mapper_session.validate_only:
+        return _validate_nested(session, nested_mapper_class)
+
+    resolved = _call_getter(session)
+
+    partial = session.mapper_session.partial
+    parent_mapper = session.mapper
+
     if resolved is not None:
-        if session.field.opts.allow_updates:
-            nested_mapper = nested_mapper_class(
-                data=session.data, obj=resolved, partial=partial,
-                parent=parent_mapper)
-            session.data = nested_mapper.marshal(role=session.field.opts.role)
-        else:
+        if not session.field.opts.allow_updates:
             session.data = resolved
+            return session.data
+        nested_mapper = nested_mapper_class(
+            data=session.data, obj=resolved, partial=partial,
+            parent=parent_mapper)
     else:
         existing_value = attr_or_key(session.output, session.field.name)
         if (session.field.opts.allow_updates_in_place or
@@ -69,14 +136,17 @@ def marshal_nested(session):
             nested_mapper = nested_mapper_class(
                 data=session.data, obj=existing_value, partial=partial,
                 parent=parent_mapper)
-            session.data = nested_mapper.marshal(role=session.field.opts.role)
         elif session.field.opts.allow_create:
             nested_mapper = nested_mapper_class(
                 data=session.data, partial=partial, parent=parent_mapper)
-            session.data = nested_mapper.marshal(role=session.field.opts.role)
         else:
-            raise session.field.invalid(error_type='not_found')
+            return session.invalid(error_type='not_found')
+
+    output = _marshal_with(session, nested_mapper)
+    if output is INVALID:
+        return INVALID
 
+    session.data = output
     return session.data
 
 
@@ -97,7 +167,13 @@ def serialize_nested(session):
     else:
         nested_mapper = session.field.get_mapper(obj=session.data)
 
-    session.data = nested_mapper.serialize(role=session.field.opts.role)
+    session.data = nested_mapper.serialize(
+        role=session.field.opts.role,
+        memo=session.mapper_session.memo,
+        cache=session.mapper_session.cache,
+        fragments=session.mapper_session.fragments,
+        tags=session.mapper_session.tags,
+        sources=session.mapper_session.sources)
 
     return session.data
 
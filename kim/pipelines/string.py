@@ -25,9 +25,34 @@ def bounds_check(session):
     min_ = session.field.opts.min
 
     if max_ is not None and len(session.data) > max_:
-        raise session.field.invalid(error_type='out_of_bounds')
+        return session.invalid(error_type='out_of_bounds')
     if min_ is not None and len(session.data) < min_:
-        raise session.field.invalid(error_type='out_of_bounds')
+        return session.invalid(error_type='out_of_bounds')
+
+    return session.data
+
+
+@pipe()
+def check_input_length(session):
+    """Pipe used to reject text or bytes longer than the max option of the
+    field, or the ``max_string_length`` limit of the mapper, before the value
+    is coerced.
+
+    :param session: Kim pipeline session instance
+    """
+
+    if not isinstance(session.data, (six.text_type, six.binary_type)):
+        return session.data
+
+    max_ = session.field.opts.max
+    if max_ is not None:
+        if len(session.data) > max_:
+            return session.invalid(error_type='out_of_bounds')
+        return session.data
+
+    max_length = session.get_limit('max_string_length')
+    if max_length is not None and len(session.data) > max_length:
+        return session.invalid(error_type='too_long')
 
     return session.data
 
@@ -43,7 +68,7 @@ def is_valid_string(session):
         session.data = six.text_type(session.data)
         return session.data
     except ValueError:
-        raise session.field.invalid(error_type='type_error')
+        return session.invalid(error_type='type_error')
 
 
 @pipe()
@@ -55,7 +80,23 @@ def blank_check(session):
     """
 
     if session.data == '' and session.field.opts.blank is False:
-        raise session.field.invalid(error_type='type_error')
+        return session.invalid(error_type='type_error')
+
+    return session.data
+
+
+@pipe()
+def intern_string(session):
+    """Replace the value with the first equal value seen during a bulk
+    marshal, if the intern FieldOpt is set, so objects marshaled in the same
+    batch share a single copy of each distinct value.
+
+    :param session: Kim pipeline session instance
+    """
+
+    interned = session.mapper_session and session.mapper_session.interned
+    if interned is not None and session.field.opts.intern:
+        session.data = interned.setdefault(session.data, session.data)
 
     return session.data
 
@@ -73,14 +114,18 @@ class StringMarshalPipeline(MarshalPipeline):
     """StringMarshalPipeline
 
     .. seealso::
+        :func:`kim.pipelines.string.check_input_length`
         :func:`kim.pipelines.base.is_valid_choice`
         :func:`kim.pipelines.string.is_valid_string`
+        :func:`kim.pipelines.string.intern_string`
         :class:`kim.pipelines.marshaling.MarshalPipeline`
     """
 
     validation_pipes = \
-        [is_valid_string, blank_check, is_valid_choice, bounds_check] \
-        + MarshalPipeline.validation_pipes
+        [check_input_length, is_valid_string, blank_check, is_valid_choice,
+         bounds_check] + MarshalPipeline.validation_pipes
+
+    process_pipes = [intern_string] + MarshalPipeline.process_pipes
 
     output_pipes = [to_unicode] + MarshalPipeline.output_pipes
 
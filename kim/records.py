@@ -0,0 +1,86 @@
+# kim/records.py
+# Copyright (C) 2014-2016 the Kim authors and contributors
+# <see AUTHORS file>
+#
+# This module is part of Kim and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+from collections import namedtuple
+
+
+class Record(object):
+    """Base class of the ``__slots__`` record types created by
+    :func:`make_record_type`.
+
+    Records have attribute access like the objects marshaled by a mapper while
+    using far less memory than a dict or an object with a ``__dict__``.  Use
+    :meth:`_asdict` to convert a record to a dict.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **values):
+
+        for name in self.__slots__:
+            setattr(self, name, values.pop(name, None))
+        if values:
+            raise TypeError('%s got unexpected fields %s' % (
+                self.__class__.__name__, ', '.join(sorted(values))))
+
+    def _asdict(self):
+        """Return a dict of the fields of this record.
+
+        :rtype: dict
+        """
+
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+    def __eq__(self, other):
+
+        return type(other) is type(self) and \
+            all(getattr(self, name) == getattr(other, name)
+                for name in self.__slots__)
+
+    def __ne__(self, other):
+
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+
+        return '%s(%s)' % (self.__class__.__name__, ', '.join(
+            '%s=%r' % (name, getattr(self, name)) for name in self.__slots__))
+
+
+def make_record_type(name, fields):
+    """Return a new subclass of :class:`Record` with a slot for each of
+    ``fields``.
+
+    Usage::
+
+        >>> User = make_record_type('User', ['id', 'name'])
+        >>> User(id=1, name='bruce')
+        User(id=1, name='bruce')
+
+    :param name: the name of the new class
+    :param fields: list of field names
+    :rtype: type
+    """
+
+    return type(str(name), (Record, ), {'__slots__': tuple(fields)})
+
+
+def make_tuple_record_type(name, fields):
+    """Return a new namedtuple type for ``fields`` where every field defaults
+    to None.
+
+    :param name: the name of the new class
+    :param fields: list of field names
+    :rtype: type
+    """
+
+    record_type = namedtuple(str(name), fields)
+    record_type.__new__.__defaults__ = (None, ) * len(fields)
+    record_type._field_defaults = dict.fromkeys(fields)
+    return record_type
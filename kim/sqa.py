@@ -0,0 +1,166 @@
+# kim/sqa.py
+# Copyright (C) 2014-2016 the Kim authors and contributors
+# <see AUTHORS file>
+#
+# This module is part of Kim and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import NoInspectionAvailable
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.exc import UnmappedInstanceError
+
+
+def identity_tag(obj):
+    """Return the SQLAlchemy identity key of ``obj`` for use as a cache tag,
+    or None if ``obj`` is not a SQLAlchemy instance in a session.
+
+    Pending instances don't have an identity yet, they're tagged by their id
+    so :func:`unflushed_tags` can keep output containing them out of the
+    cache.
+
+    Usage::
+
+        >>> cache = SerializationCache(tag=identity_tag,
+        ...                            changed=unflushed_tags)
+
+    :param obj: the object being serialized
+    :rtype: tuple
+    """
+
+    try:
+        state = inspect(obj)
+    except NoInspectionAvailable:
+        return None
+
+    if getattr(state, 'pending', False):
+        return ('pending', id(obj))
+    return getattr(state, 'identity_key', None)
+
+
+def unflushed_tags(obj):
+    """Return the tags of the new, modified and deleted instances in the
+    session of ``obj`` that haven't been flushed, for use as the ``changed``
+    function of a :class:`kim.cache.SerializationCache`.
+
+    :class:`CacheInvalidator` only sees changes when they're flushed.  Until
+    then cached output containing these instances is not served and output
+    serialized from them is not stored, so an instance updated by
+    :meth:`kim.mapper.Mapper.marshal` and serialized before the session
+    flushes returns its new values.
+
+    :param obj: the object being serialized
+    :rtype: set
+    """
+
+    try:
+        session = object_session(obj)
+    except UnmappedInstanceError:
+        return set()
+
+    tags = set()
+    if session is None:
+        return tags
+
+    for instance in session.new | session.dirty | session.deleted:
+        tag = identity_tag(instance)
+        if tag is not None:
+            tags.add(tag)
+    return tags
+
+
+def changed_sources(obj):
+    """Return the names of the attributes of ``obj`` that have been changed
+    since it was loaded or last flushed, for use with
+    :meth:`kim.mapper.Mapper.reserialize`.
+
+    Changes are lost when the session is flushed, so this must be called
+    before the session flushes.
+
+    Usage::
+
+        >>> post.title = 'new title'
+        >>> PostMapper(obj=post).reserialize(previous, changed_sources(post))
+
+    :param obj: a SQLAlchemy instance
+    :rtype: set
+    """
+
+    return set(attr.key for attr in inspect(obj).attrs
+               if attr.history.has_changes())
+
+
+class CacheInvalidator(object):
+    """Removes cached output of SQLAlchemy instances when they are changed by
+    a :class:`sqlalchemy.orm.Session`.
+
+    The cache must be created with ``tag=identity_tag`` so every entry
+    records the instances its output contains, including instances
+    serialized by nested mappers.  When a session is flushed the entries
+    containing any updated or deleted instance are removed.  They are removed
+    again when the transaction is committed or rolled back, so output cached
+    from uncommitted data while the transaction was open is never served.
+
+    Changes that haven't been flushed are only seen when the cache is also
+    created with ``changed=unflushed_tags``.
+
+    Usage::
+
+        >>> cache = SerializationCache(tag=identity_tag,
+        ...                            changed=unflushed_tags)
+        >>> CacheInvalidator(cache).listen(DBSession)
+        >>> PostMapper(obj=post).serialize(cache=cache)
+
+    .. note::
+
+        Changes made without loading instances into the session, such as
+        ``Query.update()`` or raw SQL, are not seen.
+
+    :param cache: a :class:`kim.cache.SerializationCache` created with
+        ``tag=identity_tag`` and ``changed=unflushed_tags``
+    """
+
+    def __init__(self, cache):
+
+        self.cache = cache
+
+    def listen(self, target):
+        """Listen for changes made by ``target``.
+
+        :param target: a :class:`sqlalchemy.orm.Session` class or instance, or
+            a :class:`sqlalchemy.orm.sessionmaker`
+        :returns: self
+        """
+
+        event.listen(target, 'after_flush', self.after_flush)
+        event.listen(target, 'after_commit', self.after_transaction)
+        event.listen(target, 'after_rollback', self.after_transaction)
+        return self
+
+    def remove(self, target):
+        """Stop listening for changes made by ``target``.
+
+        :param target: a target previously passed to :meth:`listen`
+        """
+
+        event.remove(target, 'after_flush', self.after_flush)
+        event.remove(target, 'after_commit', self.after_transaction)
+        event.remove(target, 'after_rollback', self.after_transaction)
+
+    def after_flush(self, session, flush_context):
+
+        tags = set()
+        for obj in session.dirty | session.deleted:
+            tag = identity_tag(obj)
+            if tag is not None:
+                tags.add(tag)
+
+        if tags:
+            self.cache.invalidate(tags)
+            session.info.setdefault(self, set()).update(tags)
+
+    def after_transaction(self, session):
+
+        tags = session.info.pop(self, None)
+        if tags:
+            self.cache.invalidate(tags)
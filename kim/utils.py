@@ -5,23 +5,35 @@
 # This module is part of Kim and is released under
 # the MIT License: http://www.opensource.org/licenses/mit-license.php
 
+import gc
+import threading
+
+from contextlib import contextmanager
 from datetime import datetime  # NOQA
 
 from collections import defaultdict
+from functools import partial
 
 
 _creation_order = 1
+_creation_order_lock = threading.Lock()
+
+_gc_paused = 0
+_gc_was_enabled = False
+_gc_lock = threading.Lock()
 
 
 def set_creation_order(instance):
     """Assign a '_creation_order' sequence to the given instance.
-    This allows multiple instances to be sorted in order of creation
-    (typically within a single thread; the counter is not particularly
-    threadsafe).
+    This allows multiple instances to be sorted in order of creation.
+
+    The counter is guarded by a lock so fields may safely be created from
+    more than one thread.
     """
     global _creation_order
-    instance._creation_order = _creation_order
-    _creation_order += 1
+    with _creation_order_lock:
+        instance._creation_order = _creation_order
+        _creation_order += 1
 
 
 def _attr_or_key(obj, name, _isinstance=isinstance, _dict=dict, getter=getattr):
@@ -130,3 +142,80 @@ def recursive_defaultdict():
 
     """
     return defaultdict(recursive_defaultdict)
+
+
+def _executor_result(future, func, item):
+    """Return the result of ``future``.  If the executor has not started
+    ``future`` yet it is cancelled and ``func`` is called for ``item`` in the
+    calling thread instead.
+
+    Waiting threads therefore only ever block on work that is already running,
+    which means nested calls sharing a single bounded executor can not
+    deadlock waiting for a free worker.
+    """
+    if future.cancel():
+        return func(item)
+    return future.result()
+
+
+def map_in_executor(executor, func, items):
+    """Schedule ``func`` to be called for every item in ``items`` using
+    ``executor`` and return a list of callables, one per item and in the same
+    order as ``items``.  Calling one of the returned callables returns the
+    result of ``func`` for that item or raises the exception it raised.
+
+    When ``executor`` is None nothing is scheduled and ``func`` is only called
+    when the result is requested, making the sequential case behave exactly
+    like a plain loop.
+
+    :param executor: an object implementing ``submit`` from
+        :class:`concurrent.futures.Executor` or None
+    :param func: callable accepting a single item
+    :param items: iterable of items
+
+    Usage::
+
+        >>> results = map_in_executor(pool, lookup, [1, 2, 3])
+        >>> [result() for result in results]
+        [<One>, <Two>, <Three>]
+    """
+    if executor is None:
+        return [partial(func, item) for item in items]
+
+    results = []
+    for item in items:
+        future = executor.submit(func, item)
+        results.append(partial(_executor_result, future, func, item))
+
+    return results
+
+
+@contextmanager
+def paused_gc():
+    """Disable the cyclic garbage collector for the duration of the block.
+
+    Allocating many objects, such as when marshaling a large batch, triggers
+    the collector repeatedly although none of the objects are garbage.  The
+    collector is enabled again when the last of any concurrent blocks exits,
+    and only if it was enabled before the first one started.
+
+    Usage::
+
+        >>> with paused_gc():
+        ...     rows = [dict(row) for row in data]
+    """
+    global _gc_paused, _gc_was_enabled
+
+    with _gc_lock:
+        if not _gc_paused:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_paused += 1
+
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_paused -= 1
+            if not _gc_paused and _gc_was_enabled:
+                gc.enable()
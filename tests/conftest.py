@@ -9,7 +9,7 @@ def empty_registry():
     _MapperConfig.MAPPER_REGISTRY.clear()
 
 
-def get_mapper_session(data=None, obj=None, output=None):
+def get_mapper_session(data=None, obj=None, output=None, **kwargs):
 
     mapper = Mapper(data=data, obj=obj)
-    return mapper.get_mapper_session(data or obj, output)
+    return mapper.get_mapper_session(data or obj, output, **kwargs)
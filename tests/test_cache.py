@@ -0,0 +1,581 @@
+import json
+import multiprocessing
+import os
+
+import mock
+import pytest
+
+from kim.cache import SerializationCache, SerializationMemo, MMapCache
+from kim.encoding import JSONFragment
+from kim.field import String, Integer, Nested, Collection
+from kim.mapper import Mapper, _MapperConfig
+from kim.pipelines.base import pipe
+
+from .helpers import TestType
+
+
+def test_serialization_cache_lru_eviction():
+
+    cache = SerializationCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    # touch a so b becomes the least recently used entry.
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats() == {
+        'hits': 3, 'misses': 1, 'evictions': 1, 'expirations': 0, 'size': 2}
+
+
+def test_serialization_cache_ttl():
+
+    now = [100]
+    cache = SerializationCache(ttl=10, timer=lambda: now[0])
+    cache.set('a', 1)
+
+    now[0] = 109
+    assert cache.get('a') == 1
+
+    now[0] = 110
+    assert cache.get('a') is None
+    assert cache.stats() == {
+        'hits': 1, 'misses': 1, 'evictions': 0, 'expirations': 1, 'size': 0}
+
+
+def test_serialization_cache_delete_and_clear():
+
+    cache = SerializationCache()
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    cache.delete('a')
+    cache.delete('missing')
+    assert cache.get('a') is None
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_mapper_serialize_with_cache_uses_version():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+        __cache_version__ = ('id', 'version')
+
+        id = Integer()
+        name = String()
+
+    cache = SerializationCache()
+    user = TestType(id=1, version=1, name='bruce')
+
+    assert UserMapper(obj=user).serialize(cache=cache) == {
+        'id': 1, 'name': 'bruce'}
+
+    # The version hasn't changed so the cached output is returned.
+    user.name = 'martha'
+    assert UserMapper(obj=user).serialize(cache=cache) == {
+        'id': 1, 'name': 'bruce'}
+
+    user.version = 2
+    assert UserMapper(obj=user).serialize(cache=cache) == {
+        'id': 1, 'name': 'martha'}
+
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 2
+
+
+def test_mapper_serialize_with_cache_keyed_by_role():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+        __cache_version__ = ('id', )
+
+        id = Integer()
+        name = String()
+
+        __roles__ = {
+            'id_only': ['id'],
+        }
+
+    cache = SerializationCache()
+    user = TestType(id=1, name='bruce')
+
+    assert UserMapper(obj=user).serialize(cache=cache) == {
+        'id': 1, 'name': 'bruce'}
+    assert UserMapper(obj=user).serialize(role='id_only', cache=cache) == {
+        'id': 1}
+
+
+def test_mapper_serialize_with_cache_without_version():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+
+    cache = SerializationCache()
+    UserMapper(obj=TestType(id=1)).serialize(cache=cache)
+
+    assert len(cache) == 0
+    assert cache.stats()['misses'] == 0
+
+
+def test_mapper_serialize_with_cache_nested():
+
+    class CompanyMapper(Mapper):
+
+        __type__ = TestType
+        __cache_version__ = ('id', 'version')
+
+        id = Integer()
+        name = String()
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+        __cache_version__ = ('id', 'version')
+
+        id = Integer()
+        name = String()
+        company = Nested(CompanyMapper)
+
+    cache = SerializationCache()
+    company = TestType(id=2, version=1, name='wayne enterprises')
+    user = TestType(id=1, version=1, name='bruce', company=company)
+
+    first = UserMapper.many().serialize([user], cache=cache)[0]
+
+    # The user changed but the company didn't, so the company is reused.
+    user.version = 2
+    user.name = 'martha'
+    company.name = 'changed without a new version'
+    second = UserMapper(obj=user).serialize(cache=cache)
+
+    assert second == {
+        'id': 1, 'name': 'martha',
+        'company': {'id': 2, 'name': 'wayne enterprises'}}
+    assert second['company'] is first['company']
+
+
+def test_mapper_serialize_json_reuses_fragments():
+
+    calls = []
+
+    class Product(object):
+
+        def __init__(self, id, name):
+            self.id = id
+            self._name = name
+
+        @property
+        def name(self):
+            calls.append(self.id)
+            return self._name
+
+    class ProductMapper(Mapper):
+
+        __type__ = TestType
+        __cache_version__ = ('id', )
+
+        id = Integer()
+        name = String()
+
+    class LineMapper(Mapper):
+
+        __type__ = TestType
+
+        qty = Integer()
+        product = Nested(ProductMapper)
+
+    class OrderMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        lines = Collection(Nested(LineMapper))
+
+    product = Product(4, 'kim')
+    order = TestType(id=1, lines=[
+        TestType(qty=i, product=product) for i in range(3)])
+
+    cache = SerializationCache()
+    first = OrderMapper(obj=order).serialize_json(cache=cache)
+    second = OrderMapper(obj=order).serialize_json(cache=cache)
+
+    # Only the product can be cached so its encoded output is stored once and
+    # spliced into every line.
+    assert len(cache) == 1
+    assert calls == [4]
+
+    assert first == second
+    assert json.loads(first) == OrderMapper(obj=order).serialize()
+    assert isinstance(first, JSONFragment)
+
+
+def test_mapper_serialize_json_with_memo_copy():
+
+    class ProductMapper(Mapper):
+
+        __type__ = TestType
+        __cache_version__ = ('id', )
+
+        id = Integer()
+
+    class LineMapper(Mapper):
+
+        __type__ = TestType
+
+        product = Nested(ProductMapper)
+        spare = Nested(ProductMapper)
+
+    product = TestType(id=4)
+    line = TestType(product=product, spare=product)
+
+    result = LineMapper(obj=line).serialize_json(
+        memo=SerializationMemo(copy=True), cache=SerializationCache())
+    assert json.loads(result) == {'product': {'id': 4}, 'spare': {'id': 4}}
+
+
+def test_mapper_serialize_json_many():
+
+    class ProductMapper(Mapper):
+
+        __type__ = TestType
+        __cache_version__ = ('id', )
+
+        id = Integer()
+        name = String()
+
+    cache = SerializationCache()
+    products = [TestType(id=1, name='a'), TestType(id=2, name='b')]
+
+    result = ProductMapper.many().serialize_json(products, cache=cache)
+    assert json.loads(result) == [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}]
+
+    products[0].name = 'changed'
+    assert ProductMapper.many().serialize_json(products, cache=cache) == result
+    assert cache.stats()['hits'] == 2
+
+
+def test_mapper_fingerprint_invalidates_fragments():
+
+    def define(**fields):
+        _MapperConfig.MAPPER_REGISTRY.clear()
+        attrs = {'__type__': TestType, '__cache_version__': ('id', ),
+                 'id': Integer()}
+        attrs.update(fields)
+        return type('ProductMapper', (Mapper, ), attrs)
+
+    cache = SerializationCache()
+    product = TestType(id=1, name='kim', price=10)
+
+    v1 = define(name=String())
+    assert json.loads(v1(obj=product).serialize_json(cache=cache)) == {
+        'id': 1, 'name': 'kim'}
+
+    v2 = define(name=String(), price=Integer())
+    assert v1.get_fingerprint() != v2.get_fingerprint()
+    assert json.loads(v2(obj=product).serialize_json(cache=cache)) == {
+        'id': 1, 'name': 'kim', 'price': 10}
+
+    v3 = define(name=String(), price=Integer())
+    assert v2.get_fingerprint() == v3.get_fingerprint()
+
+
+def test_mapper_fingerprint_includes_pipe_code():
+
+    def define(pipe_func):
+        _MapperConfig.MAPPER_REGISTRY.clear()
+        return type('ProductMapper', (Mapper, ), {
+            '__type__': TestType,
+            'name': String(extra_serialize_pipes={'output': [pipe_func]}),
+        })
+
+    def make_pipe(suffix):
+        @pipe()
+        def add_suffix(session):
+            session.data = session.data + suffix
+            return session.data
+        return add_suffix
+
+    @pipe()
+    def add_suffix(session):
+        session.data = session.data + '!'
+        return session.data
+
+    first = add_suffix
+
+    # Same name, different body
+    @pipe()
+    def add_suffix(session):
+        session.data = session.data + '?'
+        return session.data
+
+    assert define(first).get_fingerprint() == \
+        define(first).get_fingerprint()
+    assert define(first).get_fingerprint() != \
+        define(add_suffix).get_fingerprint()
+
+    # Values the pipe closes over are included too
+    assert define(make_pipe('!')).get_fingerprint() == \
+        define(make_pipe('!')).get_fingerprint()
+    assert define(make_pipe('!')).get_fingerprint() != \
+        define(make_pipe('?')).get_fingerprint()
+
+
+def test_mapper_fingerprint_includes_nested_mappers():
+
+    def define(**company_fields):
+        _MapperConfig.MAPPER_REGISTRY.clear()
+        company_fields['__type__'] = TestType
+        # The registry holds weak references, keep the mapper alive.
+        company_mapper = type('CompanyMapper', (Mapper, ), company_fields)
+
+        class UserMapper(Mapper):
+
+            __type__ = TestType
+
+            id = Integer()
+            company = Nested('CompanyMapper')
+            friends = Collection(Nested('UserMapper'))
+
+        return UserMapper, company_mapper
+
+    # Nested mappers are resolved from the registry, so fingerprint each
+    # version before it's replaced.
+    v1 = define(name=String())[0].get_fingerprint()
+    v2 = define(name=String(), id=Integer())[0].get_fingerprint()
+
+    assert v1 != v2
+
+
+def test_serialization_cache_invalidate_tags():
+
+    cache = SerializationCache(maxsize=2)
+    cache.set('a', 1, tags=['x', 'y'])
+    cache.set('b', 2, tags=['y'])
+    cache.set('c', 3, tags=['z'])
+
+    # a was evicted along with its tags.
+    assert cache.invalidate(['x']) == 0
+    assert cache.invalidate(['y', 'z']) == 2
+    assert len(cache) == 0
+
+
+def test_serialization_cache_get_stale_tags():
+
+    cache = SerializationCache()
+    cache.set('a', 1, tags=['x', 'y'])
+
+    tags = set()
+    assert cache.get('a', tags=tags, stale={'y'}) is None
+    assert tags == set()
+    assert cache.misses == 1
+
+    # the entry is kept for callers without the stale tags
+    assert cache.get('a', tags=tags, stale={'z'}) == 1
+    assert tags == {'x', 'y'}
+
+
+def test_mapper_serialize_with_tagged_cache():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+
+    class PostMapper(Mapper):
+
+        __type__ = TestType
+
+        title = String()
+        users = Collection(Nested(UserMapper))
+
+    user = TestType(tag='user', name='mike')
+    post = TestType(tag='post', title='kim', users=[user, user])
+    cache = SerializationCache(tag=lambda obj: getattr(obj, 'tag', None))
+
+    expected = PostMapper(obj=post).serialize(cache=cache, memo=True)
+    user.name = 'jack'
+    assert PostMapper(obj=post).serialize(cache=cache) == expected
+
+    # the post is tagged with the user it contains
+    assert cache.invalidate(['user']) == 2
+    assert PostMapper(obj=post).serialize(cache=cache)['users'][0] == {
+        'id': None, 'name': 'jack'}
+
+
+@pytest.fixture
+def cache_path(tmpdir):
+
+    return str(tmpdir.join('kim.cache'))
+
+
+def test_mmap_cache_get_set(cache_path):
+
+    cache = MMapCache(cache_path, slots=16, slot_size=256, ways=4)
+    cache.set('text', u'{"name":"kim"}')
+    cache.set('bytes', b'\x00\x01')
+    cache.set(('tuple', 1), {'id': 1, 'tags': ['a']})
+
+    assert cache.get('text') == u'{"name":"kim"}'
+    assert cache.get('bytes') == b'\x00\x01'
+    assert cache.get(('tuple', 1)) == {'id': 1, 'tags': ['a']}
+    assert cache.get('missing') is None
+
+    # values are replaced in place.
+    cache.set('text', u'new')
+    assert cache.get('text') == u'new'
+    assert cache.stats() == {
+        'hits': 4, 'misses': 1, 'evictions': 0, 'expirations': 0, 'size': 3}
+
+
+def test_mmap_cache_skips_large_values(cache_path):
+
+    cache = MMapCache(cache_path, slots=4, slot_size=64, ways=4)
+    cache.set('a', u'x' * 64)
+
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_mmap_cache_clock_eviction(cache_path):
+
+    cache = MMapCache(cache_path, slots=2, slot_size=64, ways=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    # Reading a gives it a second chance, so b is evicted.
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_mmap_cache_ignores_slot_being_written(cache_path):
+
+    cache = MMapCache(cache_path, slots=4, slot_size=64, ways=4)
+    cache.set('a', 1)
+
+    digest = cache._digest('a')
+    offset = cache._slot_offset(cache._bucket(digest), 0)
+    sequence = cache.SEQUENCE.unpack_from(cache._mmap, offset)[0]
+
+    cache.SEQUENCE.pack_into(cache._mmap, offset, sequence + 1)
+    assert cache.get('a') is None
+
+    cache.SEQUENCE.pack_into(cache._mmap, offset, sequence + 2)
+    assert cache.get('a') == 1
+
+
+def test_mmap_cache_ttl(cache_path):
+
+    cache = MMapCache(cache_path, slots=4, slot_size=64, ways=4, ttl=10)
+
+    with mock.patch('kim.cache.time.time', return_value=100):
+        cache.set('a', 1)
+
+    with mock.patch('kim.cache.time.time', return_value=109):
+        assert cache.get('a') == 1
+
+    with mock.patch('kim.cache.time.time', return_value=110):
+        assert cache.get('a') is None
+
+    assert cache.stats()['expirations'] == 1
+
+
+def test_mmap_cache_delete_and_clear(cache_path):
+
+    cache = MMapCache(cache_path, slots=8, slot_size=64, ways=4)
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    cache.delete('a')
+    cache.delete('missing')
+    assert cache.get('a') is None
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_mmap_cache_set_replaces_existing_after_empty_slot(cache_path):
+
+    cache = MMapCache(cache_path, slots=2, slot_size=64, ways=2)
+    cache.set('a', 'A')
+    cache.set('b', 'B')
+
+    # The slot of 'a' is now empty and comes before the slot of 'b'
+    cache.delete('a')
+    cache.set('b', 'B2')
+
+    assert len(cache) == 1
+    assert cache.get('b') == 'B2'
+
+
+def test_mmap_cache_checks_options(cache_path):
+
+    MMapCache(cache_path, slots=8, slot_size=64, ways=4).close()
+
+    with pytest.raises(ValueError):
+        MMapCache(cache_path, slots=16, slot_size=64, ways=4)
+
+    with pytest.raises(ValueError):
+        MMapCache(cache_path, slots=6, slot_size=64, ways=4)
+
+
+def _set_in_child(path):
+
+    cache = MMapCache(path, slots=16, slot_size=64, ways=4)
+    cache.set('child', u'from %s' % os.getpid())
+
+
+def test_mmap_cache_shared_between_processes(cache_path):
+
+    cache = MMapCache(cache_path, slots=16, slot_size=64, ways=4)
+    cache.set('parent', 1)
+
+    process = multiprocessing.Process(target=_set_in_child, args=(cache_path, ))
+    process.start()
+    process.join()
+
+    assert process.exitcode == 0
+    assert cache.get('child') == u'from %s' % process.pid
+    assert MMapCache(cache_path, slots=16, slot_size=64, ways=4).get(
+        'parent') == 1
+
+
+def test_mapper_serialize_json_with_mmap_cache(cache_path):
+
+    class ProductMapper(Mapper):
+
+        __type__ = TestType
+        __cache_version__ = ('id', )
+
+        id = Integer()
+        name = String()
+
+    cache = MMapCache(cache_path, slots=16, slot_size=256, ways=4)
+    product = TestType(id=1, name='kim')
+
+    result = ProductMapper(obj=product).serialize_json(cache=cache)
+
+    product.name = 'changed'
+    assert ProductMapper(obj=product).serialize_json(cache=cache) == result
+    assert ProductMapper(obj=product).serialize(cache=cache) == {
+        'id': 1, 'name': 'changed'}
+    assert ProductMapper(obj=product).serialize(cache=cache) == {
+        'id': 1, 'name': 'changed'}
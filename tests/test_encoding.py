@@ -0,0 +1,39 @@
+import json
+
+from kim.encoding import JSONFragment, dumps, iterencode
+
+
+def test_dumps_matches_json():
+
+    data = {
+        'id': 1, 'name': 'bruce', 'score': 1.5, 'active': True, 'none': None,
+        'tags': ['a', 'b'], 'nested': {'pairs': (1, 2)}, 1: 'int key'}
+
+    assert json.loads(dumps(data)) == json.loads(json.dumps(data))
+
+
+def test_dumps_splices_fragments():
+
+    fragment = JSONFragment('{"id":2,"name":"wayne"}')
+    data = {'id': 1, 'companies': [fragment, fragment]}
+
+    assert dumps(data) == (
+        '{"id":1,"companies":[{"id":2,"name":"wayne"},{"id":2,"name":"wayne"}]}')
+
+
+def test_iterencode_yields_fragment_unchanged():
+
+    fragment = JSONFragment('{"id":2}')
+    chunks = list(iterencode([fragment]))
+
+    assert chunks == ['[', fragment, ']']
+    assert chunks[1] is fragment
+
+
+def test_dumps_default():
+
+    class Thing(object):
+        pass
+
+    assert dumps({'thing': Thing()}, default=lambda o: 'thing') == (
+        '{"thing":"thing"}')
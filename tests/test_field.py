@@ -154,3 +154,26 @@ def test_field_invalid_opts_class():
     with pytest.raises(FieldError):
 
         PhoneNumber()
+
+
+def test_field_get_passthrough_types():
+
+    from kim.field import String, Integer, Float
+
+    def pipe(session):
+        pass
+
+    assert String(name='name').get_passthrough_types()
+    assert Integer(name='id').get_passthrough_types()
+    assert Field(name='foo').get_passthrough_types() == ()
+    assert Float(name='score').get_passthrough_types() == ()
+
+    assert String(name='name', max=10).get_passthrough_types() == ()
+    assert String(name='name', blank=False).get_passthrough_types() == ()
+    assert String(name='name', choices=['a']).get_passthrough_types() == ()
+    assert String(name='name', read_only=True).get_passthrough_types() == ()
+    assert String(name='name', source='other').get_passthrough_types() == ()
+    assert Integer(name='id', min=1).get_passthrough_types() == ()
+    assert Integer(
+        name='id', extra_marshal_pipes={'validation': [pipe]}
+    ).get_passthrough_types() == ()
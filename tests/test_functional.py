@@ -1,15 +1,17 @@
 # encoding: utf-8
+import json
 import pytest
 import mock
 
 from kim import (
     MappingInvalid, MapperError, Mapper, PolymorphicMapper, blacklist, Integer,
     Collection, String, whitelist)
+from kim.mapper import MapperIterator
 from kim.pipelines import marshaling
 from kim.pipelines import serialization
 
 from .helpers import TestType
-from .fixtures import SchedulableMapper, EventMapper
+from .fixtures import SchedulableMapper, EventMapper, TaskMapper
 
 
 def test_field_serialize_from_source():
@@ -608,3 +610,112 @@ def test_field_serialize_None():
 
     with pytest.raises(MapperError):
         mapper.serialize()
+
+
+def test_marshal_polymorphic_mapper_many_collect_errors():
+
+    data = [
+        {'object_type': 'event', 'name': 'Test Event', 'location': 'London'},
+        {'name': 'Test Event', 'location': 'London'},
+    ]
+
+    output, errors = SchedulableMapper.many().marshal(
+        data, collect_errors=True)
+
+    assert len(output) == 1
+    assert output[0].location == 'London'
+    assert list(errors) == [1]
+
+
+def test_marshal_polymorphic_mapper_many_groups_by_identity():
+
+    data = [
+        {'object_type': 'event', 'name': 'Party', 'location': 'London'},
+        {'object_type': 'task', 'name': 'Shopping', 'status': 'Done'},
+        {'object_type': 'review', 'name': 'Review'},
+        {'name': 'Missing'},
+        {'object_type': 'event', 'name': 'Gig', 'location': 'Leeds'},
+    ]
+
+    iterator = SchedulableMapper.many()
+    groups, errors = iterator.group(data, marshal=True)
+    assert groups == {EventMapper: [0, 4], TaskMapper: [1]}
+    assert list(groups) == [EventMapper, TaskMapper]
+    assert errors == {2: 'invalid choice', 3: 'This is a required field'}
+
+    output, errors = iterator.marshal(data, collect_errors=True)
+    assert [obj.name for obj in output] == ['Party', 'Shopping', 'Gig']
+    assert output[0].location == 'London'
+    assert output[1].status == 'Done'
+    assert errors == {
+        2: {'object_type': 'invalid choice'},
+        3: {'object_type': 'This is a required field'},
+    }
+
+    with pytest.raises(MappingInvalid) as e:
+        iterator.marshal(data)
+    assert e.value.errors == {'object_type': 'invalid choice'}
+
+    output = iterator.marshal([data[4], data[1]])
+    assert [obj.name for obj in output] == ['Gig', 'Shopping']
+
+
+def test_serialize_polymorphic_mapper_many_groups_by_identity():
+
+    objs = [
+        TestType(id=1, name='bob', location='London', object_type='event'),
+        TestType(id=2, name='fred', status='Done', object_type='task'),
+        TestType(id=3, name='jim', location='Leeds', object_type='event'),
+    ]
+
+    iterator = SchedulableMapper.many()
+    assert iterator.serialize(objs, role='public') == [
+        {'id': 1, 'name': 'bob', 'location': 'London'},
+        {'id': 2, 'name': 'fred', 'status': 'Done'},
+        {'id': 3, 'name': 'jim', 'location': 'Leeds'},
+    ]
+    assert json.loads(iterator.serialize_json(objs, role='name_only')) == [
+        {'name': 'bob'}, {'name': 'fred'}, {'name': 'jim'}]
+    assert iterator.serialize_roles(objs, ['name_only', 'public'])[0] == [
+        {'name': 'bob'}, {'name': 'fred'}, {'name': 'jim'}]
+
+    # Objects without a polymorphic key are serialized by the base mapper
+    objs.append(TestType(id=4, name='sam'))
+    assert iterator.serialize(objs)[3] == {
+        'id': 4, 'name': 'sam', 'object_type': None}
+
+    objs.append(TestType(id=5, name='tom', object_type='review'))
+    with pytest.raises(MapperError):
+        iterator.serialize(objs)
+
+    # Identities use a plain MapperIterator
+    assert type(EventMapper.many()) is MapperIterator
+
+
+def test_marshal_polymorphic_mapper_many_marshal_disabled():
+
+    class MapperA(PolymorphicMapper):
+
+        __type__ = TestType
+
+        name = String()
+        object_type = String(choices=['task'])
+
+        __mapper_args__ = {
+            'polymorphic_on': object_type,
+        }
+
+    class MapperB(MapperA):
+
+        __mapper_args__ = {
+            'polymorphic_name': 'task'
+        }
+
+    data = [{'object_type': 'task', 'name': 'Shopping'}, {'name': 'Party'}]
+
+    output, errors = MapperA.many().marshal(data, collect_errors=True)
+    assert output == []
+    assert errors == {
+        0: {'object_type': 'PolymorphicMapper does not allow marshaling'},
+        1: {'object_type': 'This is a required field'},
+    }
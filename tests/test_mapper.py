@@ -1,5 +1,14 @@
+import gc
+import threading
+import time
+
+import mock
 import pytest
 
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from kim.cache import SerializationMemo
 from kim.exception import MapperError, MappingInvalid
 from kim.mapper import (
     Mapper, _MapperConfig, get_mapper_from_registry, PolymorphicMapper)
@@ -1054,3 +1063,1586 @@ def test_mapper_with_invalid_collection_fields_sets_errors():
         mapper.marshal()
 
     assert mapper.errors == {'users': {'id': 'This is a required field'}}
+
+
+def test_mapper_marshal_with_executor_runs_getters_concurrently():
+
+    # threading.Barrier is not available on Python 2.
+    arrived = []
+    condition = threading.Condition()
+
+    def getter(session):
+        # Both getters must be running at the same time to pass.
+        with condition:
+            arrived.append(session.data['id'])
+            condition.notify_all()
+            deadline = time.time() + 5
+            while len(arrived) < 2 and time.time() < deadline:
+                condition.wait(deadline - time.time())
+            assert len(arrived) == 2
+        return TestType(id=session.data['id'])
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        user = Nested(UserMapper, getter=getter)
+        owner = Nested(UserMapper, getter=getter)
+
+    data = {'user': {'id': 1}, 'owner': {'id': 2}}
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        result = MapperBase(data=data).marshal(executor=executor)
+
+    assert result.user.id == 1
+    assert result.owner.id == 2
+
+
+def test_mapper_marshal_with_executor_collects_errors():
+
+    class UserMapper(Mapper):
+
+        __type__ = dict
+
+        id = String(required=True)
+        name = String()
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+        user = Nested(UserMapper, allow_create=True)
+        users = Collection(Nested(UserMapper, allow_create=True))
+
+    data = {'id': 'abc', 'name': 'bob', 'user': {'name': 1},
+            'users': [{'id': 'foo', 'name': 'a'}, {'name': 'b'}]}
+
+    mapper = MapperBase(data=data)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(MappingInvalid):
+            mapper.marshal(executor=executor)
+
+    assert mapper.errors == {
+        'id': 'Invalid type',
+        'user': {'id': 'This is a required field'},
+        'users': {'id': 'This is a required field'},
+    }
+    assert list(mapper.errors.keys()) == ['id', 'user', 'users']
+
+
+def test_mapper_marshal_many_with_executor():
+
+    class MapperBase(Mapper):
+
+        __type__ = dict
+
+        id = Integer()
+        name = String()
+
+    data = [{'id': i, 'name': 'user %s' % i} for i in range(20)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        result = MapperBase.many().marshal(data, executor=executor)
+
+    assert result == data
+
+
+def test_mapper_iterator_get_mapper_does_not_change_params():
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+
+    iterator = MapperBase.many(partial=True)
+    mapper = iterator.get_mapper(data={'id': 1})
+
+    assert mapper.data == {'id': 1}
+    assert mapper.partial is True
+    assert iterator.mapper_params == {'partial': True}
+
+
+def test_mapper_iterator_shared_between_threads():
+
+    class UserMapper(Mapper):
+
+        __type__ = dict
+
+        id = Integer()
+        name = String()
+
+    class MapperBase(Mapper):
+
+        __type__ = dict
+
+        id = Integer()
+        user = Nested('UserMapper', allow_create=True)
+
+    serialize_many = MapperBase.many()
+    marshal_many = MapperBase.many()
+    failures = []
+
+    def worker(index):
+        data = [{'id': index, 'user': {'id': index, 'name': 'user %s' % index}}]
+        for i in range(200):
+            if serialize_many.serialize(data) != data:
+                failures.append(index)
+            if marshal_many.marshal(data) != data:
+                failures.append(index)
+
+    threads = [threading.Thread(target=worker, args=(i, )) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+
+
+def test_mapper_serialize_many_with_memo():
+
+    calls = []
+
+    class Author(object):
+
+        def __init__(self, name):
+            self._name = name
+
+        @property
+        def name(self):
+            calls.append(self._name)
+            return self._name
+
+    class AuthorMapper(Mapper):
+
+        __type__ = TestType
+
+        name = String()
+
+    class PostMapper(Mapper):
+
+        __type__ = TestType
+
+        title = String()
+        author = Nested(AuthorMapper)
+
+    bruce, martha = Author('bruce'), Author('martha')
+    posts = [TestType(title='post %s' % i, author=bruce) for i in range(5)]
+    posts.append(TestType(title='post 5', author=martha))
+
+    result = PostMapper.many().serialize(posts, memo=True)
+
+    assert [r['author']['name'] for r in result] == ['bruce'] * 5 + ['martha']
+    assert calls == ['bruce', 'martha']
+    # repeated objects share the memoized output by default
+    assert result[0]['author'] is result[1]['author']
+
+
+def test_mapper_serialize_memo_copy():
+
+    class AuthorMapper(Mapper):
+
+        __type__ = TestType
+
+        name = String()
+
+    class PostMapper(Mapper):
+
+        __type__ = TestType
+
+        author = Nested(AuthorMapper)
+        editor = Nested(AuthorMapper)
+        reviewers = Collection(Nested(AuthorMapper))
+
+    bruce = TestType(name='bruce')
+    post = TestType(author=bruce, editor=bruce, reviewers=[bruce, bruce])
+
+    memo = SerializationMemo(copy=True)
+    result = PostMapper(obj=post).serialize(memo=memo)
+
+    assert result == {
+        'author': {'name': 'bruce'},
+        'editor': {'name': 'bruce'},
+        'reviewers': [{'name': 'bruce'}, {'name': 'bruce'}],
+    }
+    assert result['author'] is not result['editor']
+    # one entry for the author and one for the post itself
+    assert len(memo) == 2
+
+
+def test_mapper_serialize_memo_keyed_by_role():
+
+    class AuthorMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+
+        __roles__ = {
+            'id_only': ['id'],
+        }
+
+    class PostMapper(Mapper):
+
+        __type__ = TestType
+
+        author = Nested(AuthorMapper)
+        editor = Nested(AuthorMapper, role='id_only')
+
+    bruce = TestType(id=1, name='bruce')
+    post = TestType(author=bruce, editor=bruce)
+
+    result = PostMapper(obj=post).serialize(memo=True)
+
+    assert result == {
+        'author': {'id': 1, 'name': 'bruce'},
+        'editor': {'id': 1},
+    }
+
+
+def test_mapper_serialize_roles():
+
+    calls = []
+
+    class User(object):
+
+        id = 1
+        email = 'bruce@wayneenterprises.com'
+
+        @property
+        def name(self):
+            calls.append('name')
+            return 'bruce'
+
+    class UserMapper(Mapper):
+
+        __type__ = User
+
+        id = Integer()
+        name = String()
+        email = String()
+        secret = String(source='email', name='private_email')
+
+        __roles__ = {
+            'public': whitelist('id', 'name'),
+            'owner': whitelist('id', 'name', 'email', 'secret'),
+        }
+
+    public, owner = UserMapper(obj=User()).serialize_roles(
+        ['public', 'owner'])
+
+    assert public == {'id': 1, 'name': 'bruce'}
+    assert owner == {
+        'id': 1, 'name': 'bruce', 'email': 'bruce@wayneenterprises.com',
+        'private_email': 'bruce@wayneenterprises.com'}
+    assert calls == ['name']
+
+    assert UserMapper(obj=User()).serialize_roles(
+        ['owner'], deferred_role=whitelist('id')) == [{'id': 1}]
+
+    with pytest.raises(MapperError):
+        UserMapper(obj=User()).serialize_roles(['public', 'missing'])
+
+
+def test_mapper_serialize_many_roles():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+
+        __roles__ = {
+            'id_only': whitelist('id'),
+        }
+
+    users = [TestType(id=1, name='bruce'), TestType(id=2, name='alfred')]
+
+    assert UserMapper.many().serialize_roles(users, ['id_only', '__default__']) == [
+        [{'id': 1}, {'id': 2}],
+        [{'id': 1, 'name': 'bruce'}, {'id': 2, 'name': 'alfred'}],
+    ]
+
+
+def test_mapper_serialize_cached_sources():
+
+    calls = []
+
+    class Order(object):
+
+        id = 1
+
+        @property
+        def total(self):
+            calls.append('total')
+            return 10
+
+    class TotalMapper(Mapper):
+
+        __type__ = Order
+
+        total = Integer(cache=True)
+
+    class OrderMapper(Mapper):
+
+        __type__ = Order
+
+        id = Integer()
+        total = Integer(cache=True)
+        amount = Integer(source='total', cache=True)
+        summary = Nested(TotalMapper, source='__self__')
+
+    order = Order()
+    assert OrderMapper(obj=order).serialize() == {
+        'id': 1, 'total': 10, 'amount': 10,
+        'summary': {'total': 10}}
+    assert calls == ['total']
+
+    # values are only memoized for a single call
+    OrderMapper(obj=order).serialize()
+    assert calls == ['total', 'total']
+
+    OrderMapper.many().serialize([order, order])
+    assert calls == ['total', 'total', 'total']
+
+
+def test_mapper_serialize_cached_sources_declared_on_mapper():
+
+    calls = []
+
+    class Order(object):
+
+        @property
+        def total(self):
+            calls.append('total')
+            return 10
+
+    class OrderMapper(Mapper):
+
+        __type__ = Order
+        __cached_sources__ = ('total', )
+
+        total = Integer()
+        amount = Integer(source='total')
+
+    assert OrderMapper(obj=Order()).serialize() == {
+        'total': 10, 'amount': 10}
+    assert calls == ['total']
+
+
+def test_mapper_reserialize():
+
+    calls = []
+
+    class Order(object):
+
+        def __init__(self):
+            self.status = 'new'
+            self.sub = TestType(x=1, y=2)
+
+        @property
+        def total(self):
+            calls.append('total')
+            return 10
+
+    class SubMapper(Mapper):
+
+        __type__ = TestType
+
+        x = Integer()
+        y = Integer()
+
+    class OrderMapper(Mapper):
+
+        __type__ = Order
+
+        status = String()
+        total = Integer()
+        sub = Nested(SubMapper)
+        sub_x = Integer(source='sub.x', required=False)
+
+    order = Order()
+    previous = OrderMapper(obj=order).serialize()
+    assert calls == ['total']
+
+    order.status = 'shipped'
+    order.sub.x = 5
+
+    output, patch = OrderMapper(obj=order).reserialize(
+        previous, {'status', 'sub.x'})
+
+    assert output == OrderMapper(obj=order).serialize()
+    assert patch == [
+        {'op': 'replace', 'path': '/status', 'value': 'shipped'},
+        {'op': 'replace', 'path': '/sub/x', 'value': 5},
+        {'op': 'replace', 'path': '/sub_x', 'value': 5},
+    ]
+    # total is not affected by the changes so it's not read again.
+    assert calls == ['total', 'total']
+    assert previous['status'] == 'new'
+
+    assert OrderMapper(obj=order).reserialize(output, set()) == (output, [])
+
+
+def test_mapper_reserialize_added_and_removed_fields():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String(required=False)
+
+    user = TestType(id=1, name=None)
+    previous = {'id': 1}
+
+    user.name = 'bruce'
+    output, patch = UserMapper(obj=user).reserialize(previous, ['name'])
+    assert output == {'id': 1, 'name': 'bruce'}
+    assert patch == [{'op': 'add', 'path': '/name', 'value': 'bruce'}]
+
+
+def _patch_mappers():
+
+    class CustomerMapper(Mapper):
+
+        __type__ = TestType
+
+        name = String()
+        email = String(required=False)
+
+    class LineMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        qty = Integer()
+
+    class OrderMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer(read_only=True)
+        status = String(choices=['new', 'shipped'])
+        customer = Nested(CustomerMapper, allow_updates_in_place=True)
+        owner = Nested(CustomerMapper, required=False)
+        lines = Collection(
+            Nested(LineMapper, allow_create=True, allow_updates_in_place=True),
+            unique_on='id')
+
+    return OrderMapper
+
+
+def _order():
+
+    return TestType(
+        id=1, status='new',
+        customer=TestType(name='bruce', email=None),
+        owner=TestType(name='alfred', email=None),
+        lines=[TestType(id=10, qty=1), TestType(id=11, qty=2)])
+
+
+def test_mapper_marshal_patch():
+
+    OrderMapper = _patch_mappers()
+    order = _order()
+    line = order.lines[0]
+
+    result = OrderMapper(obj=order).marshal_patch([
+        {'op': 'replace', 'path': '/status', 'value': 'shipped'},
+        {'op': 'replace', 'path': '/customer/email', 'value': 'bruce@wayne.com'},
+        {'op': 'replace', 'path': '/lines/10/qty', 'value': 5},
+        {'op': 'add', 'path': '/lines/-', 'value': {'id': 12, 'qty': 3}},
+        {'op': 'remove', 'path': '/lines/11'},
+        {'op': 'replace', 'path': '/id', 'value': 2},
+    ])
+
+    assert result is order
+    assert order.id == 1
+    assert order.status == 'shipped'
+    assert order.customer.name == 'bruce'
+    assert order.customer.email == 'bruce@wayne.com'
+    assert [(l.id, l.qty) for l in order.lines] == [(10, 5), (12, 3)]
+    # items are updated in place
+    assert order.lines[0] is line
+
+
+def test_mapper_marshal_patch_by_index():
+
+    OrderMapper = _patch_mappers()
+    OrderMapper.fields['lines'].opts.unique_on = None
+    order = _order()
+
+    OrderMapper(obj=order).marshal_patch([
+        {'op': 'add', 'path': '/lines/0', 'value': {'id': 9, 'qty': 1}},
+        {'op': 'replace', 'path': '/lines/2', 'value': {'id': 11, 'qty': 7}},
+    ])
+
+    assert [(l.id, l.qty) for l in order.lines] == [(9, 1), (10, 1), (11, 7)]
+
+
+def test_mapper_marshal_patch_errors():
+
+    OrderMapper = _patch_mappers()
+    order = _order()
+
+    with pytest.raises(MappingInvalid) as e:
+        OrderMapper(obj=order).marshal_patch([
+            {'op': 'replace', 'path': '/status', 'value': 'lost'},
+            {'op': 'replace', 'path': '/missing', 'value': 1},
+            {'op': 'remove', 'path': '/customer/name'},
+            {'op': 'replace', 'path': '/owner/name', 'value': 'jack'},
+            {'op': 'move', 'path': '/lines/10'},
+        ])
+
+    assert e.value.errors == {
+        'status': 'invalid choice',
+        '/missing': 'Invalid path',
+        'customer': {'name': 'This is a required field'},
+        'owner': 'Invalid path',
+        'lines': 'Unsupported patch operation',
+    }
+
+    with pytest.raises(MappingInvalid) as e:
+        OrderMapper(obj=_order()).marshal_patch([
+            {'op': 'replace', 'path': '/lines/11', 'value': {'id': 10, 'qty': 1}},
+        ])
+
+    assert e.value.errors == {'lines': 'duplicates found'}
+
+    with pytest.raises(MappingInvalid) as e:
+        OrderMapper(obj=_order()).marshal_patch([
+            {'op': 'replace', 'path': '/lines/99/qty', 'value': 1},
+        ])
+
+    assert e.value.errors == {'lines': 'Invalid path'}
+
+
+def test_mapper_marshal_patch_rejected_duplicates_leave_collection():
+
+    OrderMapper = _patch_mappers()
+
+    for op in [
+        {'op': 'add', 'path': '/lines/-', 'value': {'id': 10, 'qty': 9}},
+        {'op': 'replace', 'path': '/lines/11', 'value': {'id': 10, 'qty': 9}},
+        {'op': 'replace', 'path': '/lines/11/id', 'value': 10},
+    ]:
+        order = _order()
+        with pytest.raises(MappingInvalid) as e:
+            OrderMapper(obj=order).marshal_patch([op])
+
+        assert e.value.errors == {'lines': 'duplicates found'}
+        assert [(l.id, l.qty) for l in order.lines] == [(10, 1), (11, 2)]
+
+
+def test_mapper_marshal_patch_tracks_keys():
+
+    OrderMapper = _patch_mappers()
+    order = _order()
+
+    OrderMapper(obj=order).marshal_patch([
+        {'op': 'add', 'path': '/lines/0', 'value': {'id': 9, 'qty': 1}},
+        {'op': 'replace', 'path': '/lines/11/qty', 'value': 5},
+        {'op': 'remove', 'path': '/lines/9'},
+        {'op': 'replace', 'path': '/lines/10/id', 'value': 12},
+        {'op': 'replace', 'path': '/lines/12/qty', 'value': 3},
+        {'op': 'add', 'path': '/lines/-', 'value': {'id': 10, 'qty': 4}},
+    ])
+
+    assert [(l.id, l.qty) for l in order.lines] == [(12, 3), (11, 5), (10, 4)]
+
+
+def test_mapper_marshal_partial_selects_fields_in_data():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+        email = String()
+
+    mapper = UserMapper(data={'name': 'bruce', 'unknown': 1}, partial=True)
+    assert [f.name for f in mapper._get_fields('__default__', for_marshal=True)] == ['name']
+
+
+def test_mapper_marshal_only_changed():
+
+    class Tracked(TestType):
+
+        def __setattr__(self, name, value):
+            writes.append(name)
+            super(Tracked, self).__setattr__(name, value)
+
+    class CompanyMapper(Mapper):
+
+        __type__ = Tracked
+
+        name = String()
+
+    class UserMapper(Mapper):
+
+        __type__ = Tracked
+
+        id = Integer()
+        name = String()
+        company = Nested(CompanyMapper, allow_updates_in_place=True)
+        tags = Collection(String())
+
+    writes = []
+    user = Tracked(id=1, name='bruce', company=Tracked(name='wayne'),
+                   tags=['a', 'b'])
+    del writes[:]
+
+    data = {'id': 1, 'name': 'batman', 'company': {'name': 'wayne'},
+            'tags': ['a', 'b']}
+    mapper = UserMapper(obj=user, data=data)
+    result = mapper.marshal(only_changed=True)
+
+    assert result.name == 'batman'
+    assert writes == ['name']
+    assert mapper.changed_fields == {'name'}
+
+    del writes[:]
+    UserMapper(obj=user, data=data).marshal()
+    assert sorted(writes) == ['company', 'id', 'name', 'name', 'tags']
+
+
+def test_mapper_marshal_only_changed_writes_none_to_dict():
+
+    class UserMapper(Mapper):
+
+        __type__ = dict
+
+        name = String(required=False)
+
+    mapper = UserMapper(data={'name': None})
+    assert mapper.marshal(only_changed=True) == {'name': None}
+    assert mapper.changed_fields == {'name'}
+
+    mapper = UserMapper(obj={'name': None}, data={'name': None})
+    assert mapper.marshal(only_changed=True) == {'name': None}
+    assert mapper.changed_fields == set()
+
+
+def test_mapper_validate_data():
+
+    class Untouchable(object):
+
+        def __init__(self):
+            raise AssertionError('__type__ should not be instantiated')
+
+    def getter(session):
+        raise AssertionError('getters should not be called')
+
+    class CompanyMapper(Mapper):
+
+        __type__ = Untouchable
+
+        name = String()
+
+    class TagMapper(Mapper):
+
+        __type__ = Untouchable
+
+        id = Integer()
+
+    class UserMapper(Mapper):
+
+        __type__ = Untouchable
+
+        id = Integer()
+        name = String()
+        company = Nested(CompanyMapper, getter=getter)
+        tags = Collection(Nested(TagMapper, allow_create=True), unique_on='id')
+
+    valid = {'id': 1, 'name': 'bruce', 'company': {'name': 'wayne'},
+             'tags': [{'id': 1}, {'id': 2}]}
+    assert UserMapper(data=valid).validate_data() == {}
+
+    # company is only looked up by its getter, which isn't called.
+    invalid = {'id': 'one', 'company': {}, 'tags': [{'id': 'x'}]}
+    assert UserMapper(data=invalid).validate_data() == {
+        'id': 'Invalid type',
+        'name': 'This is a required field',
+        'tags': {'id': 'Invalid type'},
+    }
+
+    duplicates = dict(valid, tags=[{'id': 1}, {'id': 1}])
+    assert UserMapper(data=duplicates).validate_data() == {
+        'tags': 'duplicates found'}
+
+
+def test_mapper_validate_data_with_getters():
+
+    class CompanyMapper(Mapper):
+
+        __type__ = TestType
+
+        name = String()
+
+    def getter(session):
+        if session.data['name'] == 'wayne':
+            return TestType(name='wayne')
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        company = Nested(CompanyMapper, getter=getter)
+
+    assert UserMapper(data={'company': {'name': 'wayne'}}).validate_data(
+        getters=True) == {}
+    assert UserMapper(data={'company': {'name': 'lex'}}).validate_data(
+        getters=True) == {'company': 'company not found'}
+    assert UserMapper(data={'company': {'name': 'lex'}}).validate_data() == {}
+
+
+def test_mapper_validate_data_accepts_getter_keys():
+
+    users = {2: TestType(id=2, name='jack')}
+
+    def user_getter(session):
+        return users.get(session.data.get('id'))
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+
+    class PostMapper(Mapper):
+
+        __type__ = TestType
+
+        user = Nested(UserMapper, getter=user_getter)
+        editor = Nested(UserMapper, getter=user_getter, allow_create=True,
+                        required=False)
+
+    data = {'user': {'id': 2}, 'editor': {'id': 2}}
+    assert PostMapper(data=data).marshal().user is users[2]
+    assert PostMapper(data=data).validate_data() == {}
+
+    # the keys supplied to a field that may create objects are validated
+    data = {'user': {'id': 2}, 'editor': {'id': 'x'}}
+    assert PostMapper(data=data).validate_data() == {
+        'editor': {'id': 'Invalid type'}}
+
+
+def test_mapper_marshal_fail_fast():
+
+    calls = []
+
+    def counting_pipe(session):
+        calls.append(session.field.name)
+
+    def counted(field_class, **opts):
+        return field_class(
+            extra_marshal_pipes={'validation': [counting_pipe]}, **opts)
+
+    class AddressMapper(Mapper):
+
+        __type__ = TestType
+
+        street = counted(String)
+        city = counted(String)
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        address = Nested(AddressMapper, allow_create=True)
+        id = counted(Integer)
+        name = counted(String)
+
+        def validate(self, output):
+            calls.append('validate')
+
+    data = {'address': {'city': 'gotham'}, 'id': 'one'}
+
+    with pytest.raises(MappingInvalid) as e:
+        UserMapper(data=data).marshal(fail_fast=True)
+
+    assert e.value.errors == {
+        'address': {'street': 'This is a required field'}}
+    assert calls == []
+
+    with pytest.raises(MappingInvalid) as e:
+        UserMapper(data=data).marshal()
+
+    assert e.value.errors == {
+        'address': {'street': 'This is a required field'},
+        'id': 'Invalid type',
+        'name': 'This is a required field',
+    }
+    assert calls == ['city', 'validate']
+
+
+def test_mapper_marshal_many_fail_fast():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+
+    with pytest.raises(MappingInvalid) as e:
+        UserMapper.many().marshal(
+            [{'id': 1, 'name': 'bruce'}, {'id': 'two'}], fail_fast=True)
+
+    assert e.value.errors == {'id': 'Invalid type'}
+
+
+def test_mapper_marshal_collects_errors_without_exceptions():
+
+    class AddressMapper(Mapper):
+
+        __type__ = TestType
+
+        street = String()
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        address = Nested(AddressMapper, allow_create=True)
+        tags = Collection(Integer())
+
+    data = {'id': 'one', 'address': {}, 'tags': [1, 'two']}
+    mapper = UserMapper(data=data)
+
+    with mock.patch('kim.field.Field.invalid') as invalid:
+        with pytest.raises(MappingInvalid) as e:
+            mapper.marshal()
+
+    assert not invalid.called
+    assert e.value.errors == {
+        'id': 'Invalid type',
+        'address': {'street': 'This is a required field'},
+        'tags': 'Invalid type',
+    }
+
+
+def test_mapper_marshal_custom_pipe_invalid():
+
+    def not_bruce(session):
+        if session.data == 'bruce':
+            return session.invalid(error='bruce is not allowed')
+
+    def raises_invalid(session):
+        raise session.field.invalid('type_error')
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        name = String(extra_marshal_pipes={'validation': [not_bruce]})
+        id = Integer(extra_marshal_pipes={'validation': [raises_invalid]})
+
+    with pytest.raises(MappingInvalid) as e:
+        UserMapper(data={'name': 'bruce', 'id': 1}).marshal()
+
+    assert e.value.errors == {'name': 'bruce is not allowed',
+                              'id': 'Invalid type'}
+
+
+def test_mapper_marshal_many_collect_errors():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+
+    data = [
+        {'id': 1, 'name': 'bruce'},
+        {'id': 'two', 'name': 'clark'},
+        {'id': 3, 'name': 'diana'},
+        {'id': 4},
+    ]
+
+    output, errors = UserMapper.many().marshal(data, collect_errors=True)
+
+    assert [obj.name for obj in output] == ['bruce', 'diana']
+    assert errors == {
+        1: {'id': 'Invalid type'},
+        3: {'name': 'This is a required field'},
+    }
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        output, errors = UserMapper.many().marshal(
+            data, executor=executor, collect_errors=True)
+
+    assert [obj.name for obj in output] == ['bruce', 'diana']
+    assert sorted(errors) == [1, 3]
+
+
+def test_mapper_marshal_many_collect_errors_max_errors():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+
+    data = [{'id': 'one'}, {'id': 2}, {'id': 'three'}, {'id': 'four'}]
+
+    output, errors = UserMapper.many().marshal(
+        data, collect_errors=True, max_errors=2)
+
+    assert [obj.id for obj in output] == [2]
+    assert errors == {0: {'id': 'Invalid type'}, 2: {'id': 'Invalid type'}}
+
+
+def test_mapper_construct_namedtuple():
+
+    User = namedtuple('User', ['id', 'name'])
+
+    class UserMapper(Mapper):
+
+        __type__ = User
+        __construct__ = True
+
+        id = Integer()
+        name = String()
+
+    user = UserMapper(data={'id': 1, 'name': 'bruce'}).marshal()
+    assert user == User(1, 'bruce')
+
+    user = UserMapper(data={'id': 2, 'name': 'bruce'}, obj=user,
+                      partial=True).marshal()
+    assert user == User(2, 'bruce')
+
+    with pytest.raises(MappingInvalid) as e:
+        UserMapper(data={'id': 'one'}).marshal()
+    assert e.value.errors == {'id': 'Invalid type',
+                              'name': 'This is a required field'}
+
+
+def test_mapper_construct_dataclass():
+
+    dataclasses = pytest.importorskip('dataclasses')
+
+    User = dataclasses.make_dataclass('User', ['id', 'name'], frozen=True)
+
+    class UserMapper(Mapper):
+
+        __type__ = User
+        __construct__ = True
+
+        id = Integer()
+        name = String()
+
+    user = UserMapper(data={'id': 1, 'name': 'bruce'}).marshal()
+    assert user == User(id=1, name='bruce')
+
+    user = UserMapper(data={'name': 'clark'}, obj=user, partial=True).marshal()
+    assert user == User(id=1, name='clark')
+
+
+def test_mapper_construct_kwargs_and_dict():
+
+    class Slotted(object):
+
+        __slots__ = ('id', 'name')
+
+        def __init__(self, id, name):
+            self.id = id
+            self.name = name
+
+    class Plain(object):
+        pass
+
+    class SlottedMapper(Mapper):
+
+        __type__ = Slotted
+        __construct__ = True
+
+        id = Integer()
+        name = String()
+
+    class PlainMapper(Mapper):
+
+        __type__ = Plain
+        __construct__ = True
+
+        id = Integer()
+        name = String()
+
+    data = {'id': 1, 'name': 'bruce'}
+
+    assert SlottedMapper(data=data)._get_construct() == 'kwargs'
+    obj = SlottedMapper(data=data).marshal()
+    assert (obj.id, obj.name) == (1, 'bruce')
+
+    assert PlainMapper(data=data)._get_construct() == 'dict'
+    obj = PlainMapper(data=data).marshal()
+    assert vars(obj) == data
+
+    existing = Plain()
+    existing.extra = True
+    obj = PlainMapper(data=data, obj=existing).marshal()
+    assert obj is existing
+    assert vars(obj) == {'id': 1, 'name': 'bruce', 'extra': True}
+
+    with pytest.raises(MapperError):
+        SlottedMapper(data=data, obj=Slotted(1, 'bruce')).marshal()
+
+
+def test_mapper_construct_updates_nested_of_existing_obj():
+
+    class Address(object):
+        pass
+
+    class Person(object):
+        pass
+
+    class AddressMapper(Mapper):
+
+        __type__ = Address
+
+        city = String()
+
+    class PersonMapper(Mapper):
+
+        __type__ = Person
+        __construct__ = 'dict'
+
+        name = String()
+        address = Nested(AddressMapper, allow_updates_in_place=True)
+        homes = Collection(Nested(AddressMapper, allow_updates_in_place=True))
+
+    address, home = Address(), Address()
+    address.city = 'gotham'
+    home.city = 'york'
+
+    person = Person()
+    person.name = 'bruce'
+    person.address = address
+    person.homes = [home]
+
+    obj = PersonMapper(obj=person, data={
+        'name': 'bruce', 'address': {'city': 'metropolis'},
+        'homes': [{'city': 'leeds'}]}).marshal(only_changed=True)
+
+    assert obj is person
+    assert obj.address is address
+    assert address.city == 'metropolis'
+    assert obj.homes[0] is home
+    assert home.city == 'leeds'
+
+
+def test_mapper_construct_uses_descriptors():
+
+    class Temperature(object):
+
+        @property
+        def celsius(self):
+            return self._celsius
+
+        @celsius.setter
+        def celsius(self, value):
+            self._celsius = value
+
+    class TemperatureMapper(Mapper):
+
+        __type__ = Temperature
+        __construct__ = 'dict'
+
+        celsius = Integer()
+
+    obj = TemperatureMapper(data={'celsius': 20}).marshal()
+    assert obj._celsius == 20
+
+    existing = Temperature()
+    existing.celsius = 10
+    assert TemperatureMapper(
+        obj=existing, data={'celsius': 30}).marshal() is existing
+    assert existing._celsius == 30
+
+    TemperatureMapper.__construct__ = True
+    assert TemperatureMapper(data={'celsius': 20})._get_construct() is None
+
+
+def test_mapper_construct_rejects_dotted_sources():
+
+    with pytest.raises(MapperError):
+
+        class UserMapper(Mapper):
+
+            __type__ = TestType
+            __construct__ = 'dict'
+
+            city = String(source='address.city')
+
+    with pytest.raises(MapperError):
+
+        class SelfMapper(Mapper):
+
+            __type__ = TestType
+            __construct__ = True
+
+            name = String(source='__self__')
+
+
+def test_mapper_construct_missing_values():
+
+    User = namedtuple('User', ['id', 'name'])
+
+    class UserMapper(Mapper):
+
+        __type__ = User
+        __construct__ = 'tuple'
+
+        id = Integer()
+
+    with pytest.raises(MapperError):
+        UserMapper(data={'id': 1}).marshal()
+
+    class BadMapper(Mapper):
+
+        __type__ = User
+        __construct__ = 'positional'
+
+        id = Integer()
+
+    with pytest.raises(MapperError):
+        BadMapper(data={'id': 1}).marshal()
+
+
+def test_mapper_record_type():
+
+    class UserMapper(Mapper):
+
+        __type__ = dict
+
+        id = Integer(read_only=True)
+        name = String()
+        email = String(source='contact')
+
+        __roles__ = {
+            'name_only': ['name'],
+        }
+
+    record_type = UserMapper.record_type()
+    assert record_type.__slots__ == ('name', 'contact')
+    assert UserMapper.record_type() is record_type
+    assert UserMapper.record_type('name_only').__slots__ == ('name', )
+    assert UserMapper.record_type(kind='tuple')._fields == ('name', 'contact')
+
+    with pytest.raises(MapperError):
+        UserMapper.record_type('missing')
+
+    with pytest.raises(MapperError):
+        UserMapper.record_type(kind='list')
+
+    class DottedMapper(Mapper):
+
+        __type__ = dict
+
+        name = String(source='user.name')
+
+    with pytest.raises(MapperError):
+        DottedMapper.record_type()
+
+
+def test_mapper_marshal_record():
+
+    class UserMapper(Mapper):
+
+        __type__ = dict
+
+        id = Integer()
+        name = String()
+
+    data = {'id': 1, 'name': 'bruce'}
+
+    user = UserMapper(data=data).marshal(record='slots')
+    assert type(user) is UserMapper.record_type()
+    assert user._asdict() == data
+
+    users = UserMapper.many().marshal([data, data], record='tuple')
+    assert [dict(u._asdict()) for u in users] == [data, data]
+
+    with pytest.raises(MappingInvalid):
+        UserMapper(data={'id': 'one'}).marshal(record='slots')
+
+
+def test_mapper_marshal_passthrough():
+
+    calls = []
+
+    def counting_pipe(session):
+        calls.append(session.field.name)
+
+    class AddressMapper(Mapper):
+
+        __type__ = dict
+
+        city = String()
+
+    class UserMapper(Mapper):
+
+        __type__ = dict
+
+        id = Integer()
+        name = String()
+        nickname = String(required=False)
+        age = Integer(extra_marshal_pipes={'validation': [counting_pipe]})
+        address = Nested(AddressMapper, allow_create=True, required=False)
+
+    data = {'id': 1, 'name': u'bruce', 'age': 40,
+            'address': {'city': u'gotham'}}
+
+    with mock.patch('kim.field.Field.marshal',
+                    side_effect=Field.marshal, autospec=True) as marshal:
+        result = UserMapper(data=data).marshal()
+
+    assert result == {'id': 1, 'name': u'bruce', 'nickname': None, 'age': 40,
+                      'address': {'city': u'gotham'}}
+    assert result is not data
+    assert sorted(call[0][0].name for call in marshal.call_args_list) == \
+        ['address', 'age', 'nickname']
+    assert calls == ['age']
+
+    # values of other types still run through the pipeline
+    result = UserMapper(data={'id': '2', 'name': u'bruce', 'age': 1}).marshal()
+    assert result['id'] == 2
+
+    result = UserMapper(data={'id': True, 'name': 1, 'age': 1}).marshal()
+    assert type(result['id']) is int
+    assert result['name'] == u'1'
+
+
+def test_mapper_marshal_reuse_input():
+
+    class UserMapper(Mapper):
+
+        __type__ = dict
+
+        id = Integer()
+        name = String()
+        email = String(required=False)
+        password = String(read_only=True)
+
+    data = {'id': 1, 'name': u'bruce'}
+    result = UserMapper(data=data).marshal(reuse_input=True)
+    assert result is data
+    assert result == {'id': 1, 'name': u'bruce', 'email': None}
+
+    data = {'id': '1', 'name': u'bruce'}
+    result = UserMapper(data=data).marshal(reuse_input=True)
+    assert result is data
+    assert result == {'id': 1, 'name': u'bruce', 'email': None}
+
+    # Unknown and read only keys must not be copied to the output.
+    for data in [{'id': 1, 'name': u'bruce', 'admin': True},
+                 {'id': 1, 'name': u'bruce', 'password': u'secret'}]:
+        result = UserMapper(data=data).marshal(reuse_input=True)
+        assert result is not data
+        assert result == {'id': 1, 'name': u'bruce', 'email': None}
+
+    data = [{'id': 1, 'name': u'bruce'}]
+    assert UserMapper.many().marshal(data, reuse_input=True)[0] is data[0]
+
+
+def test_mapper_marshal_many_validate_many():
+
+    calls = []
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        email = String()
+
+        @classmethod
+        def validate_many(cls, outputs):
+            calls.append(sorted(outputs))
+            seen = set(['taken@example.com'])
+            errors = {}
+            for index, obj in outputs.items():
+                if obj.email in seen:
+                    errors[index] = {'email': 'already exists'}
+                seen.add(obj.email)
+            return errors
+
+    data = [
+        {'id': 1, 'email': 'bruce@example.com'},
+        {'id': 2, 'email': 'clark@example.com'},
+    ]
+    output = UserMapper.many().marshal(data)
+    assert [obj.id for obj in output] == [1, 2]
+    assert calls == [[0, 1]]
+
+    data.append({'id': 3, 'email': 'bruce@example.com'})
+    with pytest.raises(MappingInvalid) as e:
+        UserMapper.many().marshal(data)
+    assert e.value.errors == {2: {'email': 'already exists'}}
+
+    data.append({'id': 'four', 'email': 'diana@example.com'})
+    data.append({'id': 5, 'email': 'taken@example.com'})
+    del calls[:]
+    output, errors = UserMapper.many().marshal(data, collect_errors=True)
+
+    assert calls == [[0, 1, 2, 4]]
+    assert [obj.id for obj in output] == [1, 2]
+    assert errors == {
+        2: {'email': 'already exists'},
+        3: {'id': 'Invalid type'},
+        4: {'email': 'already exists'},
+    }
+
+    output, errors = UserMapper.many().marshal(
+        data, collect_errors=True, max_errors=2)
+    assert [obj.id for obj in output] == [1, 2]
+    assert sorted(errors) == [2, 3]
+
+
+def test_mapper_marshal_many_validate_many_unknown_index():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+
+        @classmethod
+        def validate_many(cls, outputs):
+            # Report an item that failed field validation and a stray index
+            return {1: {'id': 'duplicate'}, 7: {'id': 'duplicate'}}
+
+    data = [{'id': 1}, {'id': 'two'}]
+    output, errors = UserMapper.many().marshal(data, collect_errors=True)
+
+    assert [obj.id for obj in output] == [1]
+    assert errors == {1: {'id': 'Invalid type'}, 7: {'id': 'duplicate'}}
+
+
+def test_mapper_marshal_strict():
+
+    class AddressMapper(Mapper):
+
+        __type__ = TestType
+
+        city = String()
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = Integer(read_only=True)
+        name = String()
+        addresses = Collection(Nested(AddressMapper, allow_create=True),
+                               required=False)
+
+        __roles__ = {
+            'name_only': ['name'],
+        }
+
+    data = {'id': 1, 'name': 'bruce', 'admin': True, 'junk': 'x' * 100}
+
+    # unknown keys are ignored by default
+    assert UserMapper(data=data).marshal().name == 'bruce'
+
+    mapper = UserMapper(data=data)
+    with mock.patch('kim.field.Field.marshal') as marshal:
+        with pytest.raises(MappingInvalid) as e:
+            mapper.marshal(strict=True)
+    assert not marshal.called
+    assert e.value.errors == {'admin': 'Unknown field', 'junk': 'Unknown field'}
+
+    with pytest.raises(MappingInvalid) as e:
+        UserMapper(data={'name': 'bruce', 'id': 1}).marshal(
+            role='name_only', strict=True)
+    assert e.value.errors == {'id': 'Unknown field'}
+
+    data = {'name': 'bruce', 'addresses': [{'city': 'gotham', 'zip': 1}]}
+    with pytest.raises(MappingInvalid) as e:
+        UserMapper(data=data).marshal(strict=True)
+    assert e.value.errors == {'addresses': {'zip': 'Unknown field'}}
+
+    assert UserMapper(data=data).validate_data(strict=True) == \
+        {'addresses': {'zip': 'Unknown field'}}
+
+    class StrictAddressMapper(AddressMapper):
+
+        __strict__ = True
+
+    class OtherUserMapper(Mapper):
+
+        __type__ = TestType
+
+        address = Nested(StrictAddressMapper, allow_create=True)
+
+    with pytest.raises(MappingInvalid) as e:
+        OtherUserMapper(data={'address': {'city': 'gotham', 'zip': 1}}).marshal()
+    assert e.value.errors == {'address': {'zip': 'Unknown field'}}
+
+
+def test_mapper_marshal_limits():
+
+    class TagMapper(Mapper):
+
+        __type__ = TestType
+
+        name = String()
+
+    class AddressMapper(Mapper):
+
+        __type__ = TestType
+
+        city = String()
+        tags = Collection(Nested(TagMapper, allow_create=True),
+                          required=False)
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        name = String()
+        nickname = String(max=4, required=False)
+        address = Nested(AddressMapper, allow_create=True, required=False)
+        ids = Collection(Integer(), required=False, max_length=3)
+        scores = Collection(Integer(), required=False)
+
+        __limits__ = {
+            'max_depth': 1,
+            'max_collection_length': 2,
+            'max_string_length': 5,
+        }
+
+    data = {'name': 'bruce', 'nickname': 'bat', 'ids': [1, 2, 3],
+            'scores': [1, 2], 'address': {'city': 'york'}}
+    user = UserMapper(data=data).marshal()
+    assert user.ids == [1, 2, 3]
+    assert user.address.city == 'york'
+
+    with pytest.raises(MappingInvalid) as e:
+        UserMapper(data={
+            'name': 'bruce wayne', 'nickname': 'batman', 'ids': [1] * 4,
+            'scores': [1, 2, 3], 'address': {'city': 'gotham'},
+        }).marshal()
+    assert e.value.errors == {
+        'name': 'value is too long',
+        'nickname': 'value out of allowed range',
+        'ids': 'value is too long',
+        'scores': 'value is too long',
+        'address': {'city': 'value is too long'},
+    }
+
+    with pytest.raises(MappingInvalid) as e:
+        UserMapper(data={'name': 'bruce',
+                         'address': {'city': 'york',
+                                     'tags': [{'name': 'home'}]}}).marshal()
+    assert e.value.errors == {
+        'address': {'tags': 'maximum nesting depth exceeded'}}
+
+    # Mappers without limits are unaffected
+    assert AddressMapper(data={'city': 'gotham' * 10}).marshal().city == \
+        'gotham' * 10
+
+
+def test_mapper_marshal_limits_passthrough():
+
+    class UserMapper(Mapper):
+
+        __type__ = dict
+
+        name = String()
+
+        __limits__ = {'max_string_length': 5}
+
+    assert UserMapper(data={'name': u'bruce'}).marshal() == {'name': u'bruce'}
+
+    with pytest.raises(MappingInvalid) as e:
+        UserMapper(data={'name': u'bruce wayne'}).marshal()
+    assert e.value.errors == {'name': 'value is too long'}
+
+
+def test_mapper_marshal_many_bulk():
+
+    class TagMapper(Mapper):
+
+        __type__ = dict
+
+        kind = String(choices=['home', 'work'])
+
+    class UserMapper(Mapper):
+
+        __type__ = dict
+
+        name = String()
+        status = String(choices=['active', 'inactive'])
+        city = String(intern=True)
+        tags = Collection(Nested(TagMapper, allow_create=True))
+
+    def make_row(name):
+        return {'name': name, 'status': ''.join(['act', 'ive']),
+                'city': ''.join(['got', 'ham']),
+                'tags': [{'kind': ''.join(['ho', 'me'])}]}
+
+    rows = [make_row('bruce'), make_row('dick')]
+    output = UserMapper.many().marshal(rows, bulk=True)
+    assert output == UserMapper.many().marshal(rows)
+    assert gc.isenabled()
+
+    first, second = output
+    assert first['status'] is second['status']
+    assert first['city'] is second['city']
+    assert first['tags'][0]['kind'] is second['tags'][0]['kind']
+    assert second['status'] is rows[0]['status']
+
+    # Without bulk every row keeps its own copy
+    first, second = UserMapper.many().marshal(rows)
+    assert first['status'] is not second['status']
+
+    rows.append({'name': 'jason', 'status': 'unknown', 'city': 'gotham',
+                 'tags': []})
+    with pytest.raises(MappingInvalid) as e:
+        UserMapper.many().marshal(rows, bulk=True)
+    assert e.value.errors == {'status': 'invalid choice'}
+    assert gc.isenabled()
+
+    output, errors = UserMapper.many().marshal(rows, bulk=True,
+                                               collect_errors=True)
+    assert len(output) == 2
+    assert errors == {2: {'status': 'invalid choice'}}
+
+
+def test_get_fields_plan_is_cached_per_role():
+
+    class MapperBase(Mapper):
+
+        __type__ = TestType
+
+        id = Integer()
+        name = String()
+
+        __roles__ = {
+            'private': ['id', ]
+        }
+
+    mapper = MapperBase(data={'id': 2})
+    fields = mapper._get_fields('private')
+    assert MapperBase._field_plans == {'private': (MapperBase.fields['id'], )}
+
+    # Callers receive a copy of the plan
+    fields.append(MapperBase.fields['name'])
+    assert mapper._get_fields('private') == [MapperBase.fields['id']]
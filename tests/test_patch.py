@@ -0,0 +1,38 @@
+import pytest
+
+from kim.patch import diff, make_pointer, parse_pointer
+
+
+def test_pointers_are_escaped():
+
+    pointer = make_pointer(['a/b', 'm~n', 0])
+
+    assert pointer == '/a~1b/m~0n/0'
+    assert parse_pointer(pointer) == ['a/b', 'm~n', '0']
+    assert parse_pointer('') == []
+
+    with pytest.raises(ValueError):
+        parse_pointer('a/b')
+
+
+def test_diff_dicts():
+
+    old = {'id': 1, 'name': 'bruce', 'company': {'name': 'wayne', 'id': 2}}
+    new = {'id': 1, 'email': 'bruce@wayne.com', 'company': {'name': 'wayne enterprises', 'id': 2}}
+
+    assert diff(old, new) == [
+        {'op': 'replace', 'path': '/company/name', 'value': 'wayne enterprises'},
+        {'op': 'remove', 'path': '/name'},
+        {'op': 'add', 'path': '/email', 'value': 'bruce@wayne.com'},
+    ]
+    assert diff(old, old) == []
+
+
+def test_diff_lists():
+
+    assert diff([1, {'a': 1}], [1, {'a': 2}]) == [
+        {'op': 'replace', 'path': '/1/a', 'value': 2}]
+    assert diff({'l': [1, 2]}, {'l': [1]}) == [
+        {'op': 'replace', 'path': '/l', 'value': [1]}]
+    assert diff({'a': 1}, {'a': True}) == [
+        {'op': 'replace', 'path': '/a', 'value': True}]
@@ -1,8 +1,10 @@
 import pytest
 
-from kim.field import Field, FieldInvalid, FieldError
+from kim.exception import MappingInvalid
+from kim.field import Field, FieldInvalid, FieldError, Integer
+from kim.mapper import Mapper
 from kim.pipelines.base import (
-    Session,
+    Session, INVALID, run_pipeline,
     get_data_from_source, get_data_from_name, update_output_to_name,
     update_output_to_source, set_default)
 
@@ -208,3 +210,64 @@ def test_set_default_falsy():
     session.data = data['name']
     set_default(session)
     assert session.data == ''
+
+
+def test_session_invalid_raises_by_default():
+
+    field = Integer(name='id')
+    session = Session(field, {'id': 'one'}, {})
+
+    with pytest.raises(FieldInvalid) as e:
+        session.invalid('type_error')
+    assert e.value.message == 'Invalid type'
+
+    with pytest.raises(MappingInvalid) as e:
+        session.invalid(error={'name': 'This is a required field'})
+    assert e.value.errors == {'name': 'This is a required field'}
+
+
+def test_session_invalid_returns_sentinel():
+
+    field = Integer(name='id')
+    mapper_session = Mapper(data={'id': 'one'}).get_mapper_session(
+        {'id': 'one'}, {}, raise_invalid=False)
+    session = Session(field, {'id': 'one'}, {},
+                      mapper_session=mapper_session)
+
+    assert session.invalid('type_error') is INVALID
+    assert session.error == 'Invalid type'
+
+
+def test_run_pipeline_stops_at_invalid():
+
+    calls = []
+
+    def invalid_pipe(session):
+        calls.append('invalid')
+        return session.invalid('type_error')
+
+    def next_pipe(session):
+        calls.append('next')
+
+    field = Integer(name='id')
+    mapper_session = Mapper(data={}).get_mapper_session(
+        {}, {}, raise_invalid=False)
+    session = Session(field, {}, {}, mapper_session=mapper_session)
+
+    assert run_pipeline([invalid_pipe, next_pipe], session, field) is INVALID
+    assert calls == ['invalid']
+    assert session.error == 'Invalid type'
+
+
+def test_field_marshal_returns_error():
+
+    field = Integer(name='id')
+
+    mapper_session = Mapper(data={}).get_mapper_session(
+        {'id': 'one'}, {}, raise_invalid=False)
+    assert field.marshal(mapper_session) == 'Invalid type'
+
+    mapper_session = Mapper(data={}).get_mapper_session(
+        {'id': 1}, {}, raise_invalid=False)
+    assert field.marshal(mapper_session) is None
+    assert mapper_session.output == {'id': 1}
@@ -3,6 +3,8 @@ import pytest
 from kim import Mapper, field
 from kim.exception import MappingInvalid
 from kim.field import FieldInvalid
+from kim.pipelines.base import Session
+from kim.pipelines.collection import check_duplicates
 
 from ..conftest import get_mapper_session
 from ..helpers import TestType
@@ -377,3 +379,78 @@ def test_marshal_collection_required_false():
     output = mapper.marshal()
 
     assert output.readers == []
+
+
+def test_marshal_collection_unique_on_matches_existing():
+
+    class UserMapper(Mapper):
+
+        __type__ = TestType
+
+        id = field.String(required=True)
+        name = field.String()
+
+    users = [TestType(id='1', name='mike'), TestType(id='2', name='jack'),
+             TestType(id='3', name='bob')]
+    data = {'users': [{'id': '3', 'name': 'bobby'}, {'id': '1', 'name': 'mike'},
+                      {'id': '4', 'name': 'jill'}]}
+
+    f = field.Collection(
+        field.Nested('UserMapper', allow_updates_in_place=True,
+                     allow_create=True),
+        name='users', unique_on='id')
+    output = {'users': list(users)}
+    mapper_session = get_mapper_session(data=data, output=output)
+    f.marshal(mapper_session)
+
+    result = output['users']
+    assert result[0] is users[2]
+    assert result[1] is users[0]
+    assert result[2].id == '4'
+    assert users[2].name == 'bobby'
+    assert users[0].name == 'mike'
+
+    changes = mapper_session.mapper.collection_changes['users']
+    assert changes == {
+        'created': [result[2]],
+        'updated': [users[2]],
+        'unchanged': [users[0]],
+        'removed': [users[1]],
+    }
+
+
+def test_marshal_collection_unique_on_replaces_existing():
+
+    class UserMapper(Mapper):
+
+        __type__ = dict
+
+        id = field.String(required=True)
+        name = field.String(required=False)
+
+    users = [{'id': '2', 'name': 'jack'}]
+    data = {'users': [{'id': '2', 'name': None}]}
+
+    f = field.Collection(
+        field.Nested('UserMapper', allow_create=True),
+        name='users', unique_on='id')
+    output = {'users': list(users)}
+    mapper_session = get_mapper_session(data=data, output=output)
+    f.marshal(mapper_session)
+
+    # The element is replaced by a new object with every value written
+    assert output['users'] == [{'id': '2', 'name': None}]
+    assert output['users'][0] is not users[0]
+
+    changes = mapper_session.mapper.collection_changes['users']
+    assert changes['updated'] == output['users']
+
+
+def test_check_duplicates_stores_keys():
+
+    f = field.Collection(field.Integer(), name='ids', unique_on='id')
+    data = {'ids': [{'id': 1}, {'id': 2}]}
+    session = Session(f, data['ids'], {})
+
+    check_duplicates(session)
+    assert session.unique_keys == [1, 2]
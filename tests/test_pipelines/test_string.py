@@ -198,3 +198,33 @@ def test_supports_unicode_from_json():
     mapper_session = get_mapper_session(data=json.loads(data), output=output)
     field.marshal(mapper_session)
     assert output == {'unicode': u'foo →'}
+
+
+def test_intern_string():
+
+    interned = {}
+    data = {'status': ''.join(['act', 'ive'])}
+    field = String(name='status', choices=['active', 'inactive'])
+    assert field.opts.intern is True
+
+    output = {}
+    field.marshal(get_mapper_session(data=data, output=output,
+                                     interned=interned))
+    assert output['status'] == 'active'
+    assert interned == {'active': 'active'}
+
+    other = {}
+    field.marshal(get_mapper_session(
+        data={'status': ''.join(['act', 'ive'])}, output=other,
+        interned=interned))
+    assert other['status'] is output['status']
+
+    # Not interned without the option or outside of a bulk marshal
+    assert String(name='status').opts.intern is False
+    assert String(name='status', choices=['a'], intern=False).opts.intern \
+        is False
+    field = String(name='status')
+    output = {}
+    field.marshal(get_mapper_session(data=data, output=output,
+                                     interned=interned))
+    assert output['status'] is data['status']
@@ -0,0 +1,40 @@
+import pytest
+
+from kim.records import Record, make_record_type, make_tuple_record_type
+
+
+def test_make_record_type():
+
+    User = make_record_type('User', ['id', 'name'])
+
+    assert issubclass(User, Record)
+    assert User.__slots__ == ('id', 'name')
+
+    user = User(id=1, name='bruce')
+    assert user.id == 1
+    assert user.name == 'bruce'
+    assert user._asdict() == {'id': 1, 'name': 'bruce'}
+    assert user == User(id=1, name='bruce')
+    assert user != User(id=2, name='bruce')
+    assert repr(user) == "User(id=1, name='bruce')"
+    assert not hasattr(user, '__dict__')
+
+
+def test_record_defaults_and_unknown_fields():
+
+    User = make_record_type('User', ['id', 'name'])
+
+    assert User(id=1)._asdict() == {'id': 1, 'name': None}
+
+    with pytest.raises(TypeError):
+        User(id=1, email='bruce@wayne.com')
+
+
+def test_make_tuple_record_type():
+
+    User = make_tuple_record_type('User', ['id', 'name'])
+
+    user = User(1)
+    assert user.id == 1
+    assert user.name is None
+    assert dict(user._asdict()) == {'id': 1, 'name': None}
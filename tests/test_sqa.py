@@ -5,7 +5,10 @@ from sqlalchemy.orm import sessionmaker, relationship, backref
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.hybrid import hybrid_property
 
+from kim.cache import SerializationCache
 from kim.mapper import Mapper, MappingInvalid
+from kim.sqa import (
+    CacheInvalidator, changed_sources, identity_tag, unflushed_tags)
 from kim import field
 
 
@@ -331,6 +334,43 @@ def test_marshal_nested_mapper_allow_updates_in_place(db_session):
     assert obj.user.name == 'new name'
 
 
+def test_marshal_construct_updates_instrumented_obj(db_session):
+
+    class UserMapper(Mapper):
+
+        __type__ = User
+        __construct__ = 'dict'
+
+        name = field.String()
+        fullname = field.String(required=False)
+
+    user = User(id=10, name='bob', fullname='bob smith')
+    db_session.add(user)
+    db_session.flush()
+
+    obj = UserMapper(obj=user, data={'name': 'alice'}).marshal()
+
+    assert obj is user
+    assert user in db_session.dirty
+    db_session.flush()
+    db_session.expire(user)
+    assert user.name == 'alice'
+
+    # A new instance is built through its instrumented attributes too
+    new = UserMapper(data={'name': 'carol'}).marshal()
+    db_session.add(new)
+    assert new.name == 'carol'
+
+    class AutoMapper(Mapper):
+
+        __type__ = User
+        __construct__ = True
+
+        name = field.String()
+
+    assert AutoMapper(data={'name': 'dan'})._get_construct() is None
+
+
 def test_marshal_collection_appender_query(db_session):
 
     class UserMapper(Mapper):
@@ -367,3 +407,148 @@ def test_marshal_collection_appender_query(db_session):
     mapper = PostMapper(data=data, obj=instance, partial=True)
     obj = mapper.marshal()
     assert obj.title == 'new title'
+
+
+@pytest.fixture
+def cached(request):
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+
+    class __Cached(object):
+        pass
+
+    cached = __Cached()
+    cached.session = sessionmaker(bind=engine)()
+    cached.cache = SerializationCache(tag=identity_tag,
+                                      changed=unflushed_tags)
+    CacheInvalidator(cached.cache).listen(cached.session)
+    request.addfinalizer(cached.session.close)
+
+    user = User(id=1, name='mike')
+    cached.session.add_all([
+        user,
+        Post(id=1, title='first', user=user),
+        Post(id=2, title='second', user=User(id=2, name='jack')),
+    ])
+    cached.session.commit()
+    return cached
+
+
+def test_identity_tag(cached):
+
+    user = cached.session.query(User).get(1)
+
+    assert identity_tag(user) == cached.session.identity_key(User, 1)
+    assert identity_tag(User(name='transient')) is None
+    assert identity_tag(object()) is None
+
+
+def test_cache_invalidator_evicts_nested_parents(cached, mappers):
+
+    def serialize(id):
+        post = cached.session.query(Post).get(id)
+        return mappers.PostMapper(obj=post).serialize(cache=cached.cache)
+
+    assert serialize(1) == {'title': 'first', 'user': {'id': 1, 'name': 'mike'}}
+    assert serialize(2) == {'title': 'second', 'user': {'id': 2, 'name': 'jack'}}
+    # posts and their users are cached without defining a version
+    assert len(cached.cache) == 4
+
+    user = cached.session.query(User).get(1)
+    user.name = 'mike w'
+    assert len(cached.cache) == 4
+
+    # the user and the post it's nested in are evicted
+    cached.session.flush()
+    assert len(cached.cache) == 2
+    assert serialize(1) == {'title': 'first', 'user': {'id': 1, 'name': 'mike w'}}
+
+    hits = cached.cache.hits
+    assert serialize(2)['title'] == 'second'
+    assert cached.cache.hits == hits + 1
+
+
+def test_cache_skips_unflushed_changes(cached, mappers):
+
+    post = cached.session.query(Post).get(1)
+    user = post.user
+
+    def serialize():
+        return mappers.PostMapper(obj=post).serialize(cache=cached.cache)
+
+    assert serialize() == {'title': 'first', 'user': {'id': 1, 'name': 'mike'}}
+    assert len(cached.cache) == 2
+
+    mappers.UserMapper(obj=user, data={'name': 'alice'}).marshal()
+    assert user in cached.session.dirty
+    assert unflushed_tags(post) == {identity_tag(user)}
+
+    # neither the user nor the post it's nested in are served or stored
+    user_output = mappers.UserMapper(obj=user).serialize(cache=cached.cache)
+    assert user_output == {'id': 1, 'name': 'alice'}
+    assert serialize() == {'title': 'first', 'user': {'id': 1, 'name': 'alice'}}
+    assert len(cached.cache) == 2
+
+    # once the change is discarded the cached output is valid again
+    cached.session.rollback()
+    hits = cached.cache.hits
+    assert serialize() == {'title': 'first', 'user': {'id': 1, 'name': 'mike'}}
+    assert cached.cache.hits == hits + 1
+
+
+def test_cache_skips_pending_instances(cached, mappers):
+
+    user = cached.session.query(User).get(2)
+    post = Post(id=3, title='third', user=User(id=3, name='new'))
+    cached.session.add(post)
+
+    assert identity_tag(post) == ('pending', id(post))
+    assert mappers.UserMapper(obj=user).serialize(cache=cached.cache) == {
+        'id': 2, 'name': 'jack'}
+    assert len(cached.cache) == 1
+
+    output = mappers.PostMapper(obj=post).serialize(cache=cached.cache)
+    assert output == {'title': 'third', 'user': {'id': 3, 'name': 'new'}}
+    assert len(cached.cache) == 1
+
+
+def test_cache_invalidator_deleted_instances(cached, mappers):
+
+    post = cached.session.query(Post).get(2)
+    mappers.PostMapper(obj=post).serialize(cache=cached.cache)
+    assert len(cached.cache) == 2
+
+    cached.session.delete(post)
+    cached.session.commit()
+
+    assert len(cached.cache) == 1
+
+
+def test_cache_invalidator_rollback(cached, mappers):
+
+    def serialize():
+        post = cached.session.query(Post).get(1)
+        return mappers.PostMapper(obj=post).serialize(cache=cached.cache)
+
+    cached.session.query(Post).get(1).title = 'uncommitted'
+    cached.session.flush()
+
+    # cached from data that is never committed
+    assert serialize()['title'] == 'uncommitted'
+
+    cached.session.rollback()
+    assert serialize()['title'] == 'first'
+
+
+def test_reserialize_changed_sources(cached, mappers):
+
+    post = cached.session.query(Post).get(1)
+    previous = mappers.PostMapper(obj=post).serialize()
+
+    post.title = 'updated'
+    assert changed_sources(post) == {'title'}
+
+    output, patch = mappers.PostMapper(obj=post).reserialize(
+        previous, changed_sources(post))
+    assert patch == [{'op': 'replace', 'path': '/title', 'value': 'updated'}]
@@ -1,4 +1,9 @@
-from kim.utils import attr_or_key
+import gc
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from kim.utils import attr_or_key, map_in_executor, paused_gc
 
 
 def test_attr_or_key_util():
@@ -32,3 +37,77 @@ def test_attr_or_key_util_dot_syntax():
     assert attr_or_key(Foo(), 'bar.qux') is None
     assert attr_or_key(foo_dict, 'bar.xyz') == 'abc'
     assert attr_or_key(foo_dict, 'bar.qux') is None
+
+
+def test_map_in_executor_without_executor_is_lazy():
+
+    called = []
+
+    def func(item):
+        called.append(item)
+        if item == 2:
+            raise ValueError(item)
+        return item * 10
+
+    results = map_in_executor(None, func, [1, 2, 3])
+    assert called == []
+
+    assert results[0]() == 10
+    with pytest.raises(ValueError):
+        results[1]()
+    assert called == [1, 2]
+
+
+def test_map_in_executor_preserves_order():
+
+    def func(item):
+        if item == 2:
+            raise ValueError(item)
+        return item * 10
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = map_in_executor(executor, func, [1, 2, 3])
+
+        assert results[0]() == 10
+        with pytest.raises(ValueError):
+            results[1]()
+        assert results[2]() == 30
+
+
+def test_map_in_executor_nested_does_not_deadlock():
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+
+        def outer(item):
+            inner = map_in_executor(executor, lambda i: i + item, [1, 2])
+            return [result() for result in inner]
+
+        results = map_in_executor(executor, outer, [10, 20])
+        assert [result() for result in results] == [[11, 12], [21, 22]]
+
+
+def test_paused_gc():
+
+    assert gc.isenabled()
+    with paused_gc():
+        assert not gc.isenabled()
+        with paused_gc():
+            assert not gc.isenabled()
+        assert not gc.isenabled()
+    assert gc.isenabled()
+
+    with pytest.raises(ValueError):
+        with paused_gc():
+            raise ValueError()
+    assert gc.isenabled()
+
+
+def test_paused_gc_leaves_gc_disabled():
+
+    gc.disable()
+    try:
+        with paused_gc():
+            pass
+        assert not gc.isenabled()
+    finally:
+        gc.enable()